@@ -1,5 +1,6 @@
 import os
 import copy
+import json
 import sys
 import shutil
 import argparse
@@ -8,6 +9,8 @@ import subprocess
 from typing import List
 from pathlib import Path
 
+_DEFAULT_PROFILE = ".daisyprofile"
+
 
 def find_plugin():
     if "LIBDAISY_PATH" in os.environ:
@@ -57,6 +60,9 @@ def _compile(compiler, args, output_file, cache_folder, plugin_path):
         opt_level = "-O1"
     elif args.O0:
         opt_level = "-O0"
+    else:
+        opt_level = "-O2"
+    explicit_opt_level = args.O3 or args.O2 or args.O1 or args.O0
 
     # Compile and lift
     llvm_base_command = [
@@ -73,6 +79,8 @@ def _compile(compiler, args, output_file, cache_folder, plugin_path):
         llvm_base_command.append("--target=" + args.target)
     if args.sysroot is not None:
         llvm_base_command.append("--sysroot=" + args.sysroot)
+    if args.march is not None:
+        llvm_base_command.append("-march=" + args.march)
     if args.v:
         llvm_base_command.append("-v")
     if args.w:
@@ -84,10 +92,10 @@ def _compile(compiler, args, output_file, cache_folder, plugin_path):
     if args.MT is not None:
         llvm_base_command.append("-MT" + args.MT)
 
+    # Polly lifts the scalar loops, the host code is vectorized after lifting
     compile_options = [
         "-fno-vectorize",
         "-fno-slp-vectorize",
-        "-fno-tree-vectorize",
     ]
     if args.ffast_math:
         compile_options.append("-ffast-math")
@@ -104,6 +112,16 @@ def _compile(compiler, args, output_file, cache_folder, plugin_path):
     ]
     llvm_command = llvm_base_command + compile_options + macros + wanings + includes
 
+    # Optimization flags of the SDFGs, DaCe's defaults unless given explicitly
+    sdfg_flags = [opt_level] if explicit_opt_level else []
+    if args.march is not None:
+        sdfg_flags.append("-march=" + args.march)
+    if args.ffast_math:
+        sdfg_flags.append("-ffast-math")
+    if args.target is not None:
+        # Only supported by clang
+        sdfg_flags.append("--target=" + args.target)
+
     llvm_source_files = []
     for input_file in (Path(file) for file in args.inputs):
         llvm_file = str(cache_folder / f"{input_file.stem}.ll")
@@ -121,7 +139,26 @@ def _compile(compiler, args, output_file, cache_folder, plugin_path):
             f"--daisy-schedule={args.fschedule}",
             f"--daisy-transfer-tune={args.ftransfer_tune}",
             f"--daisy-dump-raw-maps={args.fdump_raw_maps}",
+            f"--daisy-min-work={args.fmin_work}",
+            f"--daisy-num-threads={args.fsdfg_num_threads}",
+            f"--daisy-numa={args.fsdfg_numa}",
+            f"--daisy-proc-bind={args.fsdfg_proc_bind}",
+            f"--daisy-parametric={args.fparametric}",
+            f"--daisy-bitcode={args.fsdfg_bitcode}",
+            f"--daisy-runtime-profile={args.fsdfg_profile}",
         ]
+        if sdfg_flags:
+            plugin.append(f"--daisy-cflags={' '.join(sdfg_flags)}")
+        if args.target is not None:
+            plugin.append("--daisy-cxx=clang++-16")
+        # Profiles are kept outside of the cache folder, which every build removes
+        if args.fprofile_generate is not None:
+            profile = Path(args.fprofile_generate).absolute()
+            plugin.append(f"--daisy-profile-generate={profile}")
+        if args.fprofile_use is not None:
+            profile = Path(args.fprofile_use).absolute()
+            plugin.append(f"--daisy-profile-use={profile}")
+            plugin.append(f"--daisy-profiling-features={args.ftransfer_tune}")
         polly = [
             "-polly-process-unprofitable",
         ]
@@ -137,6 +174,11 @@ def _compile(compiler, args, output_file, cache_folder, plugin_path):
 
         llvm_source_files.append(llvm_file_lifted)
 
+    # SDFGs compiled to LLVM IR
+    sdfg_files = []
+    for metadata in _sdfg_metadata(cache_folder):
+        sdfg_files += [cache_folder / name for name in metadata.get("bitcode", [])]
+
     # Link LLVM files
     linker_comand = [
         "llvm-link-16",
@@ -144,10 +186,25 @@ def _compile(compiler, args, output_file, cache_folder, plugin_path):
         "-o",
         str(cache_folder / f"{output_file.stem}.ll"),
     ] + llvm_source_files
+    linker_comand += sdfg_files
     ret_code = _execute_command(linker_comand)
     if ret_code > 0:
         return ret_code
 
+    # Optimize the SDFGs and the host code as a whole, which vectorizes
+    # the host code
+    opt_command = [
+        "opt-16",
+        "-S",
+        opt_level,
+        str(cache_folder / f"{output_file.stem}.ll"),
+        "-o",
+        str(cache_folder / f"{output_file.stem}.ll"),
+    ]
+    ret_code = _execute_command(opt_command)
+    if ret_code > 0:
+        return ret_code
+
     # Assemble LLVM files
     llc_command = ["llc-16", "-filetype=obj", opt_level]
     if args.fPIE or args.fPIC:
@@ -158,6 +215,15 @@ def _compile(compiler, args, output_file, cache_folder, plugin_path):
     return ret_code
 
 
+def _sdfg_metadata(cache_folder):
+    metadata_list = []
+    for metadata_path in sorted(cache_folder.glob(f"sdfg_*.json")):
+        with open(metadata_path, "r") as handle:
+            metadata_list.append(json.load(handle))
+
+    return metadata_list
+
+
 def _build(compiler, args, input_files, output_file, cache_folder):
     build_command = [
         compiler,
@@ -166,21 +232,36 @@ def _build(compiler, args, input_files, output_file, cache_folder):
         build_command.append("--target=" + args.target)
     if args.sysroot is not None:
         build_command.append("--sysroot=" + args.sysroot)
-    if args.fopenmp:
+    # SDFGs linked as LLVM IR require the OpenMP and C++ runtimes
+    metadata_list = _sdfg_metadata(cache_folder)
+    bitcode = any("bitcode" in metadata for metadata in metadata_list)
+    if args.fopenmp or bitcode:
         build_command.append("-fopenmp")
     if args.pthread:
         build_command.append("-pthread")
     build_command += ["-o", output_file]
 
+    sdfg_libs = [Path(path) for path in cache_folder.glob(f"libsdfg_*.so")]
     build_command += ["-L" + arg for arg in args.L]
-    build_command.append(f"-L{cache_folder.absolute()}")
+    if sdfg_libs:
+        build_command.append(f"-L{cache_folder.absolute()}")
 
     build_command += ["-l" + arg for arg in args.l]
-    sdfg_libs = [Path(path) for path in cache_folder.glob(f"libsdfg_*.so")]
     for sdfg_lib in sdfg_libs:
         build_command.append(f"-l{sdfg_lib.stem[3:]}")
+    if bitcode and compiler != "clang++-16":
+        build_command.append("-lstdc++")
+
+    # Libraries of the SDFGs, e.g., BLAS
+    libraries = []
+    for metadata in metadata_list:
+        for library in metadata["libraries"]:
+            if library not in libraries:
+                libraries.append(library)
+    build_command += libraries
 
-    build_command.append(f"-Wl,-rpath={cache_folder.absolute()}")
+    if sdfg_libs:
+        build_command.append(f"-Wl,-rpath={cache_folder.absolute()}")
 
     ret_code = _execute_command(build_command)
     return ret_code
@@ -247,12 +328,13 @@ def main():
     # Optimization levels
     parser.add_argument("-O0", action="store_true", default=False)
     parser.add_argument("-O1", action="store_true", default=False)
-    parser.add_argument("-O2", action="store_true", default=True)
+    parser.add_argument("-O2", action="store_true", default=False)
     parser.add_argument("-O3", action="store_true", default=False)
 
     # Target
     parser.add_argument("--target", type=str)
     parser.add_argument("--sysroot", type=str)
+    parser.add_argument("-march", type=str)
 
     # Compiler options
     parser.add_argument("-ffast-math", action="store_true", default=False)
@@ -264,9 +346,61 @@ def main():
     # Scheduling options
     parser.add_argument("-ftransfer-tune", action="store_true", default=False)
     parser.add_argument("-fdump-raw-maps", action="store_true", default=False)
+    parser.add_argument(
+        "-fmin-work",
+        type=int,
+        default=1024,
+        help="Minimal estimated work of a scop to be offloaded to an SDFG",
+    )
+    parser.add_argument(
+        "-fparametric",
+        action="store_true",
+        default=False,
+        help="Compile SDFGs for symbolic array sizes instead of the sizes known at compile time",
+    )
+    parser.add_argument(
+        "-fsdfg-num-threads",
+        type=int,
+        default=0,
+        help="Number of threads of the SDFGs' parallel regions, 0 for the OpenMP default",
+    )
+    parser.add_argument(
+        "-fsdfg-numa",
+        action="store_true",
+        default=False,
+        help="Initialize the transients of multicore SDFGs in parallel and bind the threads of their parallel regions",
+    )
+    parser.add_argument(
+        "-fsdfg-proc-bind",
+        choices=["close", "spread", "primary"],
+        default="spread",
+        help="Thread affinity of the SDFGs' parallel regions with -fsdfg-numa, relative to OMP_PLACES",
+    )
+    parser.add_argument(
+        "-fsdfg-bitcode",
+        action="store_true",
+        default=False,
+        help="Link the SDFGs into the host module as LLVM IR instead of shared libraries",
+    )
+    parser.add_argument(
+        "-fsdfg-profile",
+        action="store_true",
+        default=False,
+        help="Compile dormant instrumentation into the SDFGs, enabled by DAISY_PROFILE=<file> at runtime (see daisycc-report)",
+    )
+    parser.add_argument(
+        "-fprofile-generate",
+        type=str,
+        help="Instrument the SDFGs to write their profiles to this folder at exit",
+    )
+    parser.add_argument(
+        "-fprofile-use",
+        type=str,
+        help="Use the profiles of an instrumented build for the profitability, schedule, specialization and tuning of the SDFGs",
+    )
     parser.add_argument(
         "-fschedule",
-        choices=["sequential", "multicore", "gpu"],
+        choices=["sequential", "multicore", "gpu", "auto"],
         default="sequential",
         help="",
     )
@@ -283,7 +417,14 @@ def main():
 
     # Start of Program
 
-    args = parser.parse_args()
+    # As in GCC, the folder of the profiles is optional
+    options = [
+        arg + "=" + _DEFAULT_PROFILE
+        if arg in ["-fprofile-generate", "-fprofile-use"]
+        else arg
+        for arg in argv[1:]
+    ]
+    args = parser.parse_args(options)
     if len(argv) == 1:
         _execute_command([compiler])
     elif len(argv) == 2 and args.v:
@@ -0,0 +1,171 @@
+import sys
+import json
+import argparse
+
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def load_profile(path: Path) -> Dict[str, Dict]:
+    """
+    Merges the lines written by the SDFGs of all runs of a program built
+    with -fsdfg-profile and DAISY_PROFILE=<path>.
+    """
+    profile = {}
+    with open(path, "r") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+
+            entry = json.loads(line)
+            sdfg = profile.setdefault(
+                entry["sdfg"], {"processes": 0, "events": {}, "counters": {}}
+            )
+            sdfg["processes"] += 1
+            for name, event in entry["events"].items():
+                merged = sdfg["events"].setdefault(name, {"calls": 0, "time": 0})
+                merged["calls"] += event["calls"]
+                merged["time"] += event["time"]
+            for name, value in entry["counters"].items():
+                sdfg["counters"][name] = sdfg["counters"].get(name, 0) + value
+
+    return profile
+
+
+def load_maps(cache_folder: Path, sdfg_name: str) -> Optional[Dict[str, Dict]]:
+    """
+    Reads the schedule and range of the maps of an SDFG kept in the cache
+    folder by label.
+    """
+    path = cache_folder / f"{sdfg_name}.sdfg"
+    if not path.is_file():
+        return None
+
+    with open(path, "r") as handle:
+        sdfg = json.load(handle)
+
+    maps = {}
+    _collect_maps(sdfg, maps)
+    return maps
+
+
+def _collect_maps(element, maps: Dict[str, Dict]):
+    # Maps of the SDFG and its nested SDFGs
+    if isinstance(element, list):
+        for item in element:
+            _collect_maps(item, maps)
+    elif isinstance(element, dict):
+        if element.get("type") == "MapEntry":
+            attributes = element["attributes"]
+            ranges = attributes["range"]["ranges"]
+            maps[attributes["label"]] = {
+                "schedule": attributes["schedule"],
+                "range": ", ".join(
+                    f"{param}={dim['start']}:{dim['end']}"
+                    for param, dim in zip(attributes["params"], ranges)
+                ),
+            }
+        for value in element.values():
+            _collect_maps(value, maps)
+
+
+def report(profile: Dict[str, Dict], cache_folder: Path) -> Dict[str, Dict]:
+    """
+    Annotates the profile of each SDFG with its share of the total time and
+    the maps with their share of the SDFG's time, schedule and range.
+    """
+    total = sum(
+        event["time"]
+        for sdfg in profile.values()
+        for name, event in sdfg["events"].items()
+        if name.startswith("SDFG ")
+    )
+
+    result = {}
+    for sdfg_name, sdfg in profile.items():
+        entry = sdfg["events"].get("SDFG " + sdfg_name, {"calls": 0, "time": 0})
+        maps = load_maps(cache_folder, sdfg_name) or {}
+
+        result[sdfg_name] = {
+            "processes": sdfg["processes"],
+            "calls": entry["calls"],
+            "time": entry["time"],
+            "share": entry["time"] / total if total > 0 else 0.0,
+            "counters": sdfg["counters"],
+            "maps": {},
+        }
+        for name, event in sdfg["events"].items():
+            if not name.startswith("Map "):
+                continue
+
+            label = name[len("Map ") :]
+            result[sdfg_name]["maps"][label] = {
+                "calls": event["calls"],
+                "time": event["time"],
+                "share": event["time"] / entry["time"] if entry["time"] > 0 else 0.0,
+                "schedule": maps.get(label, {}).get("schedule"),
+                "range": maps.get(label, {}).get("range"),
+            }
+
+    return result
+
+
+def _print(result: Dict[str, Dict], top: int):
+    sdfgs = sorted(result.items(), key=lambda item: item[1]["time"], reverse=True)
+    for sdfg_name, sdfg in sdfgs:
+        per_call = sdfg["time"] / sdfg["calls"] if sdfg["calls"] > 0 else 0.0
+        print(
+            f"{sdfg_name}: {sdfg['calls']} calls, {sdfg['time'] / 1e3:.3f} ms, "
+            + f"{per_call:.1f} us per call ({sdfg['share']:.1%})"
+        )
+
+        counters = sdfg["counters"]
+        if counters:
+            line = ", ".join(f"{name} {value}" for name, value in counters.items())
+            if counters.get("cycles") and "instructions" in counters:
+                line += f" (IPC {counters['instructions'] / counters['cycles']:.2f})"
+            print("  " + line)
+
+        maps = sorted(
+            sdfg["maps"].items(), key=lambda item: item[1]["time"], reverse=True
+        )
+        for label, entry in maps[:top]:
+            print(
+                f"  {label:<32} {entry['calls']:>10} {entry['time'] / 1e3:>12.3f} ms "
+                + f"{entry['share']:>7.1%}  {entry['schedule'] or '-':<16} "
+                + f"{entry['range'] or '-'}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="daisycc-report",
+        description="Report of the SDFGs of a program built with -fsdfg-profile",
+    )
+    parser.add_argument("profile", type=str, help="File written to DAISY_PROFILE")
+    parser.add_argument(
+        "--cache",
+        type=str,
+        default=".daisycache",
+        help="Cache folder of the build with the .sdfg files",
+    )
+    parser.add_argument(
+        "--top", type=int, default=10, help="Number of maps reported per SDFG"
+    )
+    parser.add_argument(
+        "--json", action="store_true", default=False, help="Print the report as JSON"
+    )
+    args = parser.parse_args()
+
+    profile_path = Path(args.profile)
+    if not profile_path.is_file():
+        print(f"daisycc-report: {profile_path} not found", file=sys.stderr)
+        return 1
+
+    result = report(load_profile(profile_path), Path(args.cache))
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        _print(result, args.top)
+
+    return 0
@@ -18,6 +18,7 @@ setup(
         "console_scripts": [
             "daisycc = driver:main",
             "daisycxx = driver:main",
+            "daisycc-report = driver.report:main",
         ]
     },
 )
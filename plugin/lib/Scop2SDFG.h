@@ -4,6 +4,7 @@
 #include <filesystem>
 #include <stdlib.h>
 #include <algorithm>
+#include <optional>
 
 
 #include "llvm/IR/PassManager.h"
@@ -11,8 +12,15 @@
 #include "llvm/Support/JSON.h"
 #include "llvm/Support/raw_ostream.h"
 #include "llvm/Support/CommandLine.h"
+#include "llvm/Support/MemoryBuffer.h"
+#include "llvm/Transforms/Utils/ModuleUtils.h"
+#include "llvm/Transforms/Utils/ScalarEvolutionExpander.h"
 
 #include "polly/ScopPass.h"
+#include "polly/Support/GICHelper.h"
+
+#include "isl/ast.h"
+#include "isl/ast_build.h"
 
 #include "JScop.h"
 
@@ -20,6 +28,7 @@ enum ScheduleChoice {
   SCHEDULE_SEQUENTIAL,
   SCHEDULE_MULTICORE,
   SCHEDULE_GPU,
+  SCHEDULE_AUTO,
 };
 
 ScheduleChoice DaisySchedule;
@@ -29,7 +38,8 @@ static llvm::cl::opt<ScheduleChoice, true> XSchedule(
     llvm::cl::values(
         clEnumValN(SCHEDULE_SEQUENTIAL, "sequential", "Sequential execution"),
         clEnumValN(SCHEDULE_MULTICORE, "multicore", "Multicore execution"),
-        clEnumValN(SCHEDULE_GPU, "gpu", "GPU execution")
+        clEnumValN(SCHEDULE_GPU, "gpu", "GPU execution"),
+        clEnumValN(SCHEDULE_AUTO, "auto", "Sequential or multicore execution per scop")
     ),
     llvm::cl::location(DaisySchedule),
     llvm::cl::init(SCHEDULE_SEQUENTIAL)
@@ -51,6 +61,102 @@ static llvm::cl::opt<bool, true> XDumpRawMaps(
     llvm::cl::init(false)
 );
 
+static bool DaisyParametric;
+static llvm::cl::opt<bool, true> XParametric(
+    "daisy-parametric",
+    llvm::cl::location(DaisyParametric),
+    llvm::cl::desc("Keep the array sizes of the SDFGs symbolic"),
+    llvm::cl::init(false)
+);
+
+static unsigned DaisyMinWork;
+static llvm::cl::opt<unsigned, true> XMinWork(
+    "daisy-min-work",
+    llvm::cl::location(DaisyMinWork),
+    llvm::cl::desc("Minimal estimated work of a scop to be converted"),
+    llvm::cl::init(1024)
+);
+
+static unsigned DaisyNumThreads;
+static llvm::cl::opt<unsigned, true> XNumThreads(
+    "daisy-num-threads",
+    llvm::cl::location(DaisyNumThreads),
+    llvm::cl::desc("Number of threads of the SDFGs' parallel regions, 0 for the OpenMP default"),
+    llvm::cl::init(0)
+);
+
+static bool DaisyNUMA;
+static llvm::cl::opt<bool, true> XNUMA(
+    "daisy-numa",
+    llvm::cl::location(DaisyNUMA),
+    llvm::cl::desc("First-touch the transients of multicore SDFGs in parallel and bind their threads"),
+    llvm::cl::init(false)
+);
+
+static std::string DaisyProcBind;
+static llvm::cl::opt<std::string, true> XProcBind(
+    "daisy-proc-bind",
+    llvm::cl::location(DaisyProcBind),
+    llvm::cl::desc("Thread affinity of the SDFGs' parallel regions in NUMA mode"),
+    llvm::cl::init("spread")
+);
+
+static bool DaisyBitcode;
+static llvm::cl::opt<bool, true> XBitcode(
+    "daisy-bitcode",
+    llvm::cl::location(DaisyBitcode),
+    llvm::cl::desc("Compile the SDFGs to LLVM IR instead of shared libraries"),
+    llvm::cl::init(false)
+);
+
+static std::string DaisyCompilerFlags;
+static llvm::cl::opt<std::string, true> XCompilerFlags(
+    "daisy-cflags",
+    llvm::cl::location(DaisyCompilerFlags),
+    llvm::cl::desc("Optimization flags for compiling the SDFGs"),
+    llvm::cl::init("")
+);
+
+static std::string DaisyCompiler;
+static llvm::cl::opt<std::string, true> XCompiler(
+    "daisy-cxx",
+    llvm::cl::location(DaisyCompiler),
+    llvm::cl::desc("C++ compiler for the SDFGs"),
+    llvm::cl::init("")
+);
+
+static std::string DaisyProfileGenerate;
+static llvm::cl::opt<std::string, true> XProfileGenerate(
+    "daisy-profile-generate",
+    llvm::cl::location(DaisyProfileGenerate),
+    llvm::cl::desc("Instrument the SDFGs to write their profiles to this folder"),
+    llvm::cl::init("")
+);
+
+static std::string DaisyProfileUse;
+static llvm::cl::opt<std::string, true> XProfileUse(
+    "daisy-profile-use",
+    llvm::cl::location(DaisyProfileUse),
+    llvm::cl::desc("Folder of the profiles of the SDFGs' previous build"),
+    llvm::cl::init("")
+);
+
+static bool DaisyRuntimeProfile;
+static llvm::cl::opt<bool, true> XRuntimeProfile(
+    "daisy-runtime-profile",
+    llvm::cl::location(DaisyRuntimeProfile),
+    llvm::cl::desc("Compile dormant instrumentation into the SDFGs, enabled by DAISY_PROFILE at runtime"),
+    llvm::cl::init(false)
+);
+
+static bool DaisyProfilingFeatures;
+static llvm::cl::opt<bool, true> XProfilingFeatures(
+    "daisy-profiling-features",
+    llvm::cl::location(DaisyProfilingFeatures),
+    llvm::cl::desc("Use profiling features for transfer tuning"),
+    llvm::cl::init(false)
+);
+
 namespace daisy {
 
 namespace fs = std::filesystem;
@@ -80,6 +186,8 @@ private:
             command += " --schedule=multicore";        
         } else if (DaisySchedule == SCHEDULE_GPU) {
             command += " --schedule=gpu";
+        } else if (DaisySchedule == SCHEDULE_AUTO) {
+            command += " --schedule=auto";
         }
 
         if (DaisyTransferTune) {
@@ -90,6 +198,48 @@ private:
             command += " --dump_raw_maps";
         }
 
+        if (DaisyParametric) {
+            command += " --parametric";
+        }
+
+        command += " --min_work=" + std::to_string(DaisyMinWork);
+
+        if (DaisyNumThreads > 0) {
+            command += " --num_threads=" + std::to_string(DaisyNumThreads);
+        }
+
+        if (DaisyNUMA) {
+            command += " --numa --proc_bind=" + DaisyProcBind;
+        }
+
+        if (DaisyBitcode) {
+            command += " --bitcode";
+        }
+
+        if (!DaisyCompilerFlags.empty()) {
+            command += " --cflags='" + DaisyCompilerFlags + "'";
+        }
+
+        if (!DaisyCompiler.empty()) {
+            command += " --cxx=" + DaisyCompiler;
+        }
+
+        if (!DaisyProfileGenerate.empty()) {
+            command += " --profile_generate='" + DaisyProfileGenerate + "'";
+        }
+
+        if (!DaisyProfileUse.empty()) {
+            command += " --profile_use='" + DaisyProfileUse + "'";
+        }
+
+        if (DaisyRuntimeProfile) {
+            command += " --runtime_profile";
+        }
+
+        if (DaisyProfilingFeatures) {
+            command += " --use_profiling_features";
+        }
+
         return (system(command.c_str()) == 0);
     }
 
@@ -113,6 +263,703 @@ private:
         return true;
     }
 
+    static llvm::Value* getParameterValue(polly::Scop& S, const llvm::SCEV* param) {
+        const llvm::SCEVUnknown* unknown = llvm::dyn_cast_or_null<llvm::SCEVUnknown>(param);
+        if (unknown) {
+            return unknown->getValue();
+        }
+
+        const llvm::SCEVAddRecExpr* rec = llvm::dyn_cast_or_null<llvm::SCEVAddRecExpr>(param);
+        return rec->getLoop()->getInductionVariable(*S.getSE());
+    }
+
+    static std::string getParameterName(polly::Scop& S, const llvm::SCEV* param) {
+        // Has to be in sync with python module (Scop.from_json)
+        std::string name = polly::stringFromIslObj(S.getIdForParam(param));
+        return name.substr(0, name.find('@'));
+    }
+
+    /**
+     * Reads the metadata written by the python module next to the SDFG.
+    */
+    static std::optional<llvm::json::Value> readMetadata(const std::string& sdfg_name) {
+        auto buffer = llvm::MemoryBuffer::getFile(".daisycache/" + sdfg_name + ".json");
+        if (!buffer) {
+            return std::nullopt;
+        }
+
+        llvm::Expected<llvm::json::Value> metadata = llvm::json::parse((*buffer)->getBuffer());
+        if (!metadata) {
+            llvm::consumeError(metadata.takeError());
+            return std::nullopt;
+        }
+        return std::move(*metadata);
+    }
+
+    /**
+     * Creates the condition that the arrays have the sizes an SDFG is specialized for.
+     * Returns nullptr if none of the sizes can be checked.
+    */
+    static llvm::Value* createSizeGuard(polly::Scop& S, const llvm::json::Array* sizes, llvm::Instruction* insert_point) {
+        if (!sizes) {
+            return nullptr;
+        }
+
+        llvm::IRBuilder<> builder(insert_point);
+        llvm::Value* guard = nullptr;
+        const llvm::DataLayout& DL = S.getFunction().getParent()->getDataLayout();
+        llvm::SCEVExpander expander(*S.getSE(), DL, "daisy");
+        for (const llvm::json::Value& entry : *sizes) {
+            const llvm::json::Object* size = entry.getAsObject();
+            if (!size) {
+                continue;
+            }
+
+            auto array = size->getString("array");
+            auto dimension = size->getInteger("dimension");
+            auto value = size->getInteger("value");
+            if (!array || !dimension || !value) {
+                continue;
+            }
+
+            for (auto SAI : S.arrays()) {
+                if (SAI->getName() != *array || *dimension >= SAI->getNumberOfDimensions()) {
+                    continue;
+                }
+
+                // Unknown sizes (*) cannot be checked
+                const llvm::SCEV* dim_size = SAI->getDimensionSize(*dimension);
+                if (!dim_size) {
+                    continue;
+                }
+
+                llvm::Value* runtime_size = expander.expandCodeFor(dim_size, dim_size->getType(), insert_point);
+                llvm::Value* specialized_size = llvm::ConstantInt::get(dim_size->getType(), *value, true);
+                llvm::Value* condition = builder.CreateICmpEQ(runtime_size, specialized_size);
+                guard = guard ? builder.CreateAnd(guard, condition) : condition;
+            }
+        }
+
+        return guard;
+    }
+
+    /**
+     * Creates the condition under which the SDFG is executed instead of the original region.
+     * The guards are written by the python module to the metadata of the SDFG:
+     * - parameters: alternatives of lower bounds on the parameters, the SDFG is profitable if
+     *   all bounds of any alternative hold.
+     * - sizes: the array sizes the SDFG is specialized for.
+     * Returns nullptr if the SDFG is executed unconditionally.
+    */
+    static llvm::Value* createGuard(polly::Scop& S, const llvm::json::Object* metadata, llvm::Instruction* insert_point) {
+        const llvm::json::Object* guards = metadata ? metadata->getObject("guards") : nullptr;
+        if (!guards) {
+            return nullptr;
+        }
+
+        llvm::IRBuilder<> builder(insert_point);
+        llvm::Value* guard = nullptr;
+        auto conjunction = [&](llvm::Value* condition) {
+            guard = guard ? builder.CreateAnd(guard, condition) : condition;
+        };
+
+        // Size thresholds: Any alternative of lower bounds on the parameters
+        if (const llvm::json::Array* alternatives = guards->getArray("parameters")) {
+            llvm::Value* thresholds = nullptr;
+            for (const llvm::json::Value& alternative : *alternatives) {
+                const llvm::json::Object* bounds = alternative.getAsObject();
+                if (!bounds) {
+                    continue;
+                }
+
+                llvm::Value* condition = builder.getTrue();
+                for (auto& param : S.parameters()) {
+                    auto threshold = bounds->getInteger(getParameterName(S, param));
+                    if (!threshold) {
+                        continue;
+                    }
+
+                    llvm::Value* value = getParameterValue(S, param);
+                    llvm::Value* bound = llvm::ConstantInt::get(value->getType(), *threshold, true);
+                    condition = builder.CreateAnd(condition, builder.CreateICmpSGE(value, bound));
+                }
+                thresholds = thresholds ? builder.CreateOr(thresholds, condition) : condition;
+            }
+
+            if (thresholds) {
+                conjunction(thresholds);
+            }
+        }
+
+        // Specialization guards
+        if (llvm::Value* sizes = createSizeGuard(S, guards->getArray("sizes"), insert_point)) {
+            conjunction(sizes);
+        }
+
+        return guard;
+    }
+
+    /**
+     * Generates code for an isl expression over the parameters of the scop.
+     * Returns nullptr if the expression contains unsupported operations.
+    */
+    static llvm::Value* createExpr(polly::Scop& S, __isl_take isl_ast_expr* expr, llvm::IRBuilder<>& builder) {
+        llvm::Type* type = builder.getInt64Ty();
+        llvm::Value* result = nullptr;
+        switch (isl_ast_expr_get_type(expr)) {
+        case isl_ast_expr_int: {
+            isl::val val = isl::manage(isl_ast_expr_get_val(expr));
+            result = llvm::ConstantInt::get(type, val.get_num_si(), true);
+            break;
+        }
+        case isl_ast_expr_id: {
+            isl::id id = isl::manage(isl_ast_expr_get_id(expr));
+            for (auto& param : S.parameters()) {
+                if (S.getIdForParam(param).get() == id.get()) {
+                    result = builder.CreateSExtOrTrunc(getParameterValue(S, param), type);
+                }
+            }
+            break;
+        }
+        case isl_ast_expr_op: {
+            std::vector<llvm::Value*> args;
+            for (int i = 0; i < isl_ast_expr_op_get_n_arg(expr); i++) {
+                llvm::Value* arg = createExpr(S, isl_ast_expr_op_get_arg(expr, i), builder);
+                if (!arg) {
+                    isl_ast_expr_free(expr);
+                    return nullptr;
+                }
+                args.push_back(arg);
+            }
+
+            switch (isl_ast_expr_op_get_type(expr)) {
+            case isl_ast_expr_op_minus:
+                result = builder.CreateNeg(args[0]);
+                break;
+            case isl_ast_expr_op_add:
+                result = builder.CreateAdd(args[0], args[1]);
+                break;
+            case isl_ast_expr_op_sub:
+                result = builder.CreateSub(args[0], args[1]);
+                break;
+            case isl_ast_expr_op_mul:
+                result = builder.CreateMul(args[0], args[1]);
+                break;
+            case isl_ast_expr_op_max:
+                result = args[0];
+                for (size_t i = 1; i < args.size(); i++) {
+                    result = builder.CreateSelect(builder.CreateICmpSGT(result, args[i]), result, args[i]);
+                }
+                break;
+            case isl_ast_expr_op_min:
+                result = args[0];
+                for (size_t i = 1; i < args.size(); i++) {
+                    result = builder.CreateSelect(builder.CreateICmpSLT(result, args[i]), result, args[i]);
+                }
+                break;
+            case isl_ast_expr_op_div:
+            case isl_ast_expr_op_pdiv_q:
+                result = builder.CreateSDiv(args[0], args[1]);
+                break;
+            case isl_ast_expr_op_fdiv_q: {
+                // The divisor is positive: Round towards negative infinity
+                llvm::Value* remainder = builder.CreateSRem(args[0], args[1]);
+                llvm::Value* adjust = builder.CreateZExt(builder.CreateICmpSLT(remainder, llvm::ConstantInt::get(type, 0)), type);
+                result = builder.CreateSub(builder.CreateSDiv(args[0], args[1]), adjust);
+                break;
+            }
+            case isl_ast_expr_op_pdiv_r:
+            case isl_ast_expr_op_zdiv_r:
+                result = builder.CreateSRem(args[0], args[1]);
+                break;
+            case isl_ast_expr_op_select:
+            case isl_ast_expr_op_cond:
+                result = builder.CreateSelect(args[0], args[1], args[2]);
+                break;
+            case isl_ast_expr_op_eq:
+                result = builder.CreateICmpEQ(args[0], args[1]);
+                break;
+            case isl_ast_expr_op_le:
+                result = builder.CreateICmpSLE(args[0], args[1]);
+                break;
+            case isl_ast_expr_op_lt:
+                result = builder.CreateICmpSLT(args[0], args[1]);
+                break;
+            case isl_ast_expr_op_ge:
+                result = builder.CreateICmpSGE(args[0], args[1]);
+                break;
+            case isl_ast_expr_op_gt:
+                result = builder.CreateICmpSGT(args[0], args[1]);
+                break;
+            case isl_ast_expr_op_and:
+            case isl_ast_expr_op_and_then:
+                result = builder.CreateAnd(args[0], args[1]);
+                break;
+            case isl_ast_expr_op_or:
+            case isl_ast_expr_op_or_else:
+                result = builder.CreateOr(args[0], args[1]);
+                break;
+            default:
+                break;
+            }
+            break;
+        }
+        default:
+            break;
+        }
+
+        isl_ast_expr_free(expr);
+        return result;
+    }
+
+    /**
+     * Computes the address of the minimal or maximal access of an alias group.
+     * Returns nullptr if the address cannot be computed.
+    */
+    static llvm::Value* createAddress(
+        polly::Scop& S,
+        const isl::ast_build& build,
+        const isl::pw_multi_aff& access,
+        llvm::SCEVExpander& expander,
+        llvm::IRBuilder<>& builder
+    ) {
+        const polly::ScopArrayInfo* SAI = polly::ScopArrayInfo::getFromId(access.get_tuple_id(isl::dim::out));
+        if (!SAI) {
+            return nullptr;
+        }
+
+        // Row-major offset in elements
+        llvm::Type* type = builder.getInt64Ty();
+        llvm::Value* offset = nullptr;
+        unsigned dims = polly::unsignedFromIslSize(access.dim(isl::dim::out));
+        for (unsigned d = 0; d < dims; d++) {
+            isl_ast_expr* expr = isl_ast_build_expr_from_pw_aff(build.get(), access.get_pw_aff(d).release());
+            llvm::Value* index = expr ? createExpr(S, expr, builder) : nullptr;
+            if (!index) {
+                return nullptr;
+            }
+
+            if (!offset) {
+                offset = index;
+                continue;
+            }
+
+            const llvm::SCEV* dim_size = SAI->getDimensionSize(d);
+            if (!dim_size) {
+                return nullptr;
+            }
+            llvm::Value* size = expander.expandCodeFor(dim_size, type, &*builder.GetInsertPoint());
+            offset = builder.CreateAdd(builder.CreateMul(offset, size), index);
+        }
+        if (!offset) {
+            offset = llvm::ConstantInt::get(type, 0);
+        }
+
+        llvm::Value* bytes = builder.CreateMul(offset, llvm::ConstantInt::get(type, SAI->getElemSizeInBytes()));
+        return builder.CreateGEP(builder.getInt8Ty(), SAI->getBasePtr(), bytes);
+    }
+
+    /**
+     * Creates the condition that the arrays of Polly's alias groups do not overlap.
+     * As in Polly's runtime checks, the maximal access is one past the last element, and
+     * every read-write array is checked against the other arrays of its group.
+     * Returns nullptr if the scop has no alias groups or the check cannot be generated.
+    */
+    static llvm::Value* createAliasCheck(polly::Scop& S, llvm::Instruction* insert_point) {
+        if (S.getAliasGroups().empty()) {
+            return nullptr;
+        }
+
+        llvm::IRBuilder<> builder(insert_point);
+        const llvm::DataLayout& DL = S.getFunction().getParent()->getDataLayout();
+        llvm::SCEVExpander expander(*S.getSE(), DL, "daisy");
+        isl::ast_build build = isl::manage(isl_ast_build_from_context(S.getContext().release()));
+
+        llvm::Value* check = nullptr;
+        bool supported = true;
+        auto separated = [&](const polly::Scop::MinMaxAccessTy& a, const polly::Scop::MinMaxAccessTy& b) {
+            llvm::Value* a_min = createAddress(S, build, a.first, expander, builder);
+            llvm::Value* a_max = createAddress(S, build, a.second, expander, builder);
+            llvm::Value* b_min = createAddress(S, build, b.first, expander, builder);
+            llvm::Value* b_max = createAddress(S, build, b.second, expander, builder);
+            if (!a_min || !a_max || !b_min || !b_max) {
+                supported = false;
+                return;
+            }
+
+            llvm::Value* condition = builder.CreateOr(
+                builder.CreateICmpULE(a_max, b_min),
+                builder.CreateICmpULE(b_max, a_min)
+            );
+            check = check ? builder.CreateAnd(check, condition) : condition;
+        };
+
+        for (auto& group : S.getAliasGroups()) {
+            auto& readwrite = group.first;
+            auto& readonly = group.second;
+            for (size_t i = 0; i < readwrite.size(); i++) {
+                for (size_t j = i + 1; j < readwrite.size(); j++) {
+                    separated(readwrite[i], readwrite[j]);
+                }
+                for (auto& access : readonly) {
+                    separated(readwrite[i], access);
+                }
+            }
+        }
+
+        if (!supported) {
+            llvm::errs() << "Cannot generate alias checks\n";
+            return nullptr;
+        }
+        return check;
+    }
+
+    /**
+     * Counts how often the block is executed by an internal counter.
+    */
+    static llvm::GlobalVariable* createCounter(llvm::Module* M, const std::string& name, llvm::BasicBlock* block) {
+        llvm::Type* type = llvm::Type::getInt64Ty(M->getContext());
+        llvm::GlobalVariable* counter = new llvm::GlobalVariable(
+            *M, type, false, llvm::GlobalValue::InternalLinkage, llvm::ConstantInt::get(type, 0), name
+        );
+
+        llvm::IRBuilder<> builder(&*block->getFirstInsertionPt());
+        builder.CreateAtomicRMW(
+            llvm::AtomicRMWInst::Add,
+            counter,
+            llvm::ConstantInt::get(type, 1),
+            llvm::MaybeAlign(8),
+            llvm::AtomicOrdering::Monotonic
+        );
+        return counter;
+    }
+
+    /**
+     * Prints the counters of the dispatch to stderr at exit if DAISY_DISPATCH_STATS is set.
+    */
+    static void createReport(
+        llvm::Module* M,
+        const std::string& sdfg_name,
+        const std::vector<std::pair<std::string, llvm::GlobalVariable*>>& counters
+    ) {
+        llvm::LLVMContext& context = M->getContext();
+        llvm::FunctionType* report_type = llvm::FunctionType::get(llvm::Type::getVoidTy(context), false);
+        llvm::Function* report = llvm::Function::Create(
+            report_type, llvm::Function::InternalLinkage, "daisy_report_" + sdfg_name, M
+        );
+        llvm::BasicBlock* entry = llvm::BasicBlock::Create(context, "entry", report);
+        llvm::BasicBlock* print = llvm::BasicBlock::Create(context, "print", report);
+        llvm::BasicBlock* exit = llvm::BasicBlock::Create(context, "exit", report);
+
+        llvm::IRBuilder<> builder(entry);
+        llvm::FunctionCallee getenv_func = M->getOrInsertFunction(
+            "getenv", llvm::FunctionType::get(builder.getPtrTy(), {builder.getPtrTy()}, false)
+        );
+        llvm::Value* enabled = builder.CreateCall(getenv_func, {builder.CreateGlobalStringPtr("DAISY_DISPATCH_STATS")});
+        builder.CreateCondBr(builder.CreateIsNull(enabled), exit, print);
+
+        builder.SetInsertPoint(print);
+        std::string format = sdfg_name + ":";
+        std::vector<llvm::Value*> args = {builder.getInt32(2), nullptr};
+        for (auto& [name, counter] : counters) {
+            format += " " + name + "=%ld";
+            args.push_back(builder.CreateLoad(builder.getInt64Ty(), counter));
+        }
+        args[1] = builder.CreateGlobalStringPtr(format + "\n");
+        llvm::FunctionCallee dprintf_func = M->getOrInsertFunction(
+            "dprintf", llvm::FunctionType::get(builder.getInt32Ty(), {builder.getInt32Ty(), builder.getPtrTy()}, true)
+        );
+        builder.CreateCall(dprintf_func, args);
+        builder.CreateBr(exit);
+
+        builder.SetInsertPoint(exit);
+        builder.CreateRetVoid();
+
+        llvm::appendToGlobalDtors(*M, report, 65535);
+    }
+
+    /**
+     * Computes the values of the symbols of an SDFG before the insert point.
+     * The symbols are listed by the metadata in the order of the SDFG's signature,
+     * either as a parameter of the scop or as the size of an array dimension.
+     * Without the list, the symbols are the parameters of the scop.
+    */
+    static std::vector<llvm::Value*> getSymbolValues(polly::Scop& S, const llvm::json::Array* symbols, llvm::Instruction* insert_point) {
+        std::vector<llvm::Value*> values;
+        if (!symbols) {
+            for (auto& param : S.parameters()) {
+                values.push_back(getParameterValue(S, param));
+            }
+            return values;
+        }
+
+        const llvm::DataLayout& DL = S.getFunction().getParent()->getDataLayout();
+        llvm::SCEVExpander expander(*S.getSE(), DL, "daisy");
+        for (const llvm::json::Value& entry : *symbols) {
+            const llvm::json::Object* symbol = entry.getAsObject();
+            if (!symbol) {
+                continue;
+            }
+
+            if (auto name = symbol->getString("parameter")) {
+                for (auto& param : S.parameters()) {
+                    if (getParameterName(S, param) == *name) {
+                        values.push_back(getParameterValue(S, param));
+                    }
+                }
+                continue;
+            }
+
+            auto array = symbol->getString("array");
+            auto dimension = symbol->getInteger("dimension");
+            for (auto SAI : S.arrays()) {
+                if (!array || !dimension || SAI->getName() != *array) {
+                    continue;
+                }
+
+                const llvm::SCEV* dim_size = SAI->getDimensionSize(*dimension);
+                if (!dim_size) {
+                    continue;
+                }
+                values.push_back(expander.expandCodeFor(dim_size, dim_size->getType(), insert_point));
+            }
+        }
+
+        return values;
+    }
+
+    /**
+     * Creates a function returning the state of the SDFG for the symbols. The state is
+     * cached per thread and only re-initialized if the symbols change, such that the
+     * persistent transients are allocated once instead of per invocation of the scop.
+     * The state of each thread is kept in a slot of a global list, such that the states
+     * of all threads are released at exit.
+    */
+    static llvm::Function* createStateCache(
+        llvm::Module* M,
+        const std::string& sdfg_name,
+        llvm::PointerType* sdfg_type_ptr,
+        llvm::Function* init_func,
+        llvm::Function* exit_func
+    ) {
+        llvm::LLVMContext& context = M->getContext();
+        llvm::IRBuilder<> builder(context);
+
+        // A slot { state, next } per thread, registered in the global list of all slots
+        llvm::StructType* slot_type = llvm::StructType::get(context, {sdfg_type_ptr, builder.getPtrTy()});
+        llvm::GlobalVariable* slots = new llvm::GlobalVariable(
+            *M, builder.getPtrTy(), false, llvm::GlobalValue::InternalLinkage,
+            llvm::ConstantPointerNull::get(builder.getPtrTy()), "daisy_slots_" + sdfg_name
+        );
+        llvm::GlobalVariable* handle = new llvm::GlobalVariable(
+            *M, builder.getPtrTy(), false, llvm::GlobalValue::InternalLinkage,
+            llvm::ConstantPointerNull::get(builder.getPtrTy()), "daisy_handle_" + sdfg_name,
+            nullptr, llvm::GlobalValue::GeneralDynamicTLSModel
+        );
+
+        std::vector<llvm::GlobalVariable*> cached_symbols;
+        for (llvm::Type* type : init_func->getFunctionType()->params()) {
+            cached_symbols.push_back(new llvm::GlobalVariable(
+                *M, type, false, llvm::GlobalValue::InternalLinkage,
+                llvm::Constant::getNullValue(type), "daisy_symbol_" + sdfg_name,
+                nullptr, llvm::GlobalValue::GeneralDynamicTLSModel
+            ));
+        }
+
+        llvm::Function* acquire = llvm::Function::Create(
+            init_func->getFunctionType(), llvm::Function::InternalLinkage, "daisy_acquire_" + sdfg_name, M
+        );
+        llvm::BasicBlock* entry = llvm::BasicBlock::Create(context, "entry", acquire);
+        llvm::BasicBlock* allocate = llvm::BasicBlock::Create(context, "allocate", acquire);
+        llvm::BasicBlock* push = llvm::BasicBlock::Create(context, "push", acquire);
+        llvm::BasicBlock* lookup = llvm::BasicBlock::Create(context, "lookup", acquire);
+        llvm::BasicBlock* reinit = llvm::BasicBlock::Create(context, "reinit", acquire);
+        llvm::BasicBlock* release = llvm::BasicBlock::Create(context, "release", acquire);
+        llvm::BasicBlock* init = llvm::BasicBlock::Create(context, "init", acquire);
+        llvm::BasicBlock* cached = llvm::BasicBlock::Create(context, "cached", acquire);
+
+        builder.SetInsertPoint(entry);
+        llvm::Value* thread_slot = builder.CreateLoad(builder.getPtrTy(), handle);
+        builder.CreateCondBr(builder.CreateIsNull(thread_slot), allocate, lookup);
+
+        // The first invocation by a thread pushes its slot to the list
+        builder.SetInsertPoint(allocate);
+        llvm::FunctionCallee calloc_func = M->getOrInsertFunction(
+            "calloc", llvm::FunctionType::get(builder.getPtrTy(), {builder.getInt64Ty(), builder.getInt64Ty()}, false)
+        );
+        const llvm::DataLayout& DL = M->getDataLayout();
+        llvm::Value* new_slot = builder.CreateCall(
+            calloc_func, {builder.getInt64(1), builder.getInt64(DL.getTypeAllocSize(slot_type))}
+        );
+        builder.CreateStore(new_slot, handle);
+        builder.CreateBr(push);
+
+        builder.SetInsertPoint(push);
+        llvm::Value* head = builder.CreateLoad(builder.getPtrTy(), slots);
+        builder.CreateStore(head, builder.CreateStructGEP(slot_type, new_slot, 1));
+        llvm::Value* exchange = builder.CreateAtomicCmpXchg(
+            slots, head, new_slot, llvm::MaybeAlign(8),
+            llvm::AtomicOrdering::AcquireRelease, llvm::AtomicOrdering::Monotonic
+        );
+        builder.CreateCondBr(builder.CreateExtractValue(exchange, 1), lookup, push);
+
+        // Re-use the state if it was initialized for the same symbols
+        builder.SetInsertPoint(lookup);
+        llvm::PHINode* slot = builder.CreatePHI(builder.getPtrTy(), 2);
+        slot->addIncoming(thread_slot, entry);
+        slot->addIncoming(new_slot, push);
+        llvm::Value* state_ptr = builder.CreateStructGEP(slot_type, slot, 0);
+        llvm::Value* state = builder.CreateLoad(sdfg_type_ptr, state_ptr);
+        llvm::Value* valid = builder.CreateIsNotNull(state);
+        for (size_t i = 0; i < cached_symbols.size(); i++) {
+            llvm::Value* symbol = acquire->getArg(i);
+            llvm::Value* cached_symbol = builder.CreateLoad(symbol->getType(), cached_symbols[i]);
+            valid = builder.CreateAnd(valid, builder.CreateICmpEQ(cached_symbol, symbol));
+        }
+        builder.CreateCondBr(valid, cached, reinit);
+
+        builder.SetInsertPoint(cached);
+        builder.CreateRet(state);
+
+        builder.SetInsertPoint(reinit);
+        builder.CreateCondBr(builder.CreateIsNull(state), init, release);
+
+        builder.SetInsertPoint(release);
+        builder.CreateCall(exit_func, {state});
+        builder.CreateBr(init);
+
+        builder.SetInsertPoint(init);
+        std::vector<llvm::Value*> symbols;
+        for (auto& arg : acquire->args()) {
+            symbols.push_back(&arg);
+        }
+        llvm::Value* new_state = builder.CreateCall(init_func, symbols);
+        builder.CreateStore(new_state, state_ptr);
+        for (size_t i = 0; i < cached_symbols.size(); i++) {
+            builder.CreateStore(symbols[i], cached_symbols[i]);
+        }
+        builder.CreateRet(new_state);
+
+        // Release the states of all threads at exit
+        llvm::FunctionType* dtor_type = llvm::FunctionType::get(llvm::Type::getVoidTy(context), false);
+        llvm::Function* dtor = llvm::Function::Create(
+            dtor_type, llvm::Function::InternalLinkage, "daisy_release_" + sdfg_name, M
+        );
+        llvm::BasicBlock* dtor_entry = llvm::BasicBlock::Create(context, "entry", dtor);
+        llvm::BasicBlock* dtor_loop = llvm::BasicBlock::Create(context, "loop", dtor);
+        llvm::BasicBlock* dtor_release = llvm::BasicBlock::Create(context, "release", dtor);
+        llvm::BasicBlock* dtor_free = llvm::BasicBlock::Create(context, "free", dtor);
+        llvm::BasicBlock* dtor_next = llvm::BasicBlock::Create(context, "next", dtor);
+        llvm::BasicBlock* dtor_exit = llvm::BasicBlock::Create(context, "exit", dtor);
+
+        builder.SetInsertPoint(dtor_entry);
+        llvm::Value* first = builder.CreateLoad(builder.getPtrTy(), slots);
+        builder.CreateStore(llvm::ConstantPointerNull::get(builder.getPtrTy()), slots);
+        builder.CreateBr(dtor_loop);
+
+        builder.SetInsertPoint(dtor_loop);
+        llvm::PHINode* current = builder.CreatePHI(builder.getPtrTy(), 2);
+        current->addIncoming(first, dtor_entry);
+        builder.CreateCondBr(builder.CreateIsNull(current), dtor_exit, dtor_release);
+
+        builder.SetInsertPoint(dtor_release);
+        llvm::Value* final_state_ptr = builder.CreateStructGEP(slot_type, current, 0);
+        llvm::Value* final_state = builder.CreateLoad(sdfg_type_ptr, final_state_ptr);
+        builder.CreateCondBr(builder.CreateIsNull(final_state), dtor_next, dtor_free);
+
+        builder.SetInsertPoint(dtor_free);
+        builder.CreateCall(exit_func, {final_state});
+        builder.CreateStore(llvm::ConstantPointerNull::get(sdfg_type_ptr), final_state_ptr);
+        builder.CreateBr(dtor_next);
+
+        builder.SetInsertPoint(dtor_next);
+        llvm::Value* next = builder.CreateLoad(builder.getPtrTy(), builder.CreateStructGEP(slot_type, current, 1));
+        current->addIncoming(next, dtor_next);
+        builder.CreateBr(dtor_loop);
+
+        builder.SetInsertPoint(dtor_exit);
+        builder.CreateRetVoid();
+
+        llvm::appendToGlobalDtors(*M, dtor, 65535);
+        return acquire;
+    }
+
+    /**
+     * Declares the functions of the SDFG and calls them in the block, which then branches to the exit.
+     * The state of the SDFG is cached across invocations of the scop (see createStateCache).
+    */
+    static void createSDFGCall(
+        polly::Scop& S,
+        const std::string& sdfg_name,
+        const llvm::json::Array* symbols,
+        const std::vector<polly::ScopArrayInfo*>& arrays,
+        const std::vector<polly::ScopArrayInfo*>& scalars,
+        llvm::BasicBlock* block,
+        llvm::BasicBlock* exit_block
+    ) {
+        llvm::LLVMContext& context = S.getFunction().getContext();
+        llvm::Module* current_module = S.getFunction().getParent();
+
+        llvm::BranchInst* end = llvm::BranchInst::Create(exit_block, block);
+        llvm::IRBuilder<> builder(end);
+        std::vector<llvm::Value*> symbol_vals = getSymbolValues(S, symbols, end);
+
+        // Declare SDFG functions
+        llvm::StructType* sdfg_type = llvm::StructType::create(context, sdfg_name);
+        llvm::PointerType* sdfg_type_ptr = llvm::PointerType::getUnqual(sdfg_type);
+
+        // Init SDFG
+        std::vector<llvm::Type*> init_args;
+        for (auto value : symbol_vals) {
+            init_args.push_back(value->getType());
+        }
+        llvm::FunctionType *init_sdfg_func_type = llvm::FunctionType::get(sdfg_type_ptr, init_args, false);
+        llvm::Function *init_sdfg_func_decl = llvm::Function::Create(init_sdfg_func_type, llvm::Function::ExternalLinkage, "__dace_init_" + sdfg_name, current_module);
+
+        // Exit SDFG
+        std::vector<llvm::Type*> exit_args = {
+            sdfg_type_ptr
+        };
+        llvm::FunctionType *exit_sdfg_func_type = llvm::FunctionType::get(llvm::Type::getVoidTy(context), exit_args, false);
+        llvm::Function *exit_sdfg_func_decl = llvm::Function::Create(exit_sdfg_func_type, llvm::Function::ExternalLinkage, "__dace_exit_" + sdfg_name, current_module);
+
+        // Program
+        std::vector<llvm::Type*> program_args = {
+            // State
+            sdfg_type_ptr,
+        };
+        for (auto SAI : arrays) {
+            program_args.push_back(SAI->getBasePtr()->getType());
+        }
+        for (auto SAI : scalars) {
+            program_args.push_back(SAI->getBasePtr()->getType());
+        }
+        for (auto value : symbol_vals) {
+            program_args.push_back(value->getType());
+        }
+        llvm::FunctionType *program_sdfg_func_type = llvm::FunctionType::get(llvm::Type::getVoidTy(context), program_args, false);
+        llvm::Function *program_sdfg_func_decl = llvm::Function::Create(program_sdfg_func_type, llvm::Function::ExternalLinkage, "__program_" + sdfg_name, current_module);
+
+        llvm::Function* acquire_func = createStateCache(
+            current_module, sdfg_name, sdfg_type_ptr, init_sdfg_func_decl, exit_sdfg_func_decl
+        );
+        llvm::CallInst* state = builder.CreateCall(acquire_func, symbol_vals, sdfg_name + "_state");
+
+        std::vector<llvm::Value*> program_vals = {
+            state
+        };
+        for (auto SAI : arrays) {
+            program_vals.push_back(SAI->getBasePtr());
+        }
+        for (auto SAI : scalars) {
+            program_vals.push_back(SAI->getBasePtr());
+        }
+        for (auto value : symbol_vals) {
+            program_vals.push_back(value);
+        }
+        llvm::CallInst* program_call = builder.CreateCall(program_sdfg_func_decl, program_vals);
+    }
+
     static bool can_be_applied(polly::Scop& S) {
         if (hasEscapingValue(S)) {
             llvm::errs() << "has escaping value\n";
@@ -168,25 +1015,6 @@ public:
         sdfg_name.erase(std::remove(sdfg_name.begin(), sdfg_name.end(), '%'), sdfg_name.end());
         std::replace(sdfg_name.begin(), sdfg_name.end(), '-', '_');
 
-        // Declare SDFG functions
-        llvm::StructType* sdfg_type = llvm::StructType::create(context, sdfg_name);
-        llvm::PointerType* sdfg_type_ptr = llvm::PointerType::getUnqual(sdfg_type);
-
-        // Init SDFG
-        std::vector<llvm::Type*> init_args;
-        for (auto& param : S.parameters()) {
-            init_args.push_back(param->getType());
-        }
-        llvm::FunctionType *init_sdfg_func_type = llvm::FunctionType::get(sdfg_type_ptr, init_args, false);
-        llvm::Function *init_sdfg_func_decl = llvm::Function::Create(init_sdfg_func_type, llvm::Function::ExternalLinkage, "__dace_init_" + sdfg_name, current_module);
-
-        // Exit SDFG
-        std::vector<llvm::Type*> exit_args = {
-            sdfg_type_ptr
-        };
-        llvm::FunctionType *exit_sdfg_func_type = llvm::FunctionType::get(llvm::Type::getVoidTy(context), exit_args, false);
-        llvm::Function *exit_sdfg_func_decl = llvm::Function::Create(exit_sdfg_func_type, llvm::Function::ExternalLinkage, "__dace_exit_" + sdfg_name, current_module);
-
         std::vector<polly::ScopArrayInfo*> arrays;
         for (auto SAI : S.arrays()) {
             if (SAI->getKind() != polly::MemoryKind::Array)
@@ -209,83 +1037,92 @@ public:
             return t1->getName() < t2->getName();
         });
 
-        // Program
-        std::vector<llvm::Type*> program_args = {
-            // State
-            sdfg_type_ptr,
-        };
-        for (auto SAI : arrays) {
-            program_args.push_back(SAI->getBasePtr()->getType());
-        }
-        for (auto SAI : scalars) {
-            program_args.push_back(SAI->getBasePtr()->getType());
-        }
-        for (auto& param : S.parameters()) {
-            program_args.push_back(param->getType());
-        }
-        llvm::FunctionType *program_sdfg_func_type = llvm::FunctionType::get(llvm::Type::getVoidTy(context), program_args, false);
-        llvm::Function *program_sdfg_func_decl = llvm::Function::Create(program_sdfg_func_type, llvm::Function::ExternalLinkage, "__program_" + sdfg_name, current_module);
+        std::optional<llvm::json::Value> metadata = readMetadata(sdfg_name);
+        const llvm::json::Object* root = metadata ? metadata->getAsObject() : nullptr;
+        const llvm::json::Array* symbols = root ? root->getArray("symbols") : nullptr;
 
         // // Re-direct entering and exiting blocks
         llvm::BasicBlock* entering_block = S.getEnteringBlock();
         llvm::BasicBlock* exiting_block = S.getExitingBlock();
         llvm::BasicBlock* exit_block = S.getExit();
 
-        // Create new IRBuilder for adding calls to SDFG
-        llvm::BasicBlock* daceblock = llvm::BasicBlock::Create(context, "daceblock", &function); 
-        llvm::IRBuilder<> builder(daceblock);
-        builder.SetInsertPoint(daceblock);
+        // Create new blocks for adding calls to SDFG. A parametric SDFG may come with
+        // a fast path specialized for the array sizes known at compile time
+        llvm::BasicBlock* daceblock = llvm::BasicBlock::Create(context, "daceblock", &function);
+        std::vector<llvm::BasicBlock*> sdfg_blocks;
 
-        std::vector<llvm::Value*> init_vals;
-        for (auto& param : S.parameters()) {
-            llvm::Value* value = nullptr;
-            const llvm::SCEVUnknown* unknown = llvm::dyn_cast_or_null<llvm::SCEVUnknown>(param);
-            if (unknown) {
-                value = unknown->getValue();
-            } else {
-                const llvm::SCEVAddRecExpr* rec = llvm::dyn_cast_or_null<llvm::SCEVAddRecExpr>(param);
-                value = rec->getLoop()->getInductionVariable(*S.getSE());
-            }
-            init_vals.push_back(value);
-        }
-        llvm::CallInst* init_call = builder.CreateCall(init_sdfg_func_decl, init_vals, sdfg_name + "_state");
+        const llvm::json::Object* fast_path = root ? root->getObject("fast_path") : nullptr;
+        if (fast_path && fast_path->getString("sdfg")) {
+            llvm::BasicBlock* fastblock = llvm::BasicBlock::Create(context, "fastblock", &function);
+            llvm::BasicBlock* parametricblock = llvm::BasicBlock::Create(context, "parametricblock", &function);
+            llvm::BranchInst* dispatch = llvm::BranchInst::Create(parametricblock, daceblock);
+            llvm::Value* guard = createSizeGuard(S, fast_path->getArray("sizes"), dispatch);
+            if (guard) {
+                llvm::BranchInst::Create(fastblock, parametricblock, guard, dispatch);
+                dispatch->eraseFromParent();
 
-        std::vector<llvm::Value*> program_vals = {
-            init_call
-        };
-        for (auto SAI : arrays) {
-            program_vals.push_back(SAI->getBasePtr());
-        }
-        for (auto SAI : scalars) {
-            program_vals.push_back(SAI->getBasePtr());
-        }
-        for (auto& param : S.parameters()) {
-            llvm::Value* value = nullptr;
-            const llvm::SCEVUnknown* unknown = llvm::dyn_cast_or_null<llvm::SCEVUnknown>(param);
-            if (unknown) {
-                value = unknown->getValue();
+                std::string fast_name = fast_path->getString("sdfg")->str();
+                createSDFGCall(S, fast_name, fast_path->getArray("symbols"), arrays, scalars, fastblock, exit_block);
+                sdfg_blocks.push_back(fastblock);
+                llvm::errs() << "Dispatching between specialized and parametric SDFG\n";
             } else {
-                const llvm::SCEVAddRecExpr* rec = llvm::dyn_cast_or_null<llvm::SCEVAddRecExpr>(param);
-                value = rec->getLoop()->getInductionVariable(*S.getSE());
+                fastblock->eraseFromParent();
             }
-            program_vals.push_back(value);
+
+            createSDFGCall(S, sdfg_name, symbols, arrays, scalars, parametricblock, exit_block);
+            sdfg_blocks.push_back(parametricblock);
+        } else {
+            createSDFGCall(S, sdfg_name, symbols, arrays, scalars, daceblock, exit_block);
+            sdfg_blocks.push_back(daceblock);
         }
-        llvm::CallInst* program_call = builder.CreateCall(program_sdfg_func_decl, program_vals);
 
-        std::vector<llvm::Value*> exit_vals = {
-            init_call
-        };
-        llvm::CallInst* exit_call = builder.CreateCall(exit_sdfg_func_decl, exit_vals);
+        // Connect entry to daceblock. If the SDFG is guarded or the arrays may alias,
+        // dispatch between the daceblock and the original region (multi-versioning)
+        llvm::BasicBlock* entry_block = S.getEntry();
+        llvm::BasicBlock* dispatchblock = llvm::BasicBlock::Create(context, "dispatchblock", &function);
+        llvm::BasicBlock* aliasblock = llvm::BasicBlock::Create(context, "aliasblock", &function);
+        llvm::BranchInst* dispatch = llvm::BranchInst::Create(aliasblock, dispatchblock);
+        llvm::BranchInst* alias_dispatch = llvm::BranchInst::Create(daceblock, aliasblock);
+        llvm::Value* guard = createGuard(S, root, dispatch);
+        llvm::Value* noalias = createAliasCheck(S, alias_dispatch);
+        if (guard || noalias) {
+            llvm::BasicBlock* originalblock = llvm::BasicBlock::Create(context, "originalblock", &function);
+            llvm::BranchInst::Create(entry_block, originalblock);
 
-        // Connect entry to daceblock
-        entering_block->getTerminator()->setSuccessor(0, daceblock);
+            std::vector<std::pair<std::string, llvm::GlobalVariable*>> counters;
+            counters.push_back({"sdfg", createCounter(current_module, "daisy_sdfg_" + sdfg_name, daceblock)});
+            counters.push_back({"original", createCounter(current_module, "daisy_original_" + sdfg_name, originalblock)});
+            if (guard) {
+                llvm::BranchInst::Create(aliasblock, originalblock, guard, dispatch);
+                dispatch->eraseFromParent();
+            }
+            if (noalias) {
+                // Overlapping arrays are processed by the original region
+                llvm::BasicBlock* overlapblock = llvm::BasicBlock::Create(context, "overlapblock", &function);
+                llvm::BranchInst::Create(originalblock, overlapblock);
+                llvm::BranchInst::Create(daceblock, overlapblock, noalias, alias_dispatch);
+                alias_dispatch->eraseFromParent();
+                counters.push_back({"overlap", createCounter(current_module, "daisy_overlap_" + sdfg_name, overlapblock)});
+            }
+            createReport(current_module, sdfg_name, counters);
+
+            entering_block->getTerminator()->setSuccessor(0, dispatchblock);
+            entry_block->replacePhiUsesWith(entering_block, originalblock);
+            llvm::errs() << "Dispatching between SDFG and original region\n";
+        } else {
+            dispatchblock->eraseFromParent();
+            aliasblock->eraseFromParent();
+            entering_block->getTerminator()->setSuccessor(0, daceblock);
+        }
 
-        // Connect daceblock to exit
-        llvm::BranchInst *end = builder.CreateBr(exit_block);
+        // Connect SDFG calls to exit
         for (auto& phi : exit_block->phis()) {
             for (int i = 0; i < phi.getNumIncomingValues(); i++) {
                 if (phi.getIncomingBlock(i) == exiting_block) {
-                    phi.addIncoming(phi.getIncomingValue(i), daceblock);
+                    llvm::Value* value = phi.getIncomingValue(i);
+                    for (auto block : sdfg_blocks) {
+                        phi.addIncoming(value, block);
+                    }
                     break;
                 }
             }
@@ -0,0 +1,294 @@
+"""
+Measures the memory traffic of a set of scops with and without loop fusion.
+
+The traffic is modeled by the footprint of each outermost loop nest of the
+scop's AST, i.e., every array accessed by a loop nest is streamed through
+memory once. This is the traffic of loop nests whose footprint exceeds the
+caches. Fusion removes the loads of intermediate arrays consumed by the
+fused loop while their elements are still cached.
+
+    python benchmarks/fusion.py
+"""
+import argparse
+import islpy as isl
+
+from typing import Dict, List, Tuple
+
+from scop2sdfg.scop.scop import Scop
+
+N = 1 << 22
+M = 2048
+
+
+def _statement(
+    name: str,
+    sizes: List[int],
+    reads: List[Tuple[str, str, str]],
+    write: Tuple[str, str, str],
+) -> Dict:
+    iterators = [f"i{d}" for d in range(len(sizes))]
+    tuple_ = name + "[" + ", ".join(iterators) + "]"
+    domain = " and ".join(
+        f"0 <= {it} <= {size - 1}" for it, size in zip(iterators, sizes)
+    )
+
+    accesses = [
+        {
+            "kind": "read",
+            "relation": "{ " + tuple_ + " -> " + array + "[" + index + "] }",
+            "access_instruction": f"  {ref} = load double, ptr %p{ref[1:]}, align 8",
+            "incoming_value": "",
+        }
+        for ref, array, index in reads
+    ]
+    array, index, value = write
+    accesses.append(
+        {
+            "kind": "write",
+            "relation": "{ " + tuple_ + " -> " + array + "[" + index + "] }",
+            "access_instruction": f"  store double {value.split('=')[0].strip()}, ptr %out, align 8",
+            "incoming_value": "  " + value,
+        }
+    )
+
+    return {
+        "name": name,
+        "domain": "{ " + tuple_ + " : " + domain + " }",
+        "affine": True,
+        "loops": [
+            {
+                "induction_variable": f"  %iv{d} = phi i64 [ 0, %entry ], [ %iv{d}.next, %for.inc ]"
+            }
+            for d in range(len(sizes))
+        ],
+        "accesses": accesses,
+    }
+
+
+def _jscop(
+    arrays: Dict[str, List[int]],
+    statements: List[Dict],
+    instructions: List[str],
+    dependencies: str,
+) -> Dict:
+    # Consecutive loop nests in the order of the statements
+    schedule = []
+    for k, statement in enumerate(statements):
+        tuple_ = statement["domain"].split(":")[0].strip("{ ")
+        iterators = tuple_[tuple_.index("[") + 1 : -1]
+        schedule.append(f"{tuple_} -> [{k}, {iterators}]")
+
+    return {
+        "name": "%for.body---%for.end",
+        "context": "{  :  }",
+        "parameters": [],
+        "arrays": [
+            {
+                "kind": "array",
+                "name": name,
+                "sizes": ["*"] + [str(size) for size in shape[1:]],
+                "type": "double",
+                "variable": f"ptr %{name}",
+            }
+            for name, shape in arrays.items()
+        ],
+        "instructions": "\\n".join("  " + inst for inst in instructions),
+        "dependencies": {
+            "RAW": dependencies,
+            "WAR": "{  }",
+            "WAW": "{  }",
+            "RED": "{  }",
+            "TC_RED": "{  }",
+        },
+        "schedule": "{ " + "; ".join(schedule) + " }",
+        "statements": statements,
+        "access_range": [],
+    }
+
+
+KERNELS = {
+    # B[i] = A[i] + 1; C[i] = 2 * B[i]
+    "chain": _jscop(
+        {"MemRef0": [N], "MemRef1": [N], "MemRef2": [N]},
+        [
+            _statement(
+                "Stmt0",
+                [N],
+                [("%0", "MemRef0", "i0")],
+                ("MemRef1", "i0", "%add = fadd double %0, 1.000000e+00"),
+            ),
+            _statement(
+                "Stmt1",
+                [N],
+                [("%1", "MemRef1", "i0")],
+                ("MemRef2", "i0", "%mul = fmul double 2.000000e+00, %1"),
+            ),
+        ],
+        [
+            "%add = fadd double %0, 1.000000e+00",
+            "%mul = fmul double 2.000000e+00, %1",
+        ],
+        f"{{ Stmt0[i0] -> Stmt1[i0] : 0 <= i0 <= {N - 1} }}",
+    ),
+    # B[i] = A[i] + 1; C[i] = 2 * B[i]; D[i] = B[i] + C[i]
+    "chain3": _jscop(
+        {"MemRef0": [N], "MemRef1": [N], "MemRef2": [N], "MemRef3": [N]},
+        [
+            _statement(
+                "Stmt0",
+                [N],
+                [("%0", "MemRef0", "i0")],
+                ("MemRef1", "i0", "%add = fadd double %0, 1.000000e+00"),
+            ),
+            _statement(
+                "Stmt1",
+                [N],
+                [("%1", "MemRef1", "i0")],
+                ("MemRef2", "i0", "%mul = fmul double 2.000000e+00, %1"),
+            ),
+            _statement(
+                "Stmt2",
+                [N],
+                [("%2", "MemRef1", "i0"), ("%3", "MemRef2", "i0")],
+                ("MemRef3", "i0", "%sum = fadd double %2, %3"),
+            ),
+        ],
+        [
+            "%add = fadd double %0, 1.000000e+00",
+            "%mul = fmul double 2.000000e+00, %1",
+            "%sum = fadd double %2, %3",
+        ],
+        f"{{ Stmt0[i0] -> Stmt1[i0] : 0 <= i0 <= {N - 1}; "
+        + f"Stmt0[i0] -> Stmt2[i0] : 0 <= i0 <= {N - 1}; "
+        + f"Stmt1[i0] -> Stmt2[i0] : 0 <= i0 <= {N - 1} }}",
+    ),
+    # B[i][j] = A[i][j] + 1; C[i][j] = 2 * B[i][j]
+    "chain2d": _jscop(
+        {"MemRef0": [M, M], "MemRef1": [M, M], "MemRef2": [M, M]},
+        [
+            _statement(
+                "Stmt0",
+                [M, M],
+                [("%0", "MemRef0", "i0, i1")],
+                ("MemRef1", "i0, i1", "%add = fadd double %0, 1.000000e+00"),
+            ),
+            _statement(
+                "Stmt1",
+                [M, M],
+                [("%1", "MemRef1", "i0, i1")],
+                ("MemRef2", "i0, i1", "%mul = fmul double 2.000000e+00, %1"),
+            ),
+        ],
+        [
+            "%add = fadd double %0, 1.000000e+00",
+            "%mul = fmul double 2.000000e+00, %1",
+        ],
+        f"{{ Stmt0[i0, i1] -> Stmt1[i0, i1] : 0 <= i0 <= {M - 1} and 0 <= i1 <= {M - 1} }}",
+    ),
+    # B[i] = A[i] + 1; C[i] = 2 * B[i + 1]: Not fused, the consumer reads ahead
+    "shifted": _jscop(
+        {"MemRef0": [N], "MemRef1": [N], "MemRef2": [N]},
+        [
+            _statement(
+                "Stmt0",
+                [N],
+                [("%0", "MemRef0", "i0")],
+                ("MemRef1", "i0", "%add = fadd double %0, 1.000000e+00"),
+            ),
+            _statement(
+                "Stmt1",
+                [N - 1],
+                [("%1", "MemRef1", "1 + i0")],
+                ("MemRef2", "i0", "%mul = fmul double 2.000000e+00, %1"),
+            ),
+        ],
+        [
+            "%add = fadd double %0, 1.000000e+00",
+            "%mul = fmul double 2.000000e+00, %1",
+        ],
+        f"{{ Stmt0[i0] -> Stmt1[-1 + i0] : 1 <= i0 <= {N - 1} }}",
+    ),
+}
+
+
+def _loop_nests(ast: isl.AstNode) -> List[List[str]]:
+    # The statements of each outermost loop nest
+    if ast.get_type() != isl.ast_node_type.block:
+        return [_statements(ast)]
+
+    children = ast.block_get_children()
+    return [
+        nest
+        for i in range(children.n_ast_node())
+        for nest in _loop_nests(children.get_at(i))
+    ]
+
+
+def _statements(node: isl.AstNode) -> List[str]:
+    if node.get_type() == isl.ast_node_type.user:
+        return [node.user_get_expr().get_op_arg(0).to_C_str()]
+    if node.get_type() == isl.ast_node_type.for_:
+        return _statements(node.for_get_body())
+    if node.get_type() == isl.ast_node_type.if_:
+        statements = _statements(node.if_get_then_node())
+        if node.if_has_else_node():
+            statements += _statements(node.if_get_else_node())
+        return statements
+
+    children = node.block_get_children()
+    return [
+        stmt
+        for i in range(children.n_ast_node())
+        for stmt in _statements(children.get_at(i))
+    ]
+
+
+def memory_traffic(scop: Scop) -> Tuple[int, int]:
+    """
+    Models the bytes transferred by the loop nests of the scop.
+
+    :return: The number of loop nests and their bytes
+    """
+    nests = _loop_nests(scop.ast)
+
+    traffic = 0
+    for statements in nests:
+        footprints: Dict[str, isl.UnionSet] = {}
+        for stmt in statements:
+            for access in scop._memory_accesses[stmt].values():
+                if scop._memrefs[access.array].kind != "array":
+                    continue
+
+                elements = access.relation.range()
+                if access.array in footprints:
+                    elements = footprints[access.array].union(elements)
+                footprints[access.array] = elements
+
+        for array, elements in footprints.items():
+            count = elements.as_set().count_val().to_python()
+            traffic += count * scop._memrefs[array].dtype.bytes
+
+    return len(nests), traffic
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.parse_args()
+
+    print(
+        f"{'kernel':<10} {'nests':>6} {'before [MB]':>12} "
+        + f"{'nests':>6} {'after [MB]':>12} {'reduction':>10}"
+    )
+    for name, desc in KERNELS.items():
+        before = memory_traffic(Scop.from_json(name + ".c", desc))
+        after = memory_traffic(Scop.from_json(name + ".c", desc, fusion=True))
+
+        reduction = 1.0 - after[1] / before[1]
+        print(
+            f"{name:<10} {before[0]:>6} {before[1] / 1e6:>12.1f} "
+            + f"{after[0]:>6} {after[1] / 1e6:>12.1f} {reduction:>10.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
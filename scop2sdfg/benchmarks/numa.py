@@ -0,0 +1,128 @@
+"""
+Measures the scaling of a bandwidth-bound SDFG with and without NUMA mode.
+
+A STREAM-like triad is computed repeatedly on transient arrays, which are
+filled by copies from the arguments, i.e., by the master thread. In NUMA
+mode, the transients are first touched by parallel maps and the threads of
+the parallel regions are bound to the places of OMP_PLACES.
+
+    OMP_PLACES=cores python benchmarks/numa.py --size=67108864
+"""
+import os
+import time
+import ctypes
+import argparse
+import dace
+import numpy as np
+
+from pathlib import Path
+
+from dace.codegen import compiler
+from dace.codegen.codegen import generate_code
+
+from scop2sdfg.codegen.openmp import (
+    apply_first_touch,
+    apply_openmp_policy,
+    bind_parallel_regions,
+)
+
+N = dace.symbol("N")
+R = dace.symbol("R")
+
+
+@dace.program
+def triad(X: dace.float64[N], Y: dace.float64[N], Z: dace.float64[N]):
+    A = np.ndarray([N], dtype=np.float64)
+    B = np.ndarray([N], dtype=np.float64)
+    C = np.ndarray([N], dtype=np.float64)
+    A[:] = X
+    B[:] = Y
+    for _ in range(R):
+        for i in dace.map[0:N]:
+            C[i] = A[i] + 3.0 * B[i]
+        for i in dace.map[0:N]:
+            A[i] = B[i] + 3.0 * C[i]
+    Z[:] = A
+
+
+def build(numa: bool, proc_bind: str, folder: Path):
+    sdfg = triad.to_sdfg(simplify=True)
+    sdfg.name = "triad_numa" if numa else "triad"
+    sdfg.build_folder = str(folder / sdfg.name)
+    sdfg.openmp_sections = False
+
+    dace.sdfg.infer_types.infer_connector_types(sdfg)
+    dace.sdfg.infer_types.set_default_schedule_and_storage_types(sdfg, None)
+    apply_openmp_policy(sdfg)
+    if numa:
+        apply_first_touch(sdfg)
+
+    sdfg.fill_scope_connectors()
+    code_objects = generate_code(sdfg)
+    if numa:
+        for obj in code_objects:
+            if obj.target.target_name == "cpu":
+                obj.code = bind_parallel_regions(obj.code, proc_bind)
+
+    program_folder = compiler.generate_program_folder(
+        sdfg, code_objects, sdfg.build_folder
+    )
+    library = compiler.configure_and_compile(program_folder, sdfg.name)
+    return compiler.get_program_handle(library, sdfg)
+
+
+def thread_counts():
+    cores = os.cpu_count()
+    counts = [1]
+    while counts[-1] * 2 < cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--size", type=int, default=1 << 24)
+    parser.add_argument("--repetitions", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument(
+        "--proc-bind", choices=["close", "spread", "primary"], default="spread"
+    )
+    parser.add_argument("--build", type=str, default=".benchmarks/numa")
+    args = parser.parse_args()
+
+    dace.Config.set("compiler", "build_type", value="Release")
+    programs = {
+        numa: build(numa, args.proc_bind, Path(args.build)) for numa in (False, True)
+    }
+
+    # The ICV of the calling thread determines the size of the parallel regions
+    openmp = ctypes.CDLL("libgomp.so.1")
+
+    X = np.random.rand(args.size)
+    Y = np.random.rand(args.size)
+    Z = np.zeros(args.size)
+
+    print(f"{'threads':>8} {'default [s]':>12} {'numa [s]':>12} {'speedup':>8}")
+    for threads in thread_counts():
+        openmp.omp_set_num_threads(threads)
+
+        runtimes = {}
+        for numa, program in programs.items():
+            best = None
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                program(X=X, Y=Y, Z=Z, N=args.size, R=args.repetitions)
+                runtime = time.perf_counter() - start
+                best = runtime if best is None else min(best, runtime)
+            runtimes[numa] = best
+
+        speedup = runtimes[False] / runtimes[True]
+        print(
+            f"{threads:>8} {runtimes[False]:>12.4f} {runtimes[True]:>12.4f} {speedup:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+// B[i] = B[i] + 2 * A[i]
+void reference(double *restrict A, double *restrict B) {
+    for (long i = 0; i < 1048576; i++)
+        B[i] = B[i] + 2.0 * A[i];
+}
@@ -0,0 +1,7 @@
+// B[i] = A[i] + 1; C[i] = 2 * B[i]
+void reference(double *restrict A, double *restrict B, double *restrict C) {
+    for (long i = 0; i < 1048576; i++)
+        B[i] = A[i] + 1.0;
+    for (long i = 0; i < 1048576; i++)
+        C[i] = 2.0 * B[i];
+}
@@ -0,0 +1,7 @@
+// s = 0; for (i) s += A[i] * B[i]; B[0] = s
+void reference(double *restrict A, double *restrict B) {
+    double s = 0.0;
+    for (long i = 0; i < 1048576; i++)
+        s = A[i] * B[i] + s;
+    B[0] = s;
+}
@@ -0,0 +1,5 @@
+// B[i] = 2 * A[P[i]]
+void reference(long *restrict P, double *restrict A, double *restrict B) {
+    for (long i = 0; i < 1048576; i++)
+        B[i] = A[P[i]] * 2.0;
+}
@@ -0,0 +1,6 @@
+// C[i] = C[i] + A[i][j] * B[j]
+void reference(double (*restrict A)[1024], double *restrict B, double *restrict C) {
+    for (long i = 0; i < 1024; i++)
+        for (long j = 0; j < 1024; j++)
+            C[i] = C[i] + A[i][j] * B[j];
+}
@@ -0,0 +1,5 @@
+// B[P[i]] += 1
+void reference(double *restrict B, long *restrict P) {
+    for (long i = 0; i < 1048576; i++)
+        B[P[i]] += 1.0;
+}
@@ -0,0 +1,5 @@
+// B[i] = (A[i - 1] + A[i] + A[i + 1]) * 0.33333
+void reference(double *restrict A, double *restrict B) {
+    for (long i = 1; i < 1048575; i++)
+        B[i] = (A[i - 1] + A[i] + A[i + 1]) * 0.33333;
+}
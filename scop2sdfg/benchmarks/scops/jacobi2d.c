@@ -0,0 +1,6 @@
+// B[i][j] = (A[i][j] + A[i - 1][j] + A[i + 1][j] + A[i][j - 1] + A[i][j + 1]) * 0.2
+void reference(double (*restrict A)[1024], double (*restrict B)[1024]) {
+    for (long i = 1; i < 1023; i++)
+        for (long j = 1; j < 1023; j++)
+            B[i][j] = (A[i][j] + A[i - 1][j] + A[i + 1][j] + A[i][j - 1] + A[i][j + 1]) * 0.2;
+}
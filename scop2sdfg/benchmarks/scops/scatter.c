@@ -0,0 +1,5 @@
+// B[P[i]] = 2 * A[i]
+void reference(long *restrict P, double *restrict A, double *restrict B) {
+    for (long i = 0; i < 1048576; i++)
+        B[P[i]] = A[i] * 2.0;
+}
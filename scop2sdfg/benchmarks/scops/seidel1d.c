@@ -0,0 +1,5 @@
+// A[i] = (A[i - 1] + A[i] + A[i + 1]) * 0.33333
+void reference(double *restrict A) {
+    for (long i = 1; i < 65535; i++)
+        A[i] = (A[i - 1] + A[i] + A[i + 1]) * 0.33333;
+}
@@ -0,0 +1,472 @@
+"""
+Measures the lifting latency and the speedup of the SDFGs of a corpus of scops.
+
+Each JScop of benchmarks/scops is lifted stage by stage as by the CLI and
+the time of each stage is recorded. The SDFGs are compiled and run against
+the reference loops of the scop written in C, compiled with the same flags.
+The report is written as JSON and may be compared to the report of another
+commit. The corpus is listed in benchmarks/scops/corpus.json with the sizes
+of the arrays accessed indirectly and the ranges of the index arrays, or the
+index arrays filled by permutations.
+
+Kernels with an inspector of indirect writes are also run without it. The
+inspected SDFG must not be slower than this sequential fallback.
+
+The normalization and transfer tuning of daisytuner are not part of the
+pipeline, the corpus runs offline.
+
+    python benchmarks/suite.py --cflags="-O3 -march=native" --output=report.json
+    python benchmarks/suite.py --baseline=main.json
+    python benchmarks/suite.py --compare main.json report.json
+"""
+import os
+import sys
+import json
+import time
+import ctypes
+import argparse
+import platform
+import subprocess
+import dace
+import numpy as np
+
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from dace.codegen import compiler
+from dace.codegen.codegen import generate_code
+from dace.libraries.standard import Reduce
+from dace.sdfg.utils import inline_loop_blocks
+
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.scop.analysis import estimate_work
+from scop2sdfg.codegen.generator import Generator
+from scop2sdfg.codegen.analysis import infer_shape
+from scop2sdfg.codegen.lifetimes import optimize_lifetimes
+from scop2sdfg.codegen.openmp import apply_openmp_policy
+
+CORPUS = Path(__file__).parent / "scops"
+
+FRONTEND = ["parse", "validate", "analysis", "lift"]
+BACKEND = ["specialize", "schedule", "codegen", "compile"]
+
+
+def load_corpus(names: List[str] = None) -> Dict[str, Dict]:
+    with open(CORPUS / "corpus.json", "r") as handle:
+        corpus = json.load(handle)
+
+    if names:
+        unknown = set(names).difference(corpus)
+        if unknown:
+            raise ValueError(f"Unknown kernels {', '.join(sorted(unknown))}")
+        corpus = {name: corpus[name] for name in names}
+
+    for name, entry in corpus.items():
+        with open(CORPUS / f"{name}.json", "r") as handle:
+            entry["jscop"] = json.load(handle)
+        entry["reference"] = CORPUS / f"{name}.c"
+
+    return corpus
+
+
+def _timed(times: Dict[str, float], stage: str, func: Callable, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    times[stage] = min(times.get(stage, elapsed), elapsed)
+    return result
+
+
+def lift(
+    name: str, jscop: Dict, times: Dict[str, float], schedule: str, inspector=True
+) -> Tuple[Scop, dace.SDFG]:
+    """
+    Parses, validates, analyzes and lifts the scop. The times of the stages
+    are the minimum of all calls.
+    """
+    scop = _timed(times, "parse", Scop.from_json, name + ".c", jscop, fusion=True)
+    _timed(times, "validate", scop.validate)
+    _timed(times, "analysis", estimate_work, scop)
+    sdfg = _timed(
+        times,
+        "lift",
+        Generator.generate,
+        scop,
+        library_nodes=True,
+        scalar_replacement=True,
+        inspector=inspector and schedule == "multicore",
+        reductions=True,
+        parallel_reductions=schedule == "multicore",
+    )
+    return scop, sdfg
+
+
+def specialize(sdfg: dace.SDFG, scop: Scop, sizes: Dict[str, List[int]]) -> None:
+    # Sizes inferred from the access relations or given by the corpus
+    shapes = infer_shape(scop)
+    replacements = {}
+    for name, memref in scop._memrefs.items():
+        if memref.kind != "array":
+            continue
+
+        for i, val in enumerate(memref.shape):
+            if str(val) not in sdfg.free_symbols:
+                continue
+
+            if name in sizes:
+                dim = sizes[name][i]
+            else:
+                bounds = shapes.get(name, [])
+                if i >= len(bounds) or bounds[i] is None:
+                    raise ValueError(f"{scop.name}: size of {name} unknown")
+                dim = int(bounds[i][1])
+            replacements[str(val)] = str(dim)
+
+    sdfg.replace_dict(replacements, replace_keys=False)
+    sdfg.simplify()
+    Generator.validate(sdfg, scop)
+
+
+def apply_schedule(sdfg: dace.SDFG, schedule: str) -> None:
+    # As the CLI without daisytuner's MapSchedule
+    if schedule == "sequential":
+        for node, _ in sdfg.all_nodes_recursive():
+            if isinstance(node, dace.nodes.MapEntry):
+                node.map.schedule = dace.ScheduleType.Sequential
+            elif isinstance(node, Reduce):
+                node.implementation = "pure"
+                node.schedule = dace.ScheduleType.Sequential
+
+    dace.sdfg.infer_types.infer_connector_types(sdfg)
+    dace.sdfg.infer_types.set_default_schedule_and_storage_types(sdfg, None)
+    if schedule == "multicore":
+        apply_openmp_policy(sdfg)
+
+    optimize_lifetimes(sdfg)
+
+
+def generate_program(sdfg: dace.SDFG) -> str:
+    # As in SDFG.compile, without copying the SDFG
+    inline_loop_blocks(sdfg)
+    sdfg.fill_scope_connectors()
+    code_objects = generate_code(sdfg)
+    return compiler.generate_program_folder(sdfg, code_objects, sdfg.build_folder)
+
+
+def build_program(
+    sdfg: dace.SDFG, scop: Scop, entry: Dict, times: Dict[str, float], schedule: str
+) -> Callable:
+    # The backend stages of the lifted SDFG
+    _timed(times, "specialize", specialize, sdfg, scop, entry.get("sizes", {}))
+    _timed(times, "schedule", apply_schedule, sdfg, schedule)
+    folder = _timed(times, "codegen", generate_program, sdfg)
+    library = _timed(
+        times, "compile", compiler.configure_and_compile, folder, sdfg.name
+    )
+    return compiler.get_program_handle(library, sdfg)
+
+
+def has_inspector(sdfg: dace.SDFG) -> bool:
+    return any(
+        isinstance(node, dace.nodes.Tasklet) and node.label == "inspector"
+        for node, _ in sdfg.all_nodes_recursive()
+    )
+
+
+def compile_reference(source: Path, folder: Path, cc: str, cflags: str) -> Callable:
+    folder.mkdir(parents=True, exist_ok=True)
+    library = folder / f"lib{source.stem}_reference.so"
+    subprocess.run(
+        [cc, "-shared", "-fPIC"] + cflags.split() + [str(source), "-o", str(library)],
+        check=True,
+    )
+    return ctypes.CDLL(str(library)).reference
+
+
+def arguments(
+    scop: Scop,
+    sdfg: dace.SDFG,
+    indices: Dict[str, int],
+    permutations: List[str] = (),
+    seed: int = 0,
+) -> Dict[str, np.ndarray]:
+    """
+    Random inputs of the SDFG's signature. Index arrays are filled within
+    the range given by the corpus or by a permutation.
+    """
+    rng = np.random.default_rng(seed)
+
+    args = {}
+    for name, desc in sdfg.arglist().items():
+        if isinstance(desc, dace.data.Array):
+            shape = [int(size) for size in desc.shape]
+            dtype = desc.dtype.type
+            if name in permutations:
+                args[name] = rng.permutation(shape[0]).astype(dtype)
+            elif name in indices:
+                args[name] = rng.integers(0, indices[name], size=shape, dtype=dtype)
+            else:
+                args[name] = rng.random(shape).astype(dtype)
+        elif isinstance(desc, dace.data.Scalar):
+            args[name] = desc.dtype.type(0)
+        else:
+            raise ValueError(f"{sdfg.name}: unexpected argument {name}")
+
+    return args
+
+
+def _copy(args: Dict) -> Dict:
+    return {
+        name: arg.copy() if isinstance(arg, np.ndarray) else arg
+        for name, arg in args.items()
+    }
+
+
+def _best(func: Callable, repetitions: int) -> float:
+    best = None
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        func()
+        runtime = time.perf_counter() - start
+        best = runtime if best is None else min(best, runtime)
+    return best
+
+
+def run_kernel(name: str, entry: Dict, args: argparse.Namespace) -> Dict:
+    """
+    Lifts, compiles and runs a kernel of the corpus. Failures of any stage
+    are recorded as the error of the kernel.
+    """
+    result = {
+        "category": entry["category"],
+        "stages": {},
+        "runtime": {},
+        "speedup": None,
+        "correct": None,
+        "error": None,
+    }
+    stages = result["stages"]
+    build = Path(args.build)
+
+    try:
+        for _ in range(args.lift_repetitions):
+            scop, sdfg = lift(name, entry["jscop"], stages, args.schedule)
+        sdfg.openmp_sections = False
+        sdfg.build_folder = str(build / sdfg.name)
+
+        inspector = has_inspector(sdfg)
+        program = build_program(sdfg, scop, entry, stages, args.schedule)
+
+        reference = compile_reference(
+            entry["reference"], build / "reference", args.cc, args.cflags
+        )
+        inputs = arguments(
+            scop, sdfg, entry.get("indices", {}), entry.get("permutations", [])
+        )
+
+        # The reference takes the arrays of the scop in order
+        order = [
+            memref.name for memref in scop._memrefs.values() if memref.kind == "array"
+        ]
+
+        def call_reference(values: Dict):
+            reference(
+                *[values[array].ctypes.data_as(ctypes.c_void_p) for array in order]
+            )
+
+        actual = _copy(inputs)
+        program(**actual)
+        expected = _copy(inputs)
+        call_reference(expected)
+        result["correct"] = all(
+            np.allclose(actual[array], expected[array], rtol=1e-8) for array in order
+        )
+
+        actual = _copy(inputs)
+        expected = _copy(inputs)
+        result["runtime"]["sdfg"] = _best(lambda: program(**actual), args.repetitions)
+        result["runtime"]["reference"] = _best(
+            lambda: call_reference(expected), args.repetitions
+        )
+        result["speedup"] = result["runtime"]["reference"] / result["runtime"]["sdfg"]
+
+        # The sequential fallback, i.e., the SDFG without the inspector
+        if inspector:
+            _, fallback = lift(name, entry["jscop"], {}, args.schedule, False)
+            fallback.name += "_fallback"
+            fallback.openmp_sections = False
+            fallback.build_folder = str(build / fallback.name)
+            program = build_program(fallback, scop, entry, {}, args.schedule)
+
+            actual = _copy(inputs)
+            result["runtime"]["fallback"] = _best(
+                lambda: program(**actual), args.repetitions
+            )
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    return result
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).parent,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _host() -> Dict:
+    return {
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def _print(report: Dict) -> None:
+    stages = FRONTEND + BACKEND
+    print(
+        f"{'kernel':<12}"
+        + "".join(f"{stage:>11}" for stage in stages)
+        + f"{'sdfg':>11}{'reference':>11}{'speedup':>9}  correct"
+    )
+    for name, result in report["kernels"].items():
+        if result["error"] is not None:
+            print(f"{name:<12} {result['error']}")
+            continue
+
+        line = f"{name:<12}"
+        line += "".join(f"{result['stages'][stage] * 1e3:>9.2f}ms" for stage in stages)
+        line += f"{result['runtime']['sdfg'] * 1e3:>9.3f}ms"
+        line += f"{result['runtime']['reference'] * 1e3:>9.3f}ms"
+        line += f"{result['speedup']:>9.2f}  {'yes' if result['correct'] else 'NO'}"
+        if "fallback" in result["runtime"]:
+            line += f"  (fallback {result['runtime']['fallback'] * 1e3:.3f}ms)"
+        print(line)
+
+
+def compare(baseline: Dict, report: Dict, threshold: float) -> List[Tuple[str, str]]:
+    """
+    Compares the lifting time (sum of the frontend stages), the compile time
+    and the runtime of the SDFG of each kernel of two reports.
+
+    :return: The kernels and metrics that are slower than the baseline by
+             more than the threshold, failed or are incorrect
+    """
+    if baseline.get("host") != report.get("host"):
+        print("warning: the reports were measured on different hosts")
+
+    regressions = []
+    print(f"{'kernel':<12}{'metric':>10}{'baseline':>14}{'current':>14}{'change':>9}")
+    for name, result in report["kernels"].items():
+        if result["error"] is not None or not result["correct"]:
+            regressions.append((name, "error" if result["error"] else "correct"))
+            continue
+
+        base = baseline["kernels"].get(name)
+        if base is None or base["error"] is not None:
+            continue
+
+        metrics = {
+            "lift": lambda r: sum(r["stages"][stage] for stage in FRONTEND),
+            "compile": lambda r: r["stages"]["compile"],
+            "runtime": lambda r: r["runtime"]["sdfg"],
+        }
+        for metric, value in metrics.items():
+            before, after = value(base), value(result)
+            change = after / before - 1.0 if before > 0 else 0.0
+            flag = ""
+            if change > threshold:
+                regressions.append((name, metric))
+                flag = "  regression"
+            print(
+                f"{name:<12}{metric:>10}{before * 1e3:>12.3f}ms{after * 1e3:>12.3f}ms"
+                + f"{change:>+9.1%}{flag}"
+            )
+
+    return regressions
+
+
+def slower_inspectors(report: Dict, threshold: float) -> List[str]:
+    """
+    :return: The kernels whose inspected SDFG is slower than the sequential
+             fallback by more than the threshold
+    """
+    slower = []
+    for name, result in report["kernels"].items():
+        runtime = result["runtime"]
+        if "fallback" not in runtime:
+            continue
+
+        if runtime["sdfg"] > runtime["fallback"] * (1.0 + threshold):
+            print(f"{name}: the inspector is slower than the sequential fallback")
+            slower.append(name)
+
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("kernels", type=str, nargs="*", help="Kernels of the corpus")
+    parser.add_argument("--cflags", type=str, default="-O3 -march=native")
+    parser.add_argument("--cc", type=str, default="cc")
+    parser.add_argument(
+        "--schedule", choices=["sequential", "multicore"], default="multicore"
+    )
+    parser.add_argument("--repetitions", type=int, default=10)
+    parser.add_argument("--lift-repetitions", type=int, default=5)
+    parser.add_argument("--build", type=str, default=".benchmarks/suite")
+    parser.add_argument("--output", type=str, default=None)
+    parser.add_argument("--baseline", type=str, default=None)
+    parser.add_argument("--compare", type=str, nargs=2, default=None)
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.compare is not None:
+        reports = []
+        for path in args.compare:
+            with open(path, "r") as handle:
+                reports.append(json.load(handle))
+        regressions = compare(*reports, args.threshold)
+        return 1 if regressions else 0
+
+    dace.Config.set("compiler", "cpu", "args", value="-std=c++14 -fPIC " + args.cflags)
+    dace.Config.set("compiler", "build_type", value="None")
+
+    report = {
+        "commit": _commit(),
+        "host": _host(),
+        "cflags": args.cflags,
+        "schedule": args.schedule,
+        "kernels": {},
+    }
+    for name, entry in load_corpus(args.kernels).items():
+        report["kernels"][name] = run_kernel(name, entry, args)
+
+    _print(report)
+    if args.output is not None:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=4)
+
+    failed = [
+        name
+        for name, result in report["kernels"].items()
+        if result["error"] is not None or not result["correct"]
+    ]
+    failed += slower_inspectors(report, args.threshold)
+    if args.baseline is not None:
+        with open(args.baseline, "r") as handle:
+            baseline = json.load(handle)
+        return 1 if compare(baseline, report, args.threshold) else 0
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""
+Measures the vectorization ratio of the kernels generated for a set of scops.
+
+The SDFGs are compiled with the given optimization flags, with or without
+the SIMD pragmas on the innermost maps, and the ratio of packed to all
+floating-point arithmetic instructions of the shared libraries is reported
+(x86-64 only).
+
+    python benchmarks/vectorization.py --cflags="-O3 -march=native"
+    python benchmarks/vectorization.py --no-simd --alignment=64
+"""
+import re
+import copy
+import dace
+import argparse
+import subprocess
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from dace.codegen import compiler
+from dace.codegen.codegen import generate_code
+from dace.sdfg.utils import inline_loop_blocks
+
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.codegen.generator import Generator
+from scop2sdfg.codegen.analysis import infer_shape
+from scop2sdfg.codegen.openmp import vectorize_innermost_maps
+
+N = 1024
+
+_ARITHMETIC = re.compile(
+    r"\s(v?(?:add|sub|mul|div|min|max|sqrt|fn?madd\d*|fn?msub\d*))([ps])([sd])\s"
+)
+
+
+def _jscop(
+    sizes: List[int],
+    arrays: Dict[str, List[int]],
+    reads: List[Tuple[str, str, str]],
+    write: Tuple[str, str, str],
+    instructions: List[str],
+    carried: int = None,
+) -> Dict:
+    iterators = [f"i{d}" for d in range(len(sizes))]
+    tuple_ = "Stmt0[" + ", ".join(iterators) + "]"
+    domain = " and ".join(
+        f"0 <= {it} <= {size - 1}" for it, size in zip(iterators, sizes)
+    )
+
+    dependencies = "{  }"
+    if carried is not None:
+        target = list(iterators)
+        target[carried] = "1 + " + target[carried]
+        bounds = " and ".join(
+            f"0 <= {it} <= {size - (2 if d == carried else 1)}"
+            for d, (it, size) in enumerate(zip(iterators, sizes))
+        )
+        dependencies = (
+            "{ " + tuple_ + " -> Stmt0[" + ", ".join(target) + "] : " + bounds + " }"
+        )
+
+    accesses = [
+        {
+            "kind": "read",
+            "relation": "{ " + tuple_ + " -> " + array + "[" + index + "] }",
+            "access_instruction": f"  {ref} = load double, ptr %p{ref[1:]}, align 8",
+            "incoming_value": "",
+        }
+        for ref, array, index in reads
+    ]
+    array, index, value = write
+    accesses.append(
+        {
+            "kind": "write",
+            "relation": "{ " + tuple_ + " -> " + array + "[" + index + "] }",
+            "access_instruction": "  store double %res, ptr %out, align 8",
+            "incoming_value": "  " + value,
+        }
+    )
+
+    return {
+        "name": "%for.body---%for.end",
+        "context": "{  :  }",
+        "parameters": [],
+        "arrays": [
+            {
+                "kind": "array",
+                "name": name,
+                "sizes": ["*"] + [str(size) for size in shape[1:]],
+                "type": "double",
+                "variable": f"ptr %{name}",
+            }
+            for name, shape in arrays.items()
+        ],
+        "instructions": "\\n".join("  " + inst for inst in instructions),
+        "dependencies": {
+            "RAW": dependencies,
+            "WAR": dependencies,
+            "WAW": dependencies,
+            "RED": "{  }",
+            "TC_RED": "{  }",
+        },
+        "schedule": "{ " + tuple_ + " -> [" + ", ".join(iterators) + "] }",
+        "statements": [
+            {
+                "name": "Stmt0",
+                "domain": "{ " + tuple_ + " : " + domain + " }",
+                "affine": True,
+                "loops": [
+                    {
+                        "induction_variable": f"  %iv{d} = phi i64 [ 0, %entry ], [ %iv{d}.next, %for.inc ]"
+                    }
+                    for d in range(len(sizes))
+                ],
+                "accesses": accesses,
+            }
+        ],
+        "access_range": [],
+    }
+
+
+KERNELS = {
+    # B[i] = B[i] + 2 * A[i]
+    "axpy": _jscop(
+        [N * N],
+        {"MemRef0": [N * N], "MemRef1": [N * N]},
+        [("%0", "MemRef1", "i0"), ("%1", "MemRef0", "i0")],
+        ("MemRef1", "i0", "%add = fadd double %mul, %0"),
+        ["%mul = fmul double 2.000000e+00, %1", "%add = fadd double %mul, %0"],
+    ),
+    # B[i][j] = A[i][j - 1] + A[i][j + 1]
+    "stencil": _jscop(
+        [N, N - 2],
+        {"MemRef0": [N, N], "MemRef1": [N, N]},
+        [("%0", "MemRef0", "i0, i1"), ("%1", "MemRef0", "i0, 2 + i1")],
+        ("MemRef1", "i0, 1 + i1", "%add = fadd double %0, %1"),
+        ["%add = fadd double %0, %1"],
+    ),
+    # C[i] = C[i] + A[i][j] * B[j]
+    "gemv": _jscop(
+        [N, N],
+        {"MemRef0": [N, N], "MemRef1": [N], "MemRef2": [N]},
+        [
+            ("%0", "MemRef2", "i0"),
+            ("%1", "MemRef0", "i0, i1"),
+            ("%2", "MemRef1", "i1"),
+        ],
+        ("MemRef2", "i0", "%add = fadd double %0, %mul"),
+        ["%mul = fmul double %1, %2", "%add = fadd double %0, %mul"],
+        carried=1,
+    ),
+    # C[i][j] = C[i][j] + A[i][k] * B[k][j]
+    "gemm": _jscop(
+        [N // 4, N // 4, N // 4],
+        {
+            "MemRef0": [N // 4, N // 4],
+            "MemRef1": [N // 4, N // 4],
+            "MemRef2": [N // 4, N // 4],
+        },
+        [
+            ("%0", "MemRef2", "i0, i1"),
+            ("%1", "MemRef0", "i0, i2"),
+            ("%2", "MemRef1", "i2, i1"),
+        ],
+        ("MemRef2", "i0, i1", "%add = fadd double %0, %mul"),
+        ["%mul = fmul double %1, %2", "%add = fadd double %0, %mul"],
+        carried=2,
+    ),
+}
+
+
+def vectorization_ratio(library: Path) -> Tuple[int, int]:
+    """
+    Counts the packed and scalar floating-point arithmetic instructions.
+    """
+    disassembly = subprocess.run(
+        ["objdump", "-d", "--no-show-raw-insn", str(library)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+    packed, scalar = 0, 0
+    for match in _ARITHMETIC.finditer(disassembly):
+        if match.group(2) == "p":
+            packed += 1
+        else:
+            scalar += 1
+
+    return packed, scalar
+
+
+def compile_sdfg(sdfg: dace.SDFG, simd: bool) -> Path:
+    """
+    Compiles the SDFG as the pipeline does, optionally with the SIMD pragmas.
+    """
+    program = copy.deepcopy(sdfg)
+    program.build_folder = sdfg.build_folder
+    inline_loop_blocks(program)
+    program.fill_scope_connectors()
+
+    code_objects = generate_code(program)
+    if simd:
+        for obj in code_objects:
+            if obj.target.target_name == "cpu":
+                obj.code = vectorize_innermost_maps(obj.code, program)
+
+    folder = compiler.generate_program_folder(program, code_objects, sdfg.build_folder)
+    return Path(compiler.configure_and_compile(folder, sdfg.name))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--cflags", type=str, default="-O3 -march=native")
+    parser.add_argument("--library-nodes", action="store_true", default=False)
+    parser.add_argument("--reductions", action="store_true", default=False)
+    parser.add_argument("--simd", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument("--alignment", type=int, default=0)
+    parser.add_argument("--build", type=str, default=".benchmarks/vectorization")
+    args = parser.parse_args()
+
+    dace.Config.set("compiler", "cpu", "args", value="-std=c++14 -fPIC " + args.cflags)
+    dace.Config.set("compiler", "build_type", value="None")
+
+    print(f"{'kernel':<10} {'packed':>8} {'scalar':>8} {'ratio':>8}")
+    for name, desc in KERNELS.items():
+        # Arguments aligned as declared by align attributes
+        if args.alignment > 0:
+            for array in desc["arrays"]:
+                array["variable"] = f"ptr align {args.alignment} %{array['name']}"
+
+        scop = Scop.from_json(name + ".c", desc)
+        sdfg = Generator.generate(
+            scop,
+            library_nodes=args.library_nodes,
+            reductions=args.reductions,
+            scalar_replacement=True,
+        )
+        # Leading dimensions are given by the accessed extent
+        shapes = infer_shape(scop)
+        for array, bounds in shapes.items():
+            size = sdfg.arrays[array].shape[0]
+            if str(size) in sdfg.free_symbols:
+                sdfg.specialize({str(size): int(bounds[0][1])})
+        sdfg.simplify()
+        sdfg.build_folder = str(Path(args.build) / sdfg.name)
+        library = compile_sdfg(sdfg, args.simd)
+
+        packed, scalar = vectorization_ratio(library)
+        total = packed + scalar
+        ratio = packed / total if total > 0 else 0.0
+        print(f"{name:<10} {packed:>8} {scalar:>8} {ratio:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
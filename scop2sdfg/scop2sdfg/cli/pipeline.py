@@ -0,0 +1,666 @@
+import dace
+import re
+import copy
+import json
+import sympy
+import logging
+import shutil
+import traceback
+import sys
+import time
+import warnings
+import subprocess
+
+from pathlib import Path
+from typing import Dict, List, Set
+
+from dace.codegen import compiler
+from dace.codegen.codegen import generate_code
+from dace.libraries.standard import Reduce
+from dace.sdfg.utils import inline_loop_blocks
+from dace.sdfg.analysis.cutout import SDFGCutout
+
+from daisytuner.optimization import Optimization, Normalization
+from daisytuner.transformations import MapSchedule
+from daisytuner.transformations.helpers import find_all_parent_maps_recursive
+
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.scop.analysis import (
+    estimate_work,
+    parameter_thresholds,
+    select_schedule,
+)
+from scop2sdfg.codegen.generator import Generator
+from scop2sdfg.codegen.analysis import infer_shape
+from scop2sdfg.codegen.layout import transform_layouts
+from scop2sdfg.codegen.lifetimes import optimize_lifetimes
+from scop2sdfg.codegen.profiling import (
+    dormant_instrumentation,
+    hot_maps,
+    instrument,
+    instrument_code,
+    load_profile,
+)
+from scop2sdfg.codegen.openmp import (
+    apply_first_touch,
+    apply_openmp_policy,
+    bind_parallel_regions,
+    vectorize_innermost_maps,
+)
+from scop2sdfg.codegen.patterns import blas_libraries
+from scop2sdfg.tuning import TuningDatabase, tune_maps
+
+logger = logging.getLogger("scop2sdfg")
+
+# Share of the profiled calls, whose sizes are specialized in the fast path
+_MIN_OBSERVED_SHARE = 0.5
+
+
+def lift(
+    source_path: str,
+    scop: Dict,
+    schedule: str = "sequential",
+    transfer_tune: bool = False,
+    topk: int = 3,
+    use_profiling_features: bool = False,
+    tuning_db: str = None,
+    tune_budget: str = None,
+    tune_workers: int = 0,
+    dump_raw_maps: bool = False,
+    library_nodes: bool = True,
+    reductions: bool = True,
+    scalar_replacement: bool = True,
+    inspector: bool = True,
+    fusion: bool = True,
+    layout: bool = False,
+    min_work: int = 1024,
+    min_parallel_work: int = 65536,
+    min_parallel_iterations: int = 64,
+    num_threads: int = 0,
+    numa: bool = False,
+    proc_bind: str = "spread",
+    hoist_allocations: bool = True,
+    parametric: bool = False,
+    fast_paths: bool = True,
+    profile_generate: str = None,
+    profile_use: str = None,
+    min_time: float = 5.0,
+    runtime_profile: bool = False,
+    cflags: str = None,
+    cxx: str = None,
+    bitcode: bool = False,
+):
+    """
+    Lifts a scop accepted by the triage to SDFGs and compiles them into the
+    .daisycache. Exits with 0 if the SDFGs replace the scop.
+    """
+    # Compile the SDFGs with the optimization flags of the host code
+    if cflags is not None:
+        dace.Config.set("compiler", "cpu", "args", value=_compiler_args(cflags))
+        if any(re.fullmatch(r"-O.*", flag) for flag in str(cflags).split()):
+            # No flags of CMake's configurations overriding the optimization level
+            dace.Config.set("compiler", "build_type", value="None")
+    if cxx is not None:
+        dace.Config.set("compiler", "cpu", "executable", value=cxx)
+    # Instrumented SDFGs write a single report at exit
+    if profile_generate is not None or runtime_profile:
+        dace.Config.set("instrumentation", "report_each_invocation", value=False)
+
+    source_path = Path(source_path)
+    daisycache = Path() / ".daisycache"
+
+    try:
+        tune_seconds = _parse_duration(tune_budget)
+        scop = Scop.from_json(source_path.name, scop, fusion=fusion)
+        scop.validate()
+    except:
+        traceback.print_exc()
+        sys.exit(1)
+
+    for statements in scop.fused:
+        logger.info("%s: fused loops of %s", scop.name, ", ".join(statements))
+
+    # Measurements of the SDFG's previous build
+    profile = None
+    if profile_use is not None:
+        profile = load_profile(Path(profile_use), Generator.sdfg_name(scop))
+        if profile is not None:
+            logger.info(
+                "%s: profile of %d calls (%.1fus per call)",
+                scop.name,
+                profile["calls"],
+                profile["time"],
+            )
+
+    # Prune unprofitable
+    estimate = estimate_work(scop)
+    profitable = estimate["work"] is None or estimate["work"] >= min_work
+    logger.info(
+        "%s: %s (%s, threshold: %d)",
+        scop.name,
+        "profitable" if profitable else "unprofitable",
+        ", ".join(f"{key}: {value}" for key, value in estimate.items()),
+        min_work,
+    )
+    if not profitable:
+        sys.exit(1)
+
+    # Scops too short to amortize the call of the SDFG
+    if profile is not None and profile["time"] < min_time:
+        logger.info(
+            "%s: unprofitable (measured %.1fus per call, threshold: %.1fus)",
+            scop.name,
+            profile["time"],
+            min_time,
+        )
+        sys.exit(1)
+
+    # Runtime guards: Parametric scops run the SDFG only for large parameters
+    guards = {"parameters": [], "sizes": []}
+    if estimate["work"] is None:
+        thresholds = parameter_thresholds(scop, min_work)
+        logger.info("%s: parameter thresholds %s", scop.name, thresholds)
+        if thresholds is None:
+            sys.exit(1)
+
+        guards["parameters"] = thresholds
+
+    if schedule == "auto":
+        # The work at the parameters observed most frequently
+        if profile is not None:
+            observed = {
+                param.name: profile["symbols"][param.name]["value"]
+                for param in scop._parameters.values()
+                if param.name in profile["symbols"]
+            }
+            if observed:
+                estimate = estimate_work(scop, observed)
+
+        schedule = select_schedule(scop, estimate, min_parallel_work)
+        logger.info("%s: selected %s schedule", scop.name, schedule)
+
+    try:
+        sdfg = Generator.generate(
+            scop,
+            library_nodes=library_nodes,
+            scalar_replacement=scalar_replacement,
+            # Indirect writes are only parallelized on multicores
+            inspector=inspector and schedule == "multicore",
+            # OpenMP reductions run on the CPU, in parallel only on multicores
+            reductions=reductions and schedule != "gpu",
+            parallel_reductions=schedule == "multicore",
+        )
+        sdfg.openmp_sections = False
+
+        # Normalization
+        Normalization.apply(sdfg)
+        if not Normalization.is_normalized(sdfg):
+            warnings.warn(
+                "Normalization did not succeed. This might result in sub-optimal performance."
+            )
+
+        # Shape inference: The leading dimensions do not affect the strides
+        # and are replaced by the accessed extent
+        shapes = infer_shape(scop)
+        leading = {}
+        specialization = {}
+        for name, memref in scop._memrefs.items():
+            if memref.kind != "array":
+                continue
+
+            for i, val in enumerate(memref.shape):
+                if str(val) not in sdfg.free_symbols:
+                    continue
+
+                bounds = shapes.get(name, [])
+                if i < len(bounds) and bounds[i] is not None:
+                    _, dim = bounds[i]
+                elif i == 0:
+                    dim = sympy.Integer(1)
+                else:
+                    continue
+
+                if i == 0:
+                    leading[str(val)] = str(dim)
+                    if dim.is_Integer and not parametric:
+                        guards["sizes"].append(
+                            {"array": name, "dimension": i, "value": int(dim)}
+                        )
+                elif dim.is_Integer:
+                    specialization[str(val)] = {
+                        "array": name,
+                        "dimension": i,
+                        "value": int(dim),
+                    }
+
+        sdfg.replace_dict(leading, replace_keys=False)
+
+        fast_path = None
+        if parametric:
+            # Remaining sizes are passed as arguments
+            sizes = {}
+            dimensions = {}
+            for name, memref in scop._memrefs.items():
+                if memref.kind != "array":
+                    continue
+
+                for i, val in enumerate(memref.shape):
+                    if i > 0 and str(val) in sdfg.free_symbols:
+                        sizes[str(val)] = _size_symbol(name, i)
+                        dimensions[_size_symbol(name, i)] = (name, i)
+
+            sdfg.replace_dict(sizes)
+            specialization = {
+                sizes[symbol]: size for symbol, size in specialization.items()
+            }
+
+            # Sizes of most calls of the profiled build
+            if profile is not None:
+                for symbol, (name, i) in dimensions.items():
+                    observed = profile["symbols"].get(symbol)
+                    if symbol in specialization or observed is None:
+                        continue
+
+                    if observed["share"] >= _MIN_OBSERVED_SHARE:
+                        specialization[symbol] = {
+                            "array": name,
+                            "dimension": i,
+                            "value": observed["value"],
+                        }
+
+            # Optional fast path for the sizes known at compile time
+            if fast_paths and specialization:
+                fast_path = copy.deepcopy(sdfg)
+                fast_path.name = sdfg.name + "_fast"
+                fast_path.build_folder = str(daisycache / fast_path.name / "dacecache")
+                _specialize(fast_path, specialization)
+                Generator.validate(
+                    fast_path,
+                    scop,
+                    sizes=set(sizes.values()).difference(specialization),
+                )
+
+            sdfg.simplify()
+            Generator.validate(sdfg, scop, sizes=sizes.values())
+        else:
+            _specialize(sdfg, specialization)
+            guards["sizes"].extend(specialization.values())
+            Generator.validate(sdfg, scop)
+    except:
+        traceback.print_exc()
+        sys.exit(1)
+
+    # Dump maps for tuning purposes
+    dump_raw_maps_path = None
+    if dump_raw_maps:
+        dump_raw_maps_path = daisycache / "raw_maps"
+        dump_raw_maps_path.mkdir(parents=True, exist_ok=True)
+
+        for nsdfg in sdfg.all_sdfgs_recursive():
+            for state in nsdfg.states():
+                for node in state.nodes():
+                    if not isinstance(node, dace.nodes.MapEntry):
+                        continue
+
+                    if find_all_parent_maps_recursive(state, node):
+                        continue
+
+                    map_exit = state.exit_node(node)
+                    subgraph_nodes = set(state.all_nodes_between(node, map_exit))
+                    subgraph_nodes.add(node)
+                    subgraph_nodes.add(map_exit)
+
+                    for edge in state.in_edges(node):
+                        subgraph_nodes.add(edge.src)
+                    for edge in state.out_edges(map_exit):
+                        subgraph_nodes.add(edge.dst)
+
+                    subgraph_nodes = list(subgraph_nodes)
+                    cutout = SDFGCutout.singlestate_cutout(
+                        state,
+                        *subgraph_nodes,
+                        symbols_map=copy.copy(sdfg.constants),
+                    )
+                    cutout.name = "cutout_" + str(cutout.hash_sdfg()).replace("-", "_")
+
+                    for sym, val in sdfg.constants.items():
+                        if sym in cutout.free_symbols:
+                            cutout.specialize({sym: val})
+
+                    cutout.save(dump_raw_maps_path / f"{cutout.name}.sdfg")
+
+    # The tuning budget is shared by all versions
+    tune_deadline = None
+    if tune_seconds is not None:
+        tune_deadline = time.monotonic() + tune_seconds
+
+    sdfgs = [sdfg] if fast_path is None else [sdfg, fast_path]
+    for version in sdfgs:
+        # Arrays accessed in transposed order are copied into a new layout
+        if layout:
+            layouts = transform_layouts(version, scop)
+            for name, order in layouts.items():
+                logger.info("%s: layout of %s %s", version.name, name, order)
+
+        _apply_schedule(
+            version,
+            schedule,
+            transfer_tune,
+            topk,
+            use_profiling_features,
+            tuning_db,
+            (
+                None
+                if tune_deadline is None
+                else max(tune_deadline - time.monotonic(), 0)
+            ),
+            tune_workers,
+            # Maps, whose time is negligible, are not tuned
+            hot_maps(profile) if profile and profile["maps"] else None,
+            min_parallel_iterations,
+            num_threads,
+        )
+
+        # Transients are allocated once per call or at initialization
+        if hoist_allocations:
+            optimize_lifetimes(version)
+
+        # NUMA: Pages are placed by the threads using them, once for
+        # persistent arrays
+        if numa and schedule == "multicore":
+            apply_first_touch(version)
+
+        # Timers of the SDFG, its states and its maps
+        if profile_generate is not None or runtime_profile:
+            instrument(version)
+
+    # Reports of all versions are written to the same folder, replacing
+    # the reports of previous builds
+    profile_folder = None
+    if profile_generate is not None:
+        profile_folder = Path(profile_generate) / sdfg.name
+        profile_folder.mkdir(parents=True, exist_ok=True)
+        for report in profile_folder.glob("report-*.json"):
+            report.unlink()
+
+    # Libraries required by the driver and guards of the plugin's dispatch
+    libraries = []
+    for version in sdfgs:
+        for library in blas_libraries(version):
+            if library not in libraries:
+                libraries.append(library)
+    metadata = {"libraries": libraries, "guards": guards}
+
+    try:
+        bitcode_files = []
+        for version in sdfgs:
+            version.save(daisycache / f"{version.name}.sdfg")
+
+            # LLVM IR linked into the host module by the driver
+            if bitcode:
+                files = _emit_bitcode(
+                    version,
+                    daisycache,
+                    cxx or "clang++-16",
+                    proc_bind if numa else None,
+                    profile_folder,
+                    runtime_profile,
+                )
+                if files is not None:
+                    bitcode_files.extend(files)
+                    continue
+
+                logger.info(
+                    "%s: compiling %s as shared library", scop.name, version.name
+                )
+
+            _compile(
+                version,
+                proc_bind if numa else None,
+                profile_folder,
+                runtime_profile,
+            )
+
+            libname = "lib" + version.name + ".so"
+            shutil.copy(Path(version.build_folder) / "build" / libname, daisycache)
+
+        if bitcode_files:
+            metadata["bitcode"] = bitcode_files
+
+        # Symbols in the order of the signatures
+        metadata["symbols"] = _symbols(sdfg)
+        if fast_path is not None:
+            metadata["fast_path"] = {
+                "sdfg": fast_path.name,
+                "symbols": _symbols(fast_path),
+                "sizes": list(specialization.values()),
+            }
+
+        with open(daisycache / f"{sdfg.name}.json", "w") as handle:
+            json.dump(metadata, handle)
+    except:
+        traceback.print_exc()
+        sys.exit(1)
+
+    sys.exit(0)
+
+
+def _apply_schedule(
+    sdfg: dace.SDFG,
+    schedule: str,
+    transfer_tune: bool,
+    topk: int,
+    use_profiling_features: bool,
+    tuning_db: str,
+    tune_budget: float,
+    tune_workers: int,
+    tune_labels: Set[str],
+    min_parallel_iterations: int,
+    num_threads: int,
+) -> None:
+    if schedule == "gpu":
+        sdfg.apply_gpu_transformations()
+    elif schedule == "sequential":
+        sdfg.apply_transformations_repeated(
+            MapSchedule, options={"schedule_type": dace.ScheduleType.Sequential}
+        )
+        for node, _ in sdfg.all_nodes_recursive():
+            if isinstance(node, Reduce):
+                node.implementation = "pure"
+                node.schedule = dace.ScheduleType.Sequential
+    elif schedule == "multicore":
+        if transfer_tune:
+            # Maps are tuned one by one, reusing the recipes of known maps
+            database = TuningDatabase(tuning_db)
+            results = tune_maps(
+                sdfg,
+                lambda cutout: _tune_cutout(cutout, topk, use_profiling_features),
+                database,
+                workers=tune_workers or None,
+                budget=tune_budget,
+                labels=tune_labels,
+            )
+            database.close()
+
+            for label, result in results.items():
+                logger.info("%s: %s %s", sdfg.name, label, result)
+
+    # Set high-level schedule options
+    dace.sdfg.infer_types.infer_connector_types(sdfg)
+    dace.sdfg.infer_types.set_default_schedule_and_storage_types(sdfg, None)
+
+    # Tuned SDFGs keep the OpenMP options of the tuner
+    if schedule == "multicore" and not transfer_tune:
+        apply_openmp_policy(sdfg, min_parallel_iterations, num_threads)
+
+
+def _tune_cutout(cutout: dace.SDFG, topk: int, use_profiling_features: bool) -> None:
+    """
+    Optimizes the cutout in-place by the tuner, which evaluates its topk
+    candidates itself.
+    """
+    _ = Optimization.apply(
+        sdfg=cutout, topK=topk, use_profiling_features=use_profiling_features
+    )
+
+
+def _parse_duration(duration) -> float:
+    """
+    Seconds of a duration given as a number or with a unit, e.g., 90s or 2m.
+    """
+    if duration is None:
+        return None
+
+    match = re.fullmatch(r"\s*([0-9.]+)\s*(ms|s|m|h)?\s*", str(duration))
+    if match is None:
+        raise ValueError(f"Invalid duration {duration}")
+
+    scale = {"ms": 1e-3, "s": 1.0, "m": 60.0, "h": 3600.0}[match.group(2) or "s"]
+    return float(match.group(1)) * scale
+
+
+def _compiler_args(cflags: str) -> str:
+    """
+    Replaces DaCe's default compiler arguments by the flags of the host
+    compilation of the same kind, keeping the defaults of the other kinds.
+    """
+    flags = str(cflags).split()
+    kinds = [
+        kind
+        for kind in (r"-O.*", r"-march=.*|-mtune=.*", r"-ffast-math", r"--target=.*")
+        if any(re.fullmatch(kind, flag) for flag in flags)
+    ]
+    args = [
+        arg
+        for arg in dace.Config.get("compiler", "cpu", "args").split()
+        if not any(re.fullmatch(kind, arg) for kind in kinds)
+    ]
+    return " ".join(args + flags)
+
+
+def _generate_program(
+    sdfg: dace.SDFG,
+    proc_bind: str = None,
+    profile_folder: Path = None,
+    runtime_profile: bool = False,
+):
+    """
+    Generates the code of the SDFG with SIMD pragmas on the innermost maps,
+    optionally binding the threads of the OpenMP parallel regions and writing the instrumentation report to the
+    profile folder or, if enabled at runtime, to DAISY_PROFILE, and returns
+    the code objects and the folder.
+    """
+    # As in SDFG.compile, codegen operates on a copy
+    program = copy.deepcopy(sdfg)
+    program.build_folder = sdfg.build_folder
+    inline_loop_blocks(program)
+    program.fill_scope_connectors()
+
+    code_objects = generate_code(program)
+    for obj in code_objects:
+        if obj.target.target_name != "cpu":
+            continue
+
+        obj.code = vectorize_innermost_maps(obj.code, program)
+        if proc_bind is not None:
+            obj.code = bind_parallel_regions(obj.code, proc_bind)
+        if profile_folder is not None:
+            obj.code = instrument_code(obj.code, program, profile_folder)
+        elif runtime_profile:
+            obj.code = dormant_instrumentation(obj.code, program)
+
+    folder = compiler.generate_program_folder(program, code_objects, sdfg.build_folder)
+    return code_objects, Path(folder)
+
+
+def _compile(
+    sdfg: dace.SDFG,
+    proc_bind: str = None,
+    profile_folder: Path = None,
+    runtime_profile: bool = False,
+) -> Path:
+    code_objects, folder = _generate_program(
+        sdfg, proc_bind, profile_folder, runtime_profile
+    )
+    return Path(compiler.configure_and_compile(str(folder), sdfg.name))
+
+
+def _emit_bitcode(
+    sdfg: dace.SDFG,
+    daisycache: Path,
+    cxx: str,
+    proc_bind: str = None,
+    profile_folder: Path = None,
+    runtime_profile: bool = False,
+) -> List[str]:
+    """
+    Compiles the generated code of the SDFG to LLVM IR in the daisycache.
+    Returns the names of the files or None if the SDFG requires code of
+    targets other than the CPU.
+    """
+    code_objects, folder = _generate_program(
+        sdfg, proc_bind, profile_folder, runtime_profile
+    )
+    sources = [obj for obj in code_objects if obj.linkable]
+    if any(obj.target.target_name != "cpu" for obj in sources):
+        return None
+
+    includes = [
+        Path(dace.__file__).parent / "runtime" / "include",
+        folder / "include",
+    ]
+    for obj in code_objects:
+        for name in obj.environments:
+            environment = dace.library.get_environment(name)
+            env_includes = environment.cmake_includes
+            if callable(env_includes):
+                env_includes = env_includes()
+            includes.extend(env_includes)
+
+            # Headers stored with the library
+            includes.append(Path(environment._dace_file_path).parent)
+
+    files = []
+    for obj in sources:
+        source = folder / "src" / "cpu" / f"{obj.name}.{obj.language}"
+        output = f"{obj.name}.ll"
+        command = (
+            [cxx, "-S", "-emit-llvm", "-fopenmp"]
+            + dace.Config.get("compiler", "cpu", "args").split()
+            + ["-I" + str(include) for include in includes]
+            + [f'-DDACE_BINARY_DIR="{folder / "build"}"']
+            + [str(source), "-o", str(daisycache / output)]
+        )
+        subprocess.run(command, check=True)
+        files.append(output)
+
+    return files
+
+
+def _specialize(sdfg: dace.SDFG, specialization: Dict[str, Dict]) -> None:
+    sdfg.specialize({symbol: size["value"] for symbol, size in specialization.items()})
+    sdfg.simplify()
+
+
+def _size_symbol(array: str, dimension: int) -> str:
+    # Sorted with the parameters in the signature, _symbols records the order
+    return f"size_{array}_{dimension}"
+
+
+def _symbols(sdfg: dace.SDFG) -> List[Dict]:
+    """
+    Describes the symbols of the SDFG's signature in order, either by the name
+    of the parameter or by the array dimension whose size is passed.
+    """
+    symbols = []
+    for name in sdfg.arglist():
+        if name in sdfg.arrays:
+            continue
+
+        match = re.fullmatch(r"size_(.+)_(\d+)", name)
+        if match is None:
+            symbols.append({"parameter": name})
+        else:
+            symbols.append({"array": match.group(1), "dimension": int(match.group(2))})
+
+    return symbols
@@ -0,0 +1,72 @@
+import sympy
+import islpy as isl
+
+from typing import Dict, List, Optional, Tuple
+
+from scop2sdfg.scop.computation.access import Access
+from scop2sdfg.codegen.isl import to_sympy
+
+
+def infer_shape(scop) -> Dict[str, List[Optional[Tuple]]]:
+    """
+    Infers the accessed ranges of the arrays from the access relations of the
+    statements restricted to their domains.
+
+    :return: For each array and dimension, the lower bound and the exclusive
+             upper bound as symbolic expressions in the parameters, or None if
+             the dimension is unbounded, e.g., due to non-affine accesses.
+    """
+    accessed = {}
+    for accesses in scop._memory_accesses.values():
+        for access in accesses.values():
+            if not isinstance(access, Access) or access.relation is None:
+                continue
+            if scop._memrefs[access.array].kind != "array":
+                continue
+
+            elements = access.relation.range()
+            if access.array in accessed:
+                elements = elements.union(accessed[access.array])
+            accessed[access.array] = elements
+
+    context = scop._context
+    if context is None:
+        context = isl.Set("{ : }")
+    build = isl.AstBuild.from_context(context)
+
+    shapes = {}
+    for name, elements in accessed.items():
+        elements = elements.as_set().coalesce()
+        elements = elements.intersect_params(context)
+
+        shapes[name] = []
+        for dim in range(elements.dim(isl.dim_type.set)):
+            if not elements.dim_has_any_lower_bound(isl.dim_type.set, dim):
+                shapes[name].append(None)
+                continue
+            if not elements.dim_has_any_upper_bound(isl.dim_type.set, dim):
+                shapes[name].append(None)
+                continue
+
+            try:
+                lower = elements.dim_min(dim).gist_params(context)
+                upper = elements.dim_max(dim).gist_params(context)
+            except isl.Error:
+                shapes[name].append(None)
+                continue
+
+            # The pieces are bounded by their minimum/maximum over all parameters
+            lower = sympy.Min(*_pieces(lower, build))
+            upper = sympy.Max(*_pieces(upper, build))
+            shapes[name].append((lower, upper + 1))
+
+    return shapes
+
+
+def _pieces(bound: isl.PwAff, build: isl.AstBuild) -> List:
+    pieces = []
+    for _, aff in bound.get_pieces():
+        expr = build.expr_from_pw_aff(isl.PwAff.from_aff(aff))
+        pieces.append(to_sympy(expr))
+
+    return pieces
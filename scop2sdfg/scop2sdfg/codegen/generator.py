@@ -1,10 +1,11 @@
+import re
 import copy
 import dace
 import sympy
 import islpy as isl
 
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable, List
 
 from dace.frontend.python.astutils import negate_expr
 from dace.sdfg.utils import consolidate_edges
@@ -12,24 +13,55 @@ from dace.sdfg.utils import consolidate_edges
 from scop2sdfg.scop.scop import Scop
 from scop2sdfg.scop.value import Value
 from scop2sdfg.scop.computation.access import Access
+from scop2sdfg.scop.computation.computation import Computation
 from scop2sdfg.scop.computation.indirection import Indirection
+from scop2sdfg.scop.analysis import aliasing_arrays
 
 from scop2sdfg.codegen.isl import (
     to_sympy,
     sympy_to_pystr,
     extract_end_cond,
 )
+from scop2sdfg.codegen.patterns import (
+    BlasKernel,
+    ScalarReduction,
+    InvariantElement,
+    invariant_elements,
+    IndirectScatter,
+)
 
 
 class Generator:
-    def __init__(self, sdfg: dace.SDFG, scop: Scop) -> None:
+    def __init__(
+        self,
+        sdfg: dace.SDFG,
+        scop: Scop,
+        library_nodes: bool = False,
+        scalar_replacement: bool = False,
+        inspector: bool = False,
+        reductions: bool = False,
+        parallel_reductions: bool = False,
+    ) -> None:
         self._sdfg = sdfg
         self._scop = scop
+        self._library_nodes = library_nodes
+        self._reductions = reductions
+        self._parallel_reductions = parallel_reductions
+        self._scalar_replacement = scalar_replacement
+        self._inspector = inspector
 
         self._inputs = set()
         self._outputs = set()
         self._surrounding_loops = []
 
+        # Arrays whose accessed element is kept in a register (array -> scalar)
+        self._registers = {}
+
+        # Transient scalars of intermediate values (dtype -> scalars) and the
+        # number of scalars used by each state
+        self._temporaries = {}
+        self._used_temporaries = {}
+
     def _visit(self, ast_node: isl.AstNode, loop_ranges, constraints):
         if ast_node.get_type() == isl.ast_node_type.block:
             first, last = self._visit_block(ast_node, loop_ranges, constraints)
@@ -107,6 +139,21 @@ class Generator:
         return if_guard, end_if_state
 
     def _visit_for(self, ast_node: isl.AstNode, loop_ranges, constraints):
+        # Library nodes and reductions cannot access registers
+        if self._library_nodes and not self._registers:
+            kernel = BlasKernel.match(ast_node, self._scop)
+            if kernel is not None and kernel.available:
+                state = self._sdfg.add_state(f"BlasState_{len(self._sdfg.nodes())}")
+                inputs, outputs = kernel.apply(self._sdfg, state)
+                self._inputs.update(inputs)
+                self._outputs.update(outputs)
+                return state, state
+
+        if self._reductions and not self._registers:
+            reduction = ScalarReduction.match(ast_node, self._scop)
+            if reduction is not None:
+                return self._visit_reduction(reduction)
+
         iter_sympy = to_sympy(ast_node.for_get_iterator())
         iterator_var = sympy_to_pystr(iter_sympy)
         self._surrounding_loops.append(iterator_var)
@@ -127,81 +174,37 @@ class Generator:
         is_parallel = ast_node.get_annotation().user.is_parallel
         if is_parallel:
             state = self._sdfg.add_state(f"MapState_{len(self._sdfg.nodes())}")
-            subset = loop_rng
-
-            map_nodes = dace.nodes.Map(
-                label="map", params=[iterator_var], ndrange=subset
+            self._add_map(
+                state,
+                [iterator_var],
+                loop_rng,
+                lambda pv: pv._visit(
+                    ast_node.for_get_body(), loop_ranges.copy(), constraints
+                ),
             )
 
-            entry = dace.nodes.MapEntry(map_nodes)
-            exit = dace.nodes.MapExit(map_nodes)
-            state.add_nodes_from([entry, exit])
-
-            # create a new SDFG for the map body
-            body_sdfg = dace.SDFG("{}_body".format(entry.label))
-
-            # add all arrays of SDFG to the body-SDFG
-            for arr_label, arr in self._sdfg.arrays.items():
-                arr_copy = copy.deepcopy(arr)
-                arr_copy.transient = False
-                body_sdfg.add_datadesc(arr_label, arr_copy)
-
-            body_sdfg.symbols.update(self._sdfg.symbols)
-
-            # walk and add the states to the body_sdfg
-            pv = Generator(sdfg=body_sdfg, scop=self._scop)
-            pv._surrounding_loops = self._surrounding_loops
-            (
-                _,
-                _,
-            ) = pv._visit(ast_node.for_get_body(), loop_ranges.copy(), constraints)
-            body = state.add_nested_sdfg(body_sdfg, self._sdfg, pv._inputs, pv._outputs)
-
-            for array in self._sdfg.arrays:
-                if array not in pv._inputs and array not in pv._outputs:
-                    del body_sdfg.arrays[array]
-
-            for arr_name in pv._inputs:
-                read_node = state.add_read(arr_name)
-                arr = body_sdfg.arrays[arr_name]
-                subset = dace.subsets.Range.from_array(arr)
-                memlet = dace.Memlet(data=arr_name, subset=subset)
-
-                state.add_memlet_path(
-                    read_node,
-                    entry,
-                    body,
-                    memlet=memlet,
-                    dst_conn=arr_name,
-                    propagate=False,
-                )
-            if len(body.in_connectors) == 0:
-                state.add_edge(entry, None, body, None, dace.Memlet())
-
-            for arr_name in pv._outputs:
-                write_node = state.add_write(arr_name)
-                arr = body_sdfg.arrays[arr_name]
-                subset = dace.subsets.Range.from_array(arr)
-                memlet = dace.Memlet(data=arr_name, subset=subset)
-
-                state.add_memlet_path(
-                    body,
-                    exit,
-                    write_node,
-                    memlet=memlet,
-                    src_conn=arr_name,
-                    dst_conn=None,
-                    propagate=False,
-                )
-            if len(body.out_connectors) == 0:
-                state.add_edge(body, None, exit, None, dace.Memlet())
-
-            self._inputs.update(pv._inputs)
-            self._outputs.update(pv._outputs)
-
             self._surrounding_loops.pop(-1)
             return state, state
         else:
+            # Scalar replacement of the elements accessed by all iterations
+            elements = []
+            if self._scalar_replacement:
+                elements = [
+                    element
+                    for element in invariant_elements(ast_node, self._scop)
+                    if element.array not in self._registers
+                ]
+
+            for element in elements:
+                register, _ = self._sdfg.add_scalar(
+                    name="reg_" + element.array,
+                    dtype=element.access.dtype,
+                    transient=True,
+                    find_new_name=True,
+                )
+                self._registers[element.array] = register
+
+            # A canonical loop, which the code generation emits as a plain for loop
             body_begin, body_end = self._visit(
                 ast_node.for_get_body(), loop_ranges.copy(), constraints
             )
@@ -224,9 +227,436 @@ class Generator:
             )
             before_state, guard, after_state = loop_result
 
+            # Indirect writes are parallel if the indices are unique
+            scatter = None
+            if self._inspector and end_sympy is not None:
+                scatter = IndirectScatter.match(ast_node, self._scop)
+            if scatter is not None:
+                before_state, after_state = self._visit_inspector(
+                    scatter,
+                    ast_node,
+                    iterator_var,
+                    loop_rng,
+                    loop_ranges,
+                    constraints,
+                    before_state,
+                    after_state,
+                )
+
+            # Registers are local to this SDFG
+            registers = {}
+            for element in elements:
+                registers[element.array] = self._registers.pop(element.array)
+                self._inputs.discard(registers[element.array])
+                self._outputs.discard(registers[element.array])
+
+            if elements:
+                entry_cond = cond_sympy.subs(iter_sympy, init_sympy)
+                before_state, after_state = self._visit_registers(
+                    elements, registers, before_state, after_state, entry_cond
+                )
+
             self._surrounding_loops.pop(-1)
             return before_state, after_state
 
+    def _visit_registers(
+        self,
+        elements: List[InvariantElement],
+        registers: Dict[str, str],
+        first_state: dace.SDFGState,
+        last_state: dace.SDFGState,
+        entry_cond,
+    ):
+        """
+        Loads the registers before and writes them back after the loop. Both
+        are skipped if the loop is not executed.
+        """
+        guard = self._sdfg.add_state("register_guard")
+        load_state = self._sdfg.add_state("register_load")
+        store_state = self._sdfg.add_state("register_store")
+        end_state = self._sdfg.add_state("end_registers")
+
+        for element in elements:
+            register = registers[element.array]
+            memlet = element.access.memlet()
+
+            read = load_state.add_read(element.array)
+            load_state.add_nedge(
+                read,
+                load_state.add_write(register),
+                dace.Memlet(data=element.array, subset=memlet.subset, other_subset="0"),
+            )
+            self._inputs.add(element.array)
+
+            if element.written:
+                write = store_state.add_write(element.array)
+                store_state.add_nedge(
+                    store_state.add_read(register),
+                    write,
+                    dace.Memlet(
+                        data=element.array, subset=memlet.subset, other_subset="0"
+                    ),
+                )
+                self._outputs.add(element.array)
+
+        self._sdfg.add_edge(
+            guard,
+            load_state,
+            dace.sdfg.InterstateEdge(sympy_to_pystr(entry_cond)),
+        )
+        self._sdfg.add_edge(
+            guard,
+            end_state,
+            dace.sdfg.InterstateEdge(sympy_to_pystr(negate_expr(entry_cond))),
+        )
+        self._sdfg.add_edge(load_state, first_state, dace.sdfg.InterstateEdge())
+        self._sdfg.add_edge(last_state, store_state, dace.sdfg.InterstateEdge())
+        self._sdfg.add_edge(store_state, end_state, dace.sdfg.InterstateEdge())
+        return guard, end_state
+
+    def _visit_inspector(
+        self,
+        scatter: IndirectScatter,
+        ast_node: isl.AstNode,
+        iterator_var: str,
+        loop_rng: dace.subsets.Range,
+        loop_ranges,
+        constraints,
+        first_state: dace.SDFGState,
+        last_state: dace.SDFGState,
+    ):
+        """
+        Guards the sequential loop by an inspector, which checks the indices
+        of all iterations and executes the loop as a map if they are unique.
+        The indices are marked in a bitmap until the first duplicate. If the
+        loop has more iterations than the written arrays have elements, the
+        indices cannot be unique and are not checked, neither are they for a
+        single thread.
+        """
+        unique, _ = self._sdfg.add_scalar(
+            name="unique", dtype=dace.bool_, transient=True, find_new_name=True
+        )
+
+        # Inspector
+        init, end, step = loop_rng[0]
+        init = dace.symbolic.symstr(init, cpp_mode=True)
+        end = dace.symbolic.symstr(end, cpp_mode=True)
+        step = dace.symbolic.symstr(step, cpp_mode=True)
+
+        # A single thread executes the map as slow as the loop
+        inputs = {}
+        code = [
+            f"const long long _trips = ({end}) >= ({init}) ? (({end}) - ({init})) / ({step}) + 1 : 0;",
+            "_out = omp_get_max_threads() > 1;",
+        ]
+        for index in scatter.indices:
+            conn = "_in" + str(len(inputs))
+            inputs[conn] = index.array
+            expr = dace.symbolic.symstr(index.expr[0], cpp_mode=True)
+
+            # Pigeonhole: More iterations than elements of the written arrays.
+            # An extent of one is the placeholder of an unknown leading dimension,
+            # the bitmap is then bounded relative to the number of iterations.
+            extents = [
+                dace.symbolic.symstr(self._sdfg.arrays[array].shape[0], cpp_mode=True)
+                for array in scatter.arrays(index)
+            ]
+            code.extend(
+                [
+                    "{",
+                    f"    const long long _extent = std::min<long long>({{{', '.join(extents)}}});",
+                    "    const long long _limit = _extent > 1 ? _extent : 64 * _trips + 4096;",
+                    "    _out = _out && (_extent <= 1 || _trips <= _extent);",
+                    "    std::vector<unsigned long long> _seen(std::min(_limit, _trips) / 64 + 1, 0);",
+                    f"    for (long long {iterator_var} = {init}; _out && {iterator_var} <= {end}; {iterator_var} += {step}) {{",
+                    f"        const long long _index = {conn}[{expr}];",
+                    "        if (_index < 0 || _index >= _limit) {",
+                    "            _out = false;",
+                    "            break;",
+                    "        }",
+                    "        const std::size_t _word = _index / 64;",
+                    "        if (_word >= _seen.size()) {",
+                    "            _seen.resize(std::max(2 * _seen.size(), _word + 1), 0);",
+                    "        }",
+                    "        const unsigned long long _bit = 1ULL << (_index % 64);",
+                    "        _out = (_seen[_word] & _bit) == 0;",
+                    "        _seen[_word] |= _bit;",
+                    "    }",
+                    "}",
+                ]
+            )
+
+        inspector_state = self._sdfg.add_state(
+            f"InspectorState_{len(self._sdfg.nodes())}"
+        )
+        tasklet = inspector_state.add_tasklet(
+            name="inspector",
+            inputs=set(inputs.keys()),
+            outputs=set(["_out"]),
+            code="\n".join(code),
+            language=dace.dtypes.Language.CPP,
+            code_global="#include <algorithm>\n#include <vector>\n#include <omp.h>",
+        )
+        for conn, array in inputs.items():
+            node = inspector_state.add_read(array)
+            inspector_state.add_edge(
+                node,
+                None,
+                tasklet,
+                conn,
+                dace.Memlet.from_array(array, self._sdfg.arrays[array]),
+            )
+            self._inputs.add(array)
+
+        node = inspector_state.add_write(unique)
+        inspector_state.add_edge(
+            tasklet, "_out", node, None, dace.Memlet(data=unique, expr=None)
+        )
+
+        # Executor
+        map_state = self._sdfg.add_state(f"MapState_{len(self._sdfg.nodes())}")
+        self._add_map(
+            map_state,
+            [iterator_var],
+            loop_rng,
+            lambda pv: pv._visit(
+                ast_node.for_get_body(), loop_ranges.copy(), constraints
+            ),
+        )
+
+        end_state = self._sdfg.add_state(f"EndInspector_{len(self._sdfg.nodes())}")
+        self._sdfg.add_edge(
+            inspector_state, map_state, dace.sdfg.InterstateEdge(unique)
+        )
+        self._sdfg.add_edge(
+            inspector_state, first_state, dace.sdfg.InterstateEdge(f"not {unique}")
+        )
+        self._sdfg.add_edge(map_state, end_state, dace.sdfg.InterstateEdge())
+        self._sdfg.add_edge(last_state, end_state, dace.sdfg.InterstateEdge())
+        return inspector_state, end_state
+
+    def _visit_reduction(self, reduction: ScalarReduction):
+        state = self._sdfg.add_state(f"ReduceState_{len(self._sdfg.nodes())}")
+        accumulator = reduction.accumulator
+
+        if reduction.subset is not None:
+            # Reduce the elements of the array in place, without buffering them
+            operand = reduction.operands[0]
+            read = state.add_read(operand.array)
+            self._inputs.add(operand.array)
+
+            # Accumulate into the existing value, i.e., no identity
+            reduce = state.add_reduce(reduction.wcr, axes=None, identity=None)
+            reduce.implementation = "OpenMP"
+            state.add_edge(
+                read,
+                None,
+                reduce,
+                None,
+                dace.Memlet(data=operand.array, subset=reduction.subset),
+            )
+
+            result = state.add_access(accumulator.array)
+            state.add_edge(reduce, None, result, None, accumulator.memlet())
+        else:
+            # Inline the operands into a loop nest with an OpenMP reduction
+            tasklet, inputs = self._reduction_tasklet(state, reduction)
+            for conn, memlet in inputs.items():
+                node = state.add_read(memlet.data)
+                state.add_edge(node, None, tasklet, conn, memlet)
+                self._inputs.add(memlet.data)
+
+            result = state.add_access(accumulator.array)
+            state.add_edge(tasklet, "_out", result, None, accumulator.memlet())
+
+        self._inputs.add(accumulator.array)
+        self._outputs.add(accumulator.array)
+
+        result_subset = accumulator.memlet().subset
+
+        # Forward the result to the other written memrefs, e.g., the incoming value
+        writes = {accumulator.array: result}
+        for output in reduction.outputs:
+            if output.array == accumulator.array:
+                continue
+
+            if output.array not in writes:
+                writes[output.array] = state.add_access(output.array)
+                self._outputs.add(output.array)
+
+            state.add_nedge(
+                result,
+                writes[output.array],
+                dace.Memlet(
+                    data=accumulator.array,
+                    subset=result_subset,
+                    other_subset=output.memlet().subset,
+                ),
+            )
+
+        return state, state
+
+    def _reduction_tasklet(self, state: dace.SDFGState, reduction: ScalarReduction):
+        """
+        The loop nest of the reduction in a C++ tasklet. The outermost loop is
+        an OpenMP parallel reduction if parallel_reductions is set, the
+        innermost loop is vectorized by an OpenMP SIMD reduction.
+        """
+        accumulator = reduction.accumulator
+        dtype = self._sdfg.arrays[accumulator.array].dtype
+
+        # The arrays are passed as pointers to the first element read
+        inputs = {"_in": accumulator.memlet()}
+        connectors = {"_in": dtype}
+        for array, subset in reduction.reads.items():
+            inputs["_" + array] = dace.Memlet(data=array, subset=subset)
+            connectors["_" + array] = dace.pointer(self._sdfg.arrays[array].dtype)
+
+        def inline(value: Value) -> str:
+            if isinstance(value, Computation):
+                code = value.as_cpp()
+                names = {
+                    Value.canonicalize(arg.reference): "(" + inline(arg) + ")"
+                    for arg in value.arguments()
+                }
+                if names:
+                    pattern = r"\b(" + "|".join(map(re.escape, names)) + r")\b"
+                    code = re.sub(pattern, lambda match: names[match.group(0)], code)
+                return code
+            elif isinstance(value, Access) and value.array in reduction.reads:
+                desc = self._sdfg.arrays[value.array]
+                subset = reduction.reads[value.array]
+                offset = sum(
+                    (index - begin) * stride
+                    for index, (begin, _, _), stride in zip(
+                        value.expr, subset, desc.strides
+                    )
+                )
+                return f"_{value.array}[{dace.symbolic.symstr(offset, cpp_mode=True)}]"
+            elif isinstance(value, Access):
+                if "_" + value.array not in inputs:
+                    inputs["_" + value.array] = value.memlet()
+                    connectors["_" + value.array] = value.dtype
+                return "_" + value.array
+            else:
+                return value.as_cpp()
+
+        operand = reduction.code
+        for i, value in enumerate(reduction.operands):
+            operand = operand.replace(f"_in{i}", "(" + inline(value) + ")")
+
+        clause = f"reduction({reduction.operator}: _acc)"
+        loops = list(reduction.ranges.items())
+        code = [f"{dtype.ctype} _acc = _in;"]
+        for depth, (iterator, (init, end)) in enumerate(loops):
+            innermost = depth == len(loops) - 1
+            if depth == 0 and self._parallel_reductions:
+                simd = " simd" if innermost else ""
+                code.append(f"#pragma omp parallel for{simd} {clause}")
+            elif innermost:
+                code.append(f"#pragma omp simd {clause}")
+
+            init = dace.symbolic.symstr(init, cpp_mode=True)
+            end = dace.symbolic.symstr(end, cpp_mode=True)
+            code.append(
+                f"for (long long {iterator} = {init}; {iterator} <= {end}; {iterator}++) {{"
+            )
+        code.append(f"const {dtype.ctype} _v = {operand};")
+        code.append(f"_acc = {reduction.combine};")
+        code.extend("}" * len(loops))
+        code.append("_out = _acc;")
+
+        tasklet = state.add_tasklet(
+            name="reduction",
+            inputs=connectors,
+            outputs={"_out": dtype},
+            code="\n".join(code),
+            language=dace.dtypes.Language.CPP,
+        )
+        return tasklet, inputs
+
+    def _add_map(
+        self,
+        state: dace.SDFGState,
+        params,
+        ndrange,
+        generate_body,
+    ):
+        map_nodes = dace.nodes.Map(label="map", params=params, ndrange=ndrange)
+
+        entry = dace.nodes.MapEntry(map_nodes)
+        exit = dace.nodes.MapExit(map_nodes)
+        state.add_nodes_from([entry, exit])
+
+        # create a new SDFG for the map body
+        body_sdfg = dace.SDFG("{}_body".format(entry.label))
+
+        # add all arrays of SDFG to the body-SDFG
+        for arr_label, arr in self._sdfg.arrays.items():
+            arr_copy = copy.deepcopy(arr)
+            arr_copy.transient = False
+            body_sdfg.add_datadesc(arr_label, arr_copy)
+
+        body_sdfg.symbols.update(self._sdfg.symbols)
+
+        # walk and add the states to the body_sdfg
+        pv = Generator(
+            sdfg=body_sdfg,
+            scop=self._scop,
+            library_nodes=self._library_nodes,
+            scalar_replacement=self._scalar_replacement,
+            inspector=self._inspector,
+            reductions=self._reductions,
+            parallel_reductions=self._parallel_reductions,
+        )
+        pv._surrounding_loops = self._surrounding_loops
+        pv._registers = self._registers.copy()
+        generate_body(pv)
+        body = state.add_nested_sdfg(body_sdfg, self._sdfg, pv._inputs, pv._outputs)
+
+        for array in self._sdfg.arrays:
+            if array not in pv._inputs and array not in pv._outputs:
+                del body_sdfg.arrays[array]
+
+        for arr_name in pv._inputs:
+            read_node = state.add_read(arr_name)
+            arr = body_sdfg.arrays[arr_name]
+            subset = dace.subsets.Range.from_array(arr)
+            memlet = dace.Memlet(data=arr_name, subset=subset)
+
+            state.add_memlet_path(
+                read_node,
+                entry,
+                body,
+                memlet=memlet,
+                dst_conn=arr_name,
+                propagate=False,
+            )
+        if len(body.in_connectors) == 0:
+            state.add_edge(entry, None, body, None, dace.Memlet())
+
+        for arr_name in pv._outputs:
+            write_node = state.add_write(arr_name)
+            arr = body_sdfg.arrays[arr_name]
+            subset = dace.subsets.Range.from_array(arr)
+            memlet = dace.Memlet(data=arr_name, subset=subset)
+
+            state.add_memlet_path(
+                body,
+                exit,
+                write_node,
+                memlet=memlet,
+                src_conn=arr_name,
+                dst_conn=None,
+                propagate=False,
+            )
+        if len(body.out_connectors) == 0:
+            state.add_edge(body, None, exit, None, dace.Memlet())
+
+        self._inputs.update(pv._inputs)
+        self._outputs.update(pv._outputs)
+        return entry, exit
+
     def _visit_user(self, ast_node: isl.AstNode, loop_ranges, constraints):
         ast_expr = ast_node.user_get_expr()
         if ast_expr.get_op_type() != isl.ast_expr_op_type.call:
@@ -248,28 +678,65 @@ class Generator:
             ref = Value.canonicalize(ref)
             inputs = set(["_in"])
             outputs = set(["_out"])
+            if isinstance(access, Indirection):
+                inputs.update(
+                    Value.canonicalize(index.reference) for index in access.indices()
+                )
+                code = access.as_cpp() + ";"
+            else:
+                code = "_out = " + access.as_cpp() + ";"
             tasklet = state.add_tasklet(
                 name=ref,
                 inputs=inputs,
                 outputs=outputs,
-                code="_out = " + access.as_cpp() + ";",
+                code=code,
                 language=dace.dtypes.Language.CPP,
             )
 
             # Input
-            arguments = access.arguments()
-            arg = next(arguments.__iter__())
+            if isinstance(access, Indirection):
+                arg = access.value()
+            else:
+                arguments = access.arguments()
+                arg = next(arguments.__iter__())
             node = self._generate_argument(state, arg, temps, reads)
             state.add_edge(
                 node, None, tasklet, "_in", dace.Memlet(data=node.data, expr=None)
             )
 
             # Output
-            if access.array not in writes:
-                writes[access.array] = state.add_access(access.array)
-                self._outputs.add(access.array)
+            if isinstance(access, Indirection):
+                # Scatter: The indices are inputs of the tasklet
+                for index in access.indices():
+                    node = self._generate_argument(state, index, temps, reads)
+                    state.add_edge(
+                        node,
+                        None,
+                        tasklet,
+                        Value.canonicalize(index.reference),
+                        dace.Memlet(data=node.data, expr=None),
+                    )
+
+                if access.array not in writes:
+                    writes[access.array] = state.add_access(access.array)
+                    self._outputs.add(access.array)
+
+                memlet = access.memlet(self._sdfg.arrays[access.array])
+            elif access.array in self._registers:
+                register = self._registers[access.array]
+                if access.array not in writes:
+                    writes[access.array] = state.add_access(register)
+                    self._outputs.add(register)
+
+                memlet = dace.Memlet(data=register, expr=None)
+            else:
+                if access.array not in writes:
+                    writes[access.array] = state.add_access(access.array)
+                    self._outputs.add(access.array)
+
+                memlet = access.memlet()
 
-            state.add_edge(tasklet, "_out", writes[access.array], None, access.memlet())
+            state.add_edge(tasklet, "_out", writes[access.array], None, memlet)
             temps[access.reference] = tasklet
 
         return state, state
@@ -294,7 +761,21 @@ class Generator:
             code="_out = " + value.as_cpp() + ";",
             language=dace.dtypes.Language.CPP,
         )
-        if isinstance(value, Access):
+        if isinstance(value, Access) and value.array in self._registers:
+            register = self._registers[value.array]
+            if value.array not in reads:
+                reads[value.array] = state.add_access(register)
+                self._inputs.add(register)
+
+            tasklet.add_in_connector("_in")
+            state.add_edge(
+                reads[value.array],
+                None,
+                tasklet,
+                "_in",
+                dace.Memlet(data=register, expr=None),
+            )
+        elif isinstance(value, Access):
             if value.array not in reads:
                 node = state.add_access(value.array)
                 reads[value.array] = node
@@ -337,12 +818,7 @@ class Generator:
                     dace.Memlet(data=node.data, expr=None),
                 )
 
-        temp, _ = self._sdfg.add_scalar(
-            name="temp" + Value.canonicalize(value.reference),
-            find_new_name=True,
-            dtype=value.dtype,
-            transient=True,
-        )
+        temp = self._add_temporary(state, value)
         access_node = state.add_access(temp)
         state.add_edge(
             tasklet,
@@ -355,19 +831,59 @@ class Generator:
 
         return access_node
 
+    def _add_temporary(self, state: dace.SDFGState, value: Value) -> str:
+        """
+        Intermediate values are local to the state of their statement. The
+        transient scalars are therefore shared by all states, such that their
+        number grows with the largest statement and not with the number of
+        instructions.
+        """
+        used = self._used_temporaries.setdefault(state, {})
+        index = used.get(value.dtype, 0)
+        used[value.dtype] = index + 1
+
+        temporaries = self._temporaries.setdefault(value.dtype, [])
+        if index < len(temporaries):
+            return temporaries[index]
+
+        temp, _ = self._sdfg.add_scalar(
+            name="temp" + Value.canonicalize(value.reference),
+            find_new_name=True,
+            dtype=value.dtype,
+            transient=True,
+        )
+        temporaries.append(temp)
+        return temp
+
     @staticmethod
-    def generate(scop: Scop) -> dace.SDFG:
+    def generate(
+        scop: Scop,
+        library_nodes: bool = False,
+        scalar_replacement: bool = False,
+        inspector: bool = False,
+        reductions: bool = False,
+        parallel_reductions: bool = False,
+    ) -> dace.SDFG:
         daisycache = Path() / ".daisycache"
 
-        sdfg = dace.SDFG(Generator._sdfg_name(scop.name, scop.source))
+        sdfg = dace.SDFG(Generator.sdfg_name(scop))
         sdfg.build_folder = str(daisycache / sdfg.name / "dacecache")
 
         for _, param in scop._parameters.items():
             sdfg.add_symbol(param.name, param.dtype)
 
+        # Arrays of Polly's alias groups are not declared __restrict__
+        aliasing = aliasing_arrays(scop)
         for _, memref in scop._memrefs.items():
             if memref.kind == "array":
-                sdfg.add_array(memref.name, memref.shape, memref.dtype, transient=False)
+                sdfg.add_array(
+                    memref.name,
+                    memref.shape,
+                    memref.dtype,
+                    transient=False,
+                    alignment=memref.alignment,
+                    may_alias=memref.name in aliasing,
+                )
             elif memref.kind == "value":
                 sdfg.add_scalar(memref.name, memref.dtype, transient=False)
             else:
@@ -375,7 +891,15 @@ class Generator:
 
         # Generation
         init_state = sdfg.add_state("init_state", is_start_state=True)
-        generator = Generator(sdfg=sdfg, scop=scop)
+        generator = Generator(
+            sdfg=sdfg,
+            scop=scop,
+            library_nodes=library_nodes,
+            scalar_replacement=scalar_replacement,
+            inspector=inspector,
+            reductions=reductions,
+            parallel_reductions=parallel_reductions,
+        )
         first_state, last_state = generator._visit(scop.ast, [], [])
         sdfg.add_edge(init_state, first_state, dace.InterstateEdge())
 
@@ -384,7 +908,12 @@ class Generator:
         return sdfg
 
     @staticmethod
-    def validate(sdfg: dace.SDFG, scop: Scop) -> bool:
+    def validate(sdfg: dace.SDFG, scop: Scop, sizes: Iterable[str] = None) -> bool:
+        """
+        Checks that the signature of the SDFG matches the arguments passed by the plugin:
+        arrays and scalars of the scop followed by the symbols, i.e., the parameters
+        and the symbolic array sizes sorted by name.
+        """
         arguments = []
         for name, memref in scop._memrefs.items():
             if memref.kind != "array":
@@ -398,13 +927,23 @@ class Generator:
 
             arguments.append(name)
 
-        for _, param in scop._parameters.items():
-            arguments.append(param.name)
+        # The symbols are sorted as by SDFG.arglist, the metadata lists their order
+        symbols = [param.name for param in scop._parameters.values()]
+        if sizes is not None:
+            symbols.extend(sizes)
+        arguments.extend(sorted(symbols))
 
         assert len(sdfg.arglist()) == len(arguments)
         for i, name in enumerate(sdfg.arglist().keys()):
             assert name == arguments[i]
 
+    @staticmethod
+    def sdfg_name(scop: Scop) -> str:
+        """
+        The name of the scop's SDFG, which is stable across builds.
+        """
+        return Generator._sdfg_name(scop.name, scop.source)
+
     @staticmethod
     def _sdfg_name(scop_name: str, source: str) -> str:
         return (
@@ -0,0 +1,227 @@
+import dace
+import islpy as isl
+
+from typing import Dict, List, Optional, Tuple
+
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.scop.computation.indirection import Indirection
+from scop2sdfg.scop.triage import count_instances
+from scop2sdfg.codegen.isl import to_sympy
+
+# Cost of an access with a large stride relative to a contiguous access, i.e.,
+# the elements of a cache line, which are not used by the next iterations
+_STRIDED_COST = 8
+
+
+def transform_layouts(sdfg: dace.SDFG, scop: Scop) -> Dict[str, List[int]]:
+    """
+    Changes the layout of arrays, which are mostly accessed in transposed
+    order. The innermost loop of a statement determines the dimension of each
+    access, which should be contiguous. An array is copied into a transient
+    with that dimension as stride one before the SDFG and copied back after
+    it if the array is written. The layout is only changed if the saved
+    strided accesses amortize the copies.
+
+    :return: The order of the dimensions (from slowest to fastest) by array
+    """
+    # Sizes known at compile time
+    constants = {
+        dace.symbolic.symbol(name): value for name, value in sdfg.constants.items()
+    }
+
+    layouts = {}
+    for name, (weights, written) in _access_weights(scop).items():
+        desc = sdfg.arrays[name]
+        if len(desc.shape) < 2 or _accessed_by_library_node(sdfg, name):
+            continue
+
+        # The gain of arrays with symbolic sizes is unknown
+        elements = dace.symbolic.pystr_to_symbolic(desc.total_size)
+        elements = dace.symbolic.simplify(elements.subs(constants))
+        if dace.symbolic.issymbolic(elements):
+            continue
+
+        last = len(desc.shape) - 1
+        dim = max(range(last), key=lambda d: weights[d])
+        saved = (weights[dim] - weights[last]) * (_STRIDED_COST - 1)
+        copies = 2 if written else 1
+        if saved <= elements * copies * (_STRIDED_COST + 1):
+            continue
+
+        order = [d for d in range(len(desc.shape)) if d != dim] + [dim]
+        if _apply_layout(sdfg, name, order, written):
+            layouts[name] = order
+
+    return layouts
+
+
+def _access_weights(scop: Scop) -> Dict[str, Tuple[List[int], bool]]:
+    # The number of accesses to each array, whose index varies with the
+    # innermost loop of the statement in the dimension
+    innermost_loops = {}
+    _innermost_loops(scop.ast, None, innermost_loops)
+
+    weights = {}
+    excluded = set()
+    for stmt, accesses in scop._memory_accesses.items():
+        statement = scop._statements[stmt]
+        instances = count_instances(statement["domain"], scop._context)
+        innermost = innermost_loops.get(stmt)
+        for access in accesses.values():
+            memref = scop._memrefs[access.array]
+            if memref.kind != "array":
+                continue
+            if isinstance(access, Indirection) or instances is None:
+                # The index of indirect accesses is computed by the tasklet
+                excluded.add(access.array)
+                continue
+
+            dim_weights, written = weights.setdefault(
+                access.array, ([0] * len(memref.shape), False)
+            )
+            weights[access.array] = (dim_weights, written or access.kind == "write")
+            if innermost is None:
+                continue
+
+            dims = [
+                d
+                for d, index in enumerate(access.expr)
+                if innermost in [str(symbol) for symbol in index.free_symbols]
+            ]
+            if len(dims) == 1:
+                dim_weights[dims[0]] += instances
+
+    return {name: value for name, value in weights.items() if name not in excluded}
+
+
+def _innermost_loops(node: isl.AstNode, iterator: str, loops: Dict[str, str]):
+    # The iterator of the innermost loop enclosing each statement
+    if node.get_type() == isl.ast_node_type.block:
+        children = node.block_get_children()
+        for i in range(children.n_ast_node()):
+            _innermost_loops(children.get_at(i), iterator, loops)
+    elif node.get_type() == isl.ast_node_type.for_:
+        iterator = str(to_sympy(node.for_get_iterator()))
+        _innermost_loops(node.for_get_body(), iterator, loops)
+    elif node.get_type() == isl.ast_node_type.if_:
+        _innermost_loops(node.if_get_then_node(), iterator, loops)
+        if node.if_has_else_node():
+            _innermost_loops(node.if_get_else_node(), iterator, loops)
+    elif node.get_type() == isl.ast_node_type.user:
+        stmt = node.user_get_expr().get_op_arg(0).to_C_str()
+        loops[stmt] = iterator
+
+
+def _accessed_by_library_node(sdfg: dace.SDFG, name: str) -> bool:
+    for state in sdfg.states():
+        for node in state.data_nodes():
+            if node.data != name:
+                continue
+
+            for edge in state.all_edges(node):
+                other = edge.dst if edge.src is node else edge.src
+                if isinstance(other, dace.nodes.LibraryNode):
+                    return True
+
+    return False
+
+
+def _strides(shape: List, order: List[int]) -> List:
+    strides = [1] * len(shape)
+    stride = 1
+    for d in reversed(order):
+        strides[d] = stride
+        stride = stride * shape[d]
+    return strides
+
+
+def _apply_layout(sdfg: dace.SDFG, name: str, order: List[int], written: bool) -> bool:
+    desc = sdfg.arrays[name]
+    strides = _strides(desc.shape, order)
+
+    # The arrays of nested SDFGs must be views of the entire array
+    nested = _nested_arrays(sdfg, name)
+    if nested is None:
+        return False
+
+    layout, layout_desc = sdfg.add_transient(
+        name + "_layout",
+        desc.shape,
+        desc.dtype,
+        strides=strides,
+        find_new_name=True,
+    )
+    for state in sdfg.states():
+        for node in state.data_nodes():
+            if node.data == name:
+                node.data = layout
+        for edge in state.edges():
+            if edge.data.data == name:
+                edge.data.data = layout
+
+    for nsdfg, inner in nested:
+        inner_desc = nsdfg.arrays[inner]
+        inner_desc.strides = tuple(strides)
+        inner_desc.total_size = layout_desc.total_size
+
+    # Copies at the boundary of the SDFG
+    ranges = {f"__i{d}": f"0:{size}" for d, size in enumerate(desc.shape)}
+    index = ", ".join(ranges.keys())
+
+    copy_in = sdfg.add_state_before(sdfg.start_state, f"layout_{layout}")
+    copy_in.add_mapped_tasklet(
+        f"pack_{layout}",
+        ranges,
+        {"_in": dace.Memlet(f"{name}[{index}]")},
+        "_out = _in",
+        {"_out": dace.Memlet(f"{layout}[{index}]")},
+        external_edges=True,
+    )
+
+    if written:
+        sinks = [state for state in sdfg.states() if sdfg.out_degree(state) == 0]
+        copy_out = sdfg.add_state(f"unpack_{layout}")
+        for sink in sinks:
+            sdfg.add_edge(sink, copy_out, dace.InterstateEdge())
+
+        copy_out.add_mapped_tasklet(
+            f"unpack_{layout}",
+            ranges,
+            {"_in": dace.Memlet(f"{layout}[{index}]")},
+            "_out = _in",
+            {"_out": dace.Memlet(f"{name}[{index}]")},
+            external_edges=True,
+        )
+
+    return True
+
+
+def _nested_arrays(sdfg: dace.SDFG, name: str) -> Optional[List[Tuple[dace.SDFG, str]]]:
+    # Arrays of the nested SDFGs, which are connected to the array
+    shape = sdfg.arrays[name].shape
+    arrays = []
+    for state in sdfg.states():
+        for node in state.nodes():
+            if not isinstance(node, dace.nodes.NestedSDFG):
+                continue
+
+            connectors = set()
+            for edge in state.in_edges(node):
+                if edge.data.data == name:
+                    connectors.add(edge.dst_conn)
+            for edge in state.out_edges(node):
+                if edge.data.data == name:
+                    connectors.add(edge.src_conn)
+
+            for conn in connectors:
+                inner = node.sdfg.arrays[conn]
+                if tuple(inner.shape) != tuple(shape):
+                    return None
+
+                arrays.append((node.sdfg, conn))
+                deeper = _nested_arrays(node.sdfg, conn)
+                if deeper is None:
+                    return None
+                arrays.extend(deeper)
+
+    return arrays
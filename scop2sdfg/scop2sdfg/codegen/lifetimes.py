@@ -0,0 +1,92 @@
+import dace
+
+from typing import Dict, Set
+
+
+def optimize_lifetimes(sdfg: dace.SDFG) -> Dict[str, dace.AllocationLifetime]:
+    """
+    Hoists the allocation of transient arrays with the default (scope)
+    lifetime out of the hot path. Arrays whose shapes only depend on the
+    symbols passed to __dace_init are allocated once at initialization
+    (persistent), all others once per call (SDFG). Arrays private to the
+    iterations of parallel maps are not changed.
+
+    :return: The new lifetimes of the arrays
+    """
+    lifetimes = {}
+    for nsdfg in sdfg.all_sdfgs_recursive():
+        if _in_parallel_scope(nsdfg):
+            continue
+
+        init_symbols = _init_symbols(nsdfg)
+        for name, desc in nsdfg.arrays.items():
+            if not desc.transient or not isinstance(desc, dace.data.Array):
+                continue
+            if isinstance(desc, dace.data.View):
+                continue
+            if desc.lifetime != dace.AllocationLifetime.Scope:
+                continue
+            if desc.storage not in (
+                dace.StorageType.Default,
+                dace.StorageType.CPU_Heap,
+                dace.StorageType.GPU_Global,
+            ):
+                continue
+            if _used_in_parallel_scope(nsdfg, name):
+                continue
+
+            if set(str(sym) for sym in desc.free_symbols) <= init_symbols:
+                desc.lifetime = dace.AllocationLifetime.Persistent
+            else:
+                desc.lifetime = dace.AllocationLifetime.SDFG
+            lifetimes[name] = desc.lifetime
+
+    return lifetimes
+
+
+def _is_parallel(entry: dace.nodes.EntryNode) -> bool:
+    return entry.schedule != dace.ScheduleType.Sequential
+
+
+def _in_parallel_scope(sdfg: dace.SDFG) -> bool:
+    # Nested SDFGs in parallel maps are executed by many threads
+    while sdfg.parent_nsdfg_node is not None:
+        state = sdfg.parent
+        scope = state.scope_dict()[sdfg.parent_nsdfg_node]
+        while scope is not None:
+            if _is_parallel(scope):
+                return True
+            scope = state.scope_dict()[scope]
+
+        sdfg = sdfg.parent_sdfg
+
+    return False
+
+
+def _used_in_parallel_scope(sdfg: dace.SDFG, name: str) -> bool:
+    for state in sdfg.states():
+        scope_dict = state.scope_dict()
+        for node in state.data_nodes():
+            if node.data != name:
+                continue
+
+            scope = scope_dict[node]
+            while scope is not None:
+                if _is_parallel(scope):
+                    return True
+                scope = scope_dict[scope]
+
+    return False
+
+
+def _init_symbols(sdfg: dace.SDFG) -> Set[str]:
+    # Symbols known to __dace_init, which evaluates the shapes of all
+    # persistent arrays in the scope of the top-level SDFG
+    if sdfg.parent_nsdfg_node is None:
+        return set(sdfg.free_symbols) | set(sdfg.constants.keys())
+
+    outer = _init_symbols(sdfg.parent_sdfg)
+    mapping = sdfg.parent_nsdfg_node.symbol_mapping
+    return set(
+        name for name, value in mapping.items() if str(value) == name and name in outer
+    )
@@ -0,0 +1,533 @@
+import re
+import copy
+import dace
+
+from typing import Dict, List, Set
+
+from dace.sdfg.graph import SubgraphView
+from dace.transformation.helpers import nest_sdfg_subgraph
+
+
+def apply_openmp_policy(
+    sdfg: dace.SDFG, min_iterations: int = 64, num_threads: int = 0
+) -> None:
+    """
+    Configures the OpenMP loops of the parallel maps of an SDFG with
+    inferred schedules:
+
+    - Maps with fewer iterations than min_iterations are executed
+      sequentially. If the number of iterations is symbolic, the state is
+      duplicated and the parallel version is selected at runtime.
+    - Maps, whose iterations are imbalanced (inner loop bounds or branches
+      depend on the map parameters) or irregular (indirect accesses), are
+      scheduled dynamically and all others statically.
+    - Adjacent states of statically scheduled maps share a parallel region.
+
+    :param min_iterations: Minimal number of iterations of a parallel map
+    :param num_threads: Number of threads of the parallel regions, 0 for the
+                        default of the OpenMP runtime
+    """
+    # Sizes known at compile time
+    constants = {
+        dace.symbolic.symbol(name): value for name, value in sdfg.constants.items()
+    }
+
+    for nsdfg in list(sdfg.all_sdfgs_recursive()):
+        for state in nsdfg.states():
+            for entry in _parallel_maps(state):
+                iterations = _iterations(entry, constants)
+                if not dace.symbolic.issymbolic(iterations):
+                    if int(iterations) < min_iterations:
+                        entry.map.schedule = dace.ScheduleType.Sequential
+                        continue
+
+                entry.map.omp_num_threads = num_threads
+                if _is_irregular(state.scope_subgraph(entry), set(entry.map.params)):
+                    entry.map.omp_schedule = dace.OMPScheduleType.Dynamic
+                else:
+                    entry.map.omp_schedule = dace.OMPScheduleType.Static
+
+    for nsdfg in list(sdfg.all_sdfgs_recursive()):
+        for region in _parallel_regions(nsdfg, constants):
+            _share_parallel_region(nsdfg, region, num_threads)
+
+    for nsdfg in list(sdfg.all_sdfgs_recursive()):
+        for state in list(nsdfg.states()):
+            maps = _parallel_maps(state)
+            iterations = sum(_iterations(entry, constants) for entry in maps)
+            if maps and dace.symbolic.issymbolic(iterations):
+                _guard_parallel_state(nsdfg, state, iterations, min_iterations)
+
+    _set_parents(sdfg)
+    sdfg.reset_sdfg_list()
+    dace.sdfg.infer_types.set_default_schedule_and_storage_types(sdfg, None)
+
+
+def apply_first_touch(sdfg: dace.SDFG) -> List[str]:
+    """
+    Initializes the transient arrays of the SDFG by parallel loops with the
+    schedule of the parallel maps consuming the arrays, such that each page
+    is first touched, i.e., placed on the NUMA node of the thread that
+    accesses it. Persistent arrays are initialized once in __dace_init, all
+    others by parallel maps before the first state, i.e., once per call.
+
+    :return: The initialized arrays
+    """
+    arrays = [
+        name
+        for name, desc in sdfg.arrays.items()
+        if desc.transient
+        and isinstance(desc, dace.data.Array)
+        and not isinstance(desc, dace.data.View)
+        and desc.storage in (dace.StorageType.Default, dace.StorageType.CPU_Heap)
+        and desc.lifetime
+        in (
+            dace.AllocationLifetime.Scope,
+            dace.AllocationLifetime.SDFG,
+            dace.AllocationLifetime.Persistent,
+        )
+    ]
+    # Unused persistent arrays are not allocated
+    used = set(node.data for state in sdfg.states() for node in state.data_nodes())
+    arrays = [
+        name
+        for name in arrays
+        if name in used
+        or sdfg.arrays[name].lifetime != dace.AllocationLifetime.Persistent
+    ]
+    if not arrays:
+        return []
+
+    # Schedules of the consuming maps
+    consumers = {}
+    for state in sdfg.states():
+        for entry in _parallel_maps(state):
+            nodes = [edge.src for edge in state.in_edges(entry)]
+            nodes += [edge.dst for edge in state.out_edges(state.exit_node(entry))]
+            for node in nodes:
+                if isinstance(node, dace.nodes.AccessNode):
+                    consumers.setdefault(node.data, entry.map)
+
+    start_state = sdfg.start_state
+    for name in arrays:
+        if sdfg.arrays[name].lifetime == dace.AllocationLifetime.Persistent:
+            # Allocated before the init code of the tasklets in __dace_init
+            start_state.add_tasklet(
+                "first_touch_" + name,
+                {},
+                {},
+                "",
+                language=dace.Language.CPP,
+                code_init=_first_touch_loop(sdfg, name, consumers.get(name)),
+            )
+    arrays_per_call = [
+        name
+        for name in arrays
+        if sdfg.arrays[name].lifetime != dace.AllocationLifetime.Persistent
+    ]
+    if not arrays_per_call:
+        return arrays
+
+    state = sdfg.add_state_before(
+        start_state, "first_touch", is_start_state=start_state is sdfg.start_state
+    )
+    for name in arrays_per_call:
+        desc = sdfg.arrays[name]
+
+        # Allocated once for all states
+        desc.lifetime = dace.AllocationLifetime.SDFG
+
+        params = [f"__i{dim}" for dim in range(len(desc.shape))]
+        _, entry, _ = state.add_mapped_tasklet(
+            "first_touch_" + name,
+            {param: f"0:{size}" for param, size in zip(params, desc.shape)},
+            inputs={},
+            code="_out = 0",
+            outputs={"_out": dace.Memlet(data=name, subset=", ".join(params))},
+            schedule=dace.ScheduleType.CPU_Multicore,
+            external_edges=True,
+        )
+
+        consumer = consumers.get(name)
+        if consumer is not None:
+            entry.map.omp_schedule = consumer.omp_schedule
+            entry.map.omp_chunk_size = consumer.omp_chunk_size
+            entry.map.omp_num_threads = consumer.omp_num_threads
+        else:
+            entry.map.omp_schedule = dace.OMPScheduleType.Static
+
+    dace.sdfg.infer_types.set_default_schedule_and_storage_types(sdfg, None)
+    return arrays
+
+
+def vectorize_innermost_maps(code: str, sdfg: dace.SDFG) -> str:
+    """
+    Adds OpenMP SIMD pragmas to the innermost loops of the innermost maps in
+    the generated code of an SDFG, such that the host compiler vectorizes
+    them without proving their independence. The pragmas of the maps of the
+    top-level SDFG declare the alignment of the aligned arguments.
+
+    Maps with write-conflict resolution, nested maps or loops, and library
+    nodes are not vectorized.
+    """
+    loops = {}
+    for node, state in sdfg.all_nodes_recursive():
+        if not isinstance(node, dace.nodes.MapEntry):
+            continue
+        if not _is_vectorizable(state, node):
+            continue
+
+        nsdfg = state.parent
+        marker = f"{nsdfg.sdfg_id}:{nsdfg.node_id(state)}:{state.node_id(node)}"
+        loops[marker] = _aligned_clauses(state, node) if nsdfg is sdfg else ""
+
+    lines = code.split("\n")
+    vectorized = []
+    index = 0
+    while index < len(lines):
+        marker = _loop_marker(lines[index])
+        if marker not in loops:
+            vectorized.append(lines[index])
+            index += 1
+            continue
+
+        # The loops of a multi-dimensional map are nested directly
+        group = [lines[index]]
+        index += 1
+        while index < len(lines) and _loop_marker(lines[index]) == marker:
+            group.append(lines[index])
+            index += 1
+
+        indent = group[-1][: len(group[-1]) - len(group[-1].lstrip())]
+        shared = None
+        if vectorized:
+            shared = re.match(r"\s*#pragma omp (?:parallel )?for\b", vectorized[-1])
+        if shared is None:
+            group.insert(-1, f"{indent}#pragma omp simd{loops[marker]}")
+        elif "collapse" in vectorized[-1]:
+            # The collapsed loops are work-shared as a whole
+            pass
+        elif len(group) == 1:
+            vectorized[-1] = vectorized[-1].replace(
+                shared.group(0).strip(),
+                shared.group(0).strip() + " simd" + loops[marker],
+                1,
+            )
+        else:
+            group.insert(-1, f"{indent}#pragma omp simd{loops[marker]}")
+        vectorized.extend(group)
+
+    return "\n".join(vectorized)
+
+
+def _first_touch_loop(sdfg: dace.SDFG, name: str, consumer: dace.nodes.Map) -> str:
+    # A parallel loop over the persistent array in the state struct
+    desc = sdfg.arrays[name]
+    clauses = " schedule(static)"
+    if consumer is not None:
+        if consumer.omp_schedule == dace.OMPScheduleType.Dynamic:
+            clauses = " schedule(dynamic)"
+        elif consumer.omp_schedule == dace.OMPScheduleType.Guided:
+            clauses = " schedule(guided)"
+        if consumer.omp_chunk_size > 0:
+            clauses = clauses[:-1] + f", {consumer.omp_chunk_size})"
+        if consumer.omp_num_threads > 0:
+            clauses += f" num_threads({consumer.omp_num_threads})"
+
+    size = dace.symbolic.symstr(desc.total_size, cpp_mode=True)
+    return (
+        f"#pragma omp parallel for{clauses}\n"
+        + f"for (long long __i = 0; __i < {size}; ++__i) {{\n"
+        + f"    __state->__{sdfg.sdfg_id}_{name}[__i] = 0;\n"
+        + "}\n"
+    )
+
+
+def bind_parallel_regions(code: str, proc_bind: str) -> str:
+    """
+    Adds a proc_bind clause to the OpenMP parallel regions of generated code.
+    The threads are bound to the places given by OMP_PLACES.
+
+    :param proc_bind: The affinity policy, i.e., close, spread or primary
+    """
+    return re.sub(
+        r"(#pragma omp parallel(?: for)?(?: simd)?)(?! sections)(?![^\n]*proc_bind)",
+        rf"\1 proc_bind({proc_bind})",
+        code,
+    )
+
+
+def _is_vectorizable(state: dace.SDFGState, entry: dace.nodes.MapEntry) -> bool:
+    # Innermost maps of independent iterations without inner loops
+    if entry.map.schedule not in (
+        dace.ScheduleType.Default,
+        dace.ScheduleType.Sequential,
+        dace.ScheduleType.CPU_Multicore,
+    ):
+        return False
+
+    scope = state.scope_subgraph(entry)
+    edges = list(scope.edges()) + list(state.out_edges(state.exit_node(entry)))
+    if any(edge.data.wcr is not None for edge in edges):
+        return False
+
+    for node in scope.nodes():
+        if isinstance(node, dace.nodes.MapEntry) and node is not entry:
+            return False
+        if isinstance(node, dace.nodes.LibraryNode):
+            return False
+        if (
+            isinstance(node, dace.nodes.Tasklet)
+            and "#pragma omp" in node.code.as_string
+        ):
+            return False
+        if isinstance(node, dace.nodes.NestedSDFG):
+            if any(nsdfg.has_cycles() for nsdfg in node.sdfg.all_sdfgs_recursive()):
+                return False
+            for inner, _ in node.sdfg.all_nodes_recursive():
+                if isinstance(inner, (dace.nodes.MapEntry, dace.nodes.LibraryNode)):
+                    return False
+
+    return True
+
+
+def _aligned_clauses(state: dace.SDFGState, entry: dace.nodes.MapEntry) -> str:
+    # The aligned arguments accessed in the scope, grouped by alignment
+    sdfg = state.parent
+    arrays = {}
+    for edge in state.scope_subgraph(entry).edges():
+        if edge.data.data is None or edge.data.data in arrays:
+            continue
+        desc = sdfg.arrays[edge.data.data]
+        if isinstance(desc, dace.data.Array) and not desc.transient:
+            if desc.alignment > 0:
+                arrays[edge.data.data] = desc.alignment
+
+    clauses = ""
+    for alignment in sorted(set(arrays.values())):
+        names = ", ".join(name for name, value in arrays.items() if value == alignment)
+        clauses += f" aligned({names}: {alignment})"
+    return clauses
+
+
+def _loop_marker(line: str) -> str:
+    # The node of a generated loop, i.e., the first location identifier
+    if not line.lstrip().startswith("for ("):
+        return None
+    match = re.search(r"////__DACE:(\d+:\d+:\d+)\b", line)
+    return match.group(1) if match is not None else None
+
+
+def _iterations(entry: dace.nodes.MapEntry, constants: Dict):
+    iterations = entry.map.range.num_elements()
+    if dace.symbolic.issymbolic(iterations):
+        iterations = dace.symbolic.simplify(iterations.subs(constants))
+    return iterations
+
+
+def _parallel_maps(state: dace.SDFGState) -> List[dace.nodes.MapEntry]:
+    return [
+        node
+        for node in state.nodes()
+        if isinstance(node, dace.nodes.MapEntry)
+        and node.map.schedule == dace.ScheduleType.CPU_Multicore
+    ]
+
+
+def _is_irregular(graph, symbols: Set[str]) -> bool:
+    # Loop bounds or conditions depending on the symbols, or indirect accesses
+    for edge in graph.edges():
+        if edge.data.dynamic:
+            return True
+
+    for node in graph.nodes():
+        if isinstance(node, dace.nodes.MapEntry):
+            if symbols & set(str(sym) for sym in node.map.range.free_symbols):
+                return True
+        elif isinstance(node, dace.nodes.NestedSDFG):
+            inner = set(
+                name
+                for name, value in node.symbol_mapping.items()
+                if symbols
+                & set(
+                    str(sym)
+                    for sym in dace.symbolic.pystr_to_symbolic(value).free_symbols
+                )
+            )
+            for edge in node.sdfg.edges():
+                if inner & edge.data.free_symbols:
+                    return True
+            for state in node.sdfg.states():
+                if _is_irregular(state, inner):
+                    return True
+
+    return False
+
+
+def _is_parallel_state(sdfg: dace.SDFG, state: dace.SDFGState, constants: Dict) -> bool:
+    # Statically scheduled maps, which access the arguments of the SDFG only
+    maps = _parallel_maps(state)
+    if not maps:
+        return False
+
+    for entry in maps:
+        if entry.map.omp_schedule != dace.OMPScheduleType.Static:
+            return False
+        if dace.symbolic.issymbolic(_iterations(entry, constants)):
+            return False
+
+    # Copies outside of the maps would be executed by all threads
+    for edge in state.edges():
+        if isinstance(edge.src, dace.nodes.AccessNode) and isinstance(
+            edge.dst, dace.nodes.AccessNode
+        ):
+            return False
+
+    scope = state.scope_dict()
+    for node in state.nodes():
+        if scope[node] is not None or isinstance(node, dace.nodes.MapEntry):
+            continue
+        if isinstance(node, dace.nodes.MapExit):
+            continue
+        if not isinstance(node, dace.nodes.AccessNode):
+            return False
+        if sdfg.arrays[node.data].transient:
+            return False
+
+    return True
+
+
+def _parallel_regions(sdfg: dace.SDFG, constants: Dict) -> List[List[dace.SDFGState]]:
+    # Chains of parallel states connected by unconditional edges
+    regions = []
+    visited = set()
+    for state in sdfg.states():
+        if state in visited or not _is_parallel_state(sdfg, state, constants):
+            continue
+
+        # Extend to the first state of the chain
+        first = state
+        while True:
+            in_edges = sdfg.in_edges(first)
+            if len(in_edges) != 1 or not _is_plain_edge(sdfg, in_edges[0]):
+                break
+            if not _is_parallel_state(sdfg, in_edges[0].src, constants):
+                break
+            first = in_edges[0].src
+
+        region = [first]
+        while True:
+            out_edges = sdfg.out_edges(region[-1])
+            if len(out_edges) != 1 or not _is_plain_edge(sdfg, out_edges[0]):
+                break
+            if not _is_parallel_state(sdfg, out_edges[0].dst, constants):
+                break
+            if out_edges[0].dst in region:
+                break
+            region.append(out_edges[0].dst)
+
+        visited.update(region)
+        if len(region) > 1:
+            regions.append(region)
+
+    return regions
+
+
+def _is_plain_edge(sdfg: dace.SDFG, edge) -> bool:
+    return (
+        edge.data.is_unconditional()
+        and not edge.data.assignments
+        and len(sdfg.out_edges(edge.src)) == 1
+        and len(sdfg.in_edges(edge.dst)) == 1
+    )
+
+
+def _share_parallel_region(
+    sdfg: dace.SDFG, region: List[dace.SDFGState], num_threads: int
+) -> None:
+    # The maps become work-sharing loops in a single parallel region
+    state = nest_sdfg_subgraph(sdfg, SubgraphView(sdfg, region), start=region[0])
+    nsdfg = next(
+        node for node in state.nodes() if isinstance(node, dace.nodes.NestedSDFG)
+    )
+    nsdfg.sdfg.openmp_sections = False
+
+    entry, exit = state.add_map(
+        "parallel_region",
+        {"__tid": "0:1"},
+        schedule=dace.ScheduleType.CPU_Persistent,
+    )
+    entry.map.omp_num_threads = num_threads
+
+    for edge in list(state.in_edges(nsdfg)):
+        state.remove_edge(edge)
+        conn = "IN_" + edge.data.data
+        entry.add_in_connector(conn)
+        entry.add_out_connector("OUT_" + edge.data.data)
+        state.add_edge(edge.src, edge.src_conn, entry, conn, _memlet(sdfg, edge))
+        state.add_edge(
+            entry, "OUT_" + edge.data.data, nsdfg, edge.dst_conn, _memlet(sdfg, edge)
+        )
+    if not state.in_edges(nsdfg):
+        state.add_edge(entry, None, nsdfg, None, dace.Memlet())
+
+    for edge in list(state.out_edges(nsdfg)):
+        state.remove_edge(edge)
+        conn = "OUT_" + edge.data.data
+        exit.add_in_connector("IN_" + edge.data.data)
+        exit.add_out_connector(conn)
+        state.add_edge(
+            nsdfg, edge.src_conn, exit, "IN_" + edge.data.data, _memlet(sdfg, edge)
+        )
+        state.add_edge(exit, conn, edge.dst, edge.dst_conn, _memlet(sdfg, edge))
+    if not state.out_edges(nsdfg):
+        state.add_edge(nsdfg, None, exit, None, dace.Memlet())
+
+
+def _memlet(sdfg: dace.SDFG, edge) -> dace.Memlet:
+    return dace.Memlet.from_array(edge.data.data, sdfg.arrays[edge.data.data])
+
+
+def _guard_parallel_state(
+    sdfg: dace.SDFG, state: dace.SDFGState, iterations, min_iterations: int
+) -> None:
+    # A sequential copy of the state is executed for small iteration counts
+    sequential = copy.deepcopy(state)
+    sequential.label = state.label + "_sequential"
+    sdfg.add_node(sequential)
+    for node, _ in sequential.all_nodes_recursive():
+        if isinstance(node, dace.nodes.MapEntry):
+            node.map.schedule = dace.ScheduleType.Sequential
+
+    is_start_state = sdfg.start_state is state
+    guard = sdfg.add_state(state.label + "_guard")
+    for edge in list(sdfg.in_edges(state)):
+        sdfg.remove_edge(edge)
+        sdfg.add_edge(edge.src, guard, edge.data)
+    for edge in sdfg.out_edges(state):
+        sdfg.add_edge(sequential, edge.dst, copy.deepcopy(edge.data))
+    if is_start_state:
+        sdfg.start_state = sdfg.node_id(guard)
+
+    iterations = dace.symbolic.symstr(iterations)
+    sdfg.add_edge(
+        guard,
+        state,
+        dace.InterstateEdge(f"({iterations}) >= {min_iterations}"),
+    )
+    sdfg.add_edge(
+        guard,
+        sequential,
+        dace.InterstateEdge(f"({iterations}) < {min_iterations}"),
+    )
+
+
+def _set_parents(sdfg: dace.SDFG) -> None:
+    # States are moved between SDFGs
+    for state in sdfg.states():
+        for node in state.nodes():
+            if isinstance(node, dace.nodes.NestedSDFG):
+                node.sdfg.parent = state
+                node.sdfg.parent_sdfg = sdfg
+                node.sdfg.parent_nsdfg_node = node
+                _set_parents(node.sdfg)
@@ -0,0 +1,12 @@
+from scop2sdfg.codegen.patterns.nest import perfect_loop_nest
+from scop2sdfg.codegen.patterns.blas import (
+    BlasKernel,
+    blas_implementation,
+    blas_libraries,
+)
+from scop2sdfg.codegen.patterns.reduction import ScalarReduction
+from scop2sdfg.codegen.patterns.scalar_replacement import (
+    InvariantElement,
+    invariant_elements,
+)
+from scop2sdfg.codegen.patterns.inspector import IndirectScatter
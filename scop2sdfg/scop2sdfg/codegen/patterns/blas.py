@@ -0,0 +1,380 @@
+from __future__ import annotations
+
+import dace
+import islpy as isl
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+from dace.libraries.blas import Dot, Gemm, Gemv
+from dace.libraries.blas.environments import IntelMKL, OpenBLAS
+from dace.libraries.standard import Transpose
+
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.scop.value import Value
+from scop2sdfg.scop.computation.access import Access
+from scop2sdfg.scop.computation.computation import Computation
+from scop2sdfg.scop.symbols.constant import Constant
+
+from scop2sdfg.codegen.patterns.nest import perfect_loop_nest
+from scop2sdfg.codegen.patterns.matching import (
+    is_array,
+    is_read,
+    indices,
+    ordered_arguments,
+    same_element,
+)
+
+# BLAS environments in order of preference
+_ENVIRONMENTS = {
+    "MKL": IntelMKL,
+    "OpenBLAS": OpenBLAS,
+}
+
+
+class BlasKernel:
+    """
+    A loop nest computing a BLAS-like kernel (gemm, gemv, dot or transpose),
+    which is replaced by a library node during code generation. Axpy is not
+    matched, DaCe only provides its pure expansion.
+    """
+
+    def __init__(
+        self,
+        node_type: type,
+        ranges: Dict,
+        output: Access,
+        operands: Dict[str, Access],
+        properties: Dict,
+        accumulator: Optional[Access] = None,
+        alpha: float = 1.0,
+    ) -> None:
+        self._node_type = node_type
+        self._ranges = ranges
+        self._output = output
+        self._operands = operands
+        self._properties = properties
+        self._accumulator = accumulator
+        self._alpha = alpha
+
+    @property
+    def node_type(self) -> type:
+        return self._node_type
+
+    @property
+    def available(self) -> bool:
+        """
+        Whether a BLAS library implements the kernel. The pure expansions are
+        slower than the loop nest they replace.
+        """
+        return blas_implementation(self._node_type) != "pure"
+
+    def subset(self, access: Access) -> dace.subsets.Range:
+        dims = []
+        for index in access.expr:
+            if str(index) in self._ranges:
+                init, end = self._ranges[str(index)]
+                dims.append((init, end, 1))
+            else:
+                dims.append((index, index, 1))
+        return dace.subsets.Range(dims)
+
+    def apply(
+        self, sdfg: dace.SDFG, state: dace.SDFGState
+    ) -> Tuple[Set[str], Set[str]]:
+        node = self._node_type(self._node_type.__name__.lower(), **self._properties)
+        node.implementation = blas_implementation(self._node_type)
+        state.add_node(node)
+
+        reads = {}
+        for connector, access in self._operands.items():
+            if access.array not in reads:
+                reads[access.array] = state.add_read(access.array)
+
+            state.add_edge(
+                reads[access.array],
+                None,
+                node,
+                connector,
+                dace.Memlet(data=access.array, subset=self.subset(access)),
+            )
+
+        write = state.add_write(self._output.array)
+        output_memlet = dace.Memlet(
+            data=self._output.array, subset=self.subset(self._output)
+        )
+        if self._node_type is Dot:
+            # BLAS dot overwrites the result, accumulate explicitly
+            temp, _ = sdfg.add_scalar(
+                name="temp_dot",
+                dtype=self._output.dtype,
+                transient=True,
+                find_new_name=True,
+            )
+            result = state.add_access(temp)
+            state.add_edge(node, "_result", result, None, dace.Memlet(data=temp))
+
+            accumulator = self._accumulator
+            if accumulator.array not in reads:
+                reads[accumulator.array] = state.add_read(accumulator.array)
+
+            tasklet = state.add_tasklet(
+                name="accumulate",
+                inputs={"_in", "_dot"},
+                outputs={"_out"},
+                code=f"_out = _in + {self._alpha} * _dot;",
+                language=dace.dtypes.Language.CPP,
+            )
+            state.add_edge(
+                reads[accumulator.array],
+                None,
+                tasklet,
+                "_in",
+                dace.Memlet(data=accumulator.array, subset=self.subset(accumulator)),
+            )
+            state.add_edge(result, None, tasklet, "_dot", dace.Memlet(data=temp))
+            state.add_edge(tasklet, "_out", write, None, output_memlet)
+        else:
+            connector = _OUTPUT_CONNECTORS[self._node_type]
+            state.add_edge(node, connector, write, None, output_memlet)
+
+        return set(reads.keys()), set([self._output.array])
+
+    @staticmethod
+    def match(ast_node: isl.AstNode, scop: Scop) -> Optional[BlasKernel]:
+        """
+        Matches the loop nest rooted at ast_node against the supported BLAS kernels
+        by means of the access relations of its statement.
+        """
+        nest = perfect_loop_nest(ast_node)
+        if nest is None:
+            return None
+
+        ranges, stmt_name = nest
+        if stmt_name not in scop._memory_accesses:
+            return None
+
+        writes = [
+            access
+            for access in scop._memory_accesses[stmt_name].values()
+            if access.kind == "write"
+        ]
+        if len(writes) != 1 or not isinstance(writes[0], Access):
+            return None
+
+        output = writes[0]
+        if output.dtype not in (dace.float32, dace.float64):
+            return None
+
+        arguments = output.arguments()
+        if len(arguments) != 1:
+            return None
+        value = next(iter(arguments))
+
+        if is_read(value):
+            return BlasKernel._match_transpose(ranges, output, value, scop)
+
+        accumulation = _accumulation(value, output)
+        if accumulation is None:
+            return None
+
+        accumulator, factors, alpha = accumulation
+        for factor in factors:
+            if not is_read(factor) or factor.dtype != output.dtype:
+                return None
+            if factor.array == output.array or not is_array(factor, scop):
+                return None
+
+        if len(ranges) == 3 and len(factors) == 2:
+            return BlasKernel._match_gemm(ranges, output, accumulator, factors, alpha)
+        elif len(ranges) == 2 and len(factors) == 2:
+            return BlasKernel._match_gemv(ranges, output, accumulator, factors, alpha)
+        elif len(ranges) == 1 and len(factors) == 2:
+            return BlasKernel._match_dot(ranges, output, accumulator, factors, alpha)
+
+        return None
+
+    @staticmethod
+    def _match_gemm(ranges, output, accumulator, factors, alpha):
+        # C[i, j] = C[i, j] + alpha * A[i, k] * B[k, j]
+        output_indices = indices(output)
+        if len(output_indices) != 2 or not set(output_indices).issubset(ranges.keys()):
+            return None
+
+        i, j = output_indices
+        reduction = set(ranges.keys()) - set(output_indices)
+        if len(reduction) != 1:
+            return None
+        (k,) = reduction
+
+        for a, b in (factors, reversed(factors)):
+            a_indices, b_indices = indices(a), indices(b)
+            if sorted(a_indices) != sorted([i, k]):
+                continue
+            if sorted(b_indices) != sorted([k, j]):
+                continue
+
+            properties = {
+                "transA": a_indices == [k, i],
+                "transB": b_indices == [j, k],
+                "alpha": alpha,
+                "beta": 1,
+            }
+            operands = {"_a": a, "_b": b, "_cin": accumulator}
+            return BlasKernel(Gemm, ranges, output, operands, properties)
+
+        return None
+
+    @staticmethod
+    def _match_gemv(ranges, output, accumulator, factors, alpha):
+        # y[i] = y[i] + alpha * A[i, j] * x[j]
+        output_indices = indices(output)
+        if len(output_indices) != 1 or output_indices[0] not in ranges:
+            return None
+
+        (i,) = output_indices
+        (j,) = set(ranges.keys()) - set(output_indices)
+        for a, x in (factors, reversed(factors)):
+            a_indices, x_indices = indices(a), indices(x)
+            if sorted(a_indices) != sorted([i, j]) or x_indices != [j]:
+                continue
+
+            properties = {"transA": a_indices == [j, i], "alpha": alpha, "beta": 1}
+            operands = {"_A": a, "_x": x, "_y": accumulator}
+            return BlasKernel(Gemv, ranges, output, operands, properties)
+
+        return None
+
+    @staticmethod
+    def _match_dot(ranges, output, accumulator, factors, alpha):
+        # s = s + alpha * x[i] * y[i]
+        for index in output.expr:
+            if set(map(str, index.free_symbols)).intersection(ranges.keys()):
+                return None
+
+        (i,) = ranges.keys()
+        x, y = factors
+        if indices(x) != [i] or indices(y) != [i]:
+            return None
+
+        operands = {"_x": x, "_y": y}
+        return BlasKernel(Dot, ranges, output, operands, {}, accumulator, alpha)
+
+    @staticmethod
+    def _match_transpose(ranges, output, value, scop):
+        # B[j, i] = A[i, j]
+        if len(ranges) != 2 or value.dtype != output.dtype:
+            return None
+        if value.array == output.array or not is_array(value, scop):
+            return None
+
+        i, j = ranges.keys()
+        if indices(value) not in ([i, j], [j, i]):
+            return None
+        if indices(output) != list(reversed(indices(value))):
+            return None
+
+        properties = {"dtype": output.dtype}
+        operands = {"_inp": value}
+        return BlasKernel(Transpose, ranges, output, operands, properties)
+
+
+_OUTPUT_CONNECTORS = {
+    Gemm: "_c",
+    Gemv: "_y",
+    Transpose: "_out",
+}
+
+
+@lru_cache(maxsize=None)
+def _is_installed(environment) -> bool:
+    return environment.is_installed()
+
+
+def blas_implementation(node_type: type) -> str:
+    """
+    Selects the expansion of a library node, preferring an installed CPU BLAS.
+    """
+    for implementation, environment in _ENVIRONMENTS.items():
+        if implementation not in node_type.implementations:
+            continue
+
+        if _is_installed(environment):
+            return implementation
+
+    return "pure"
+
+
+def blas_libraries(sdfg: dace.SDFG) -> List[str]:
+    """
+    Returns the BLAS libraries the expanded library nodes of the SDFG link against.
+    """
+    libraries = set()
+    for node, _ in sdfg.all_nodes_recursive():
+        if not isinstance(node, dace.nodes.LibraryNode):
+            continue
+
+        if node.implementation in _ENVIRONMENTS:
+            environment = _ENVIRONMENTS[node.implementation]
+            libraries.update(environment.cmake_libraries())
+
+    return sorted(libraries)
+
+
+def _factors(value: Value) -> List[Value]:
+    if isinstance(value, Computation) and value.name == "fmul":
+        factors = []
+        for arg in value.arguments():
+            factors.extend(_factors(arg))
+
+        # x * x
+        if len(value.arguments()) == 1:
+            factors.extend(factors)
+
+        return factors
+
+    return [value]
+
+
+def _accumulation(
+    value: Value, output: Access
+) -> Optional[Tuple[Access, List[Value], float]]:
+    """
+    Splits value into output + alpha * (product of factors).
+    """
+    if not isinstance(value, Computation):
+        return None
+
+    arguments = ordered_arguments(value)
+    if arguments is None:
+        return None
+
+    if value.name == "fadd" and len(arguments) == 2:
+        accumulators = [arg for arg in arguments if same_element(arg, output)]
+        if len(accumulators) != 1:
+            return None
+
+        accumulator = accumulators[0]
+        factors = _factors(next(arg for arg in arguments if arg is not accumulator))
+    elif value.name == "fmuladd" and len(arguments) == 3:
+        # $3 + ($1 * $2)
+        accumulator = arguments[0]
+        if not same_element(accumulator, output):
+            return None
+
+        factors = _factors(arguments[1]) + _factors(arguments[2])
+    else:
+        return None
+
+    alpha = 1.0
+    operands = []
+    for factor in factors:
+        if isinstance(factor, Constant):
+            try:
+                alpha *= float(factor.as_cpp())
+            except ValueError:
+                return None
+        else:
+            operands.append(factor)
+
+    return accumulator, operands, alpha
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import islpy as isl
+
+from typing import Dict, List
+
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.scop.computation.access import Access
+from scop2sdfg.scop.computation.indirection import Indirection
+from scop2sdfg.codegen.isl import to_sympy
+from scop2sdfg.codegen.patterns.matching import is_array
+
+
+class IndirectScatter:
+    """
+    A sequential loop, whose statement writes array elements through index
+    arrays, e.g., B[P[i]] += A[i]. Polly cannot prove that the iterations are
+    independent, but they are if the loaded indices are unique. An inspector
+    checks the indices at runtime before executing the loop as a map.
+    """
+
+    def __init__(self, indices: List[Access], arrays: Dict[str, List[str]]) -> None:
+        self._indices = indices
+        self._arrays = arrays
+
+    @property
+    def indices(self) -> List[Access]:
+        """
+        The reads of the index arrays, whose values must be unique.
+        """
+        return self._indices
+
+    def arrays(self, index: Access) -> List[str]:
+        """
+        The arrays written through the index.
+        """
+        return self._arrays[index.reference]
+
+    @staticmethod
+    def match(ast_node: isl.AstNode, scop: Scop) -> IndirectScatter:
+        body = ast_node.for_get_body()
+        if body.get_type() != isl.ast_node_type.user:
+            return None
+
+        stmt_name = body.user_get_expr().get_op_arg(0).to_C_str()
+        accesses = scop._memory_accesses[stmt_name]
+
+        # Written arrays -> reference of the index
+        written: Dict[str, str] = {}
+        indices: Dict[str, Access] = {}
+        for access in accesses.values():
+            if access.kind != "write":
+                continue
+            if not isinstance(access, Indirection) or not is_array(access, scop):
+                return None
+
+            index = IndirectScatter._index(access, scop)
+            if index is None:
+                return None
+            if written.setdefault(access.array, index.reference) != index.reference:
+                return None
+
+            indices[index.reference] = index
+
+        if not written:
+            return None
+
+        # Reads of the written arrays must access the same element
+        for access in accesses.values():
+            if access.kind == "write" or access.array not in written:
+                continue
+            if not isinstance(access, Indirection):
+                return None
+
+            index = IndirectScatter._index(access, scop)
+            if index is None or index.reference != written[access.array]:
+                return None
+
+        # The indices vary with the loop and are not written by it
+        iterator = str(to_sympy(ast_node.for_get_iterator()))
+        for index in indices.values():
+            if index.array in written:
+                return None
+            if iterator not in [str(symbol) for symbol in index.expr[0].free_symbols]:
+                return None
+
+        arrays: Dict[str, List[str]] = {}
+        for array, reference in written.items():
+            arrays.setdefault(reference, []).append(array)
+
+        return IndirectScatter(list(indices.values()), arrays)
+
+    @staticmethod
+    def _index(access: Indirection, scop: Scop) -> Access:
+        # A load from a one-dimensional index array
+        indices = list(access.indices())
+        if len(indices) != 1:
+            return None
+
+        index = indices[0]
+        if not isinstance(index, Access) or index.kind != "read":
+            return None
+        if not is_array(index, scop) or len(index.expr) != 1:
+            return None
+
+        return index
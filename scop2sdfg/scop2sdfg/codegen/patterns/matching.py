@@ -0,0 +1,59 @@
+import re
+
+from typing import List, Optional, Set
+
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.scop.value import Value
+from scop2sdfg.scop.computation.access import Access
+from scop2sdfg.scop.computation.computation import Computation
+from scop2sdfg.scop.computation.indirection import Indirection
+
+
+def is_read(value: Value) -> bool:
+    return isinstance(value, Access) and value.kind == "read"
+
+
+def is_array(access: Access, scop: Scop) -> bool:
+    return scop._memrefs[access.array].kind == "array"
+
+
+def indices(access: Access) -> List[str]:
+    return [str(index) for index in access.expr]
+
+
+def same_element(value: Value, access: Access) -> bool:
+    if not is_read(value):
+        return False
+
+    return value.array == access.array and indices(value) == indices(access)
+
+
+def read_arrays(value: Value) -> Set[str]:
+    """
+    Collects the arrays read by the expression tree of value.
+    """
+    arrays = set()
+    if isinstance(value, (Access, Indirection)) and value.kind == "read":
+        arrays.add(value.array)
+
+    for arg in value.arguments():
+        arrays.update(read_arrays(arg))
+
+    return arrays
+
+
+def ordered_arguments(computation: Computation) -> Optional[List[Value]]:
+    """
+    Orders the (unordered) arguments of a computation by their position in the code.
+    """
+    code = computation.as_cpp()
+    positions = []
+    for arg in computation.arguments():
+        name = re.escape(Value.canonicalize(arg.reference))
+        match = re.search(r"\b" + name + r"\b", code)
+        if match is None:
+            return None
+
+        positions.append((match.start(), arg))
+
+    return [arg for _, arg in sorted(positions, key=lambda pos: pos[0])]
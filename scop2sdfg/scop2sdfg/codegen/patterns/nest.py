@@ -0,0 +1,52 @@
+import islpy as isl
+
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from scop2sdfg.codegen.isl import to_sympy, extract_end_cond
+
+
+def perfect_loop_nest(ast_node: isl.AstNode) -> Optional[Tuple[Dict, str]]:
+    """
+    Collects the loops of a perfectly nested loop nest with a single statement.
+    The nest must be rectangular, i.e., the bounds of a loop must not depend on
+    the iterators of the nest, and all loops must have unit stride.
+
+    :param ast_node: The outermost for node of the nest
+    :return: The loop ranges (iterator -> (init, end)) in nest order and the
+             name of the statement, or None if the nest is not perfect.
+    """
+    ranges = OrderedDict()
+
+    node = ast_node
+    while node.get_type() != isl.ast_node_type.user:
+        if node.get_type() == isl.ast_node_type.block:
+            children = node.block_get_children()
+            if children.n_ast_node() != 1:
+                return None
+
+            node = children.get_at(0)
+        elif node.get_type() == isl.ast_node_type.for_:
+            iterator = to_sympy(node.for_get_iterator())
+            init = to_sympy(node.for_get_init())
+            end = extract_end_cond(to_sympy(node.for_get_cond()), iterator)
+            step = to_sympy(node.for_get_inc())
+            if end is None or step != 1:
+                return None
+
+            ranges[str(iterator)] = (init, end)
+            node = node.for_get_body()
+        else:
+            return None
+
+    for init, end in ranges.values():
+        bound_symbols = set(map(str, init.free_symbols | end.free_symbols))
+        if bound_symbols.intersection(ranges.keys()):
+            return None
+
+    ast_expr = node.user_get_expr()
+    if ast_expr.get_op_type() != isl.ast_expr_op_type.call:
+        return None
+
+    stmt_name = ast_expr.get_op_arg(0).to_C_str()
+    return ranges, stmt_name
@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import dace
+import sympy
+import islpy as isl
+
+from typing import Dict, List, Optional
+
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.scop.value import Value
+from scop2sdfg.scop.symbols.loop import Loop
+from scop2sdfg.scop.symbols.constant import Constant
+from scop2sdfg.scop.computation.access import Access
+from scop2sdfg.scop.computation.computation import Computation
+
+from scop2sdfg.codegen.patterns.nest import perfect_loop_nest
+from scop2sdfg.codegen.patterns.matching import (
+    is_array,
+    is_read,
+    ordered_arguments,
+    read_arrays,
+    same_element,
+)
+
+# Mapping associative and commutative operations to reduction lambdas
+_REDUCTIONS = {
+    "add": "lambda a, b: a + b",
+    "fadd": "lambda a, b: a + b",
+    "mul": "lambda a, b: a * b",
+    "fmul": "lambda a, b: a * b",
+    "smax": "lambda a, b: max(a, b)",
+    "maxnum": "lambda a, b: max(a, b)",
+    "smin": "lambda a, b: min(a, b)",
+    "minnum": "lambda a, b: min(a, b)",
+}
+
+# The OpenMP reduction identifiers and the combination of the accumulator _acc
+# with the operand _v of an iteration
+_OPENMP = {
+    "add": ("+", "_acc + _v"),
+    "fadd": ("+", "_acc + _v"),
+    "mul": ("*", "_acc * _v"),
+    "fmul": ("*", "_acc * _v"),
+    "smax": ("max", "_v > _acc ? _v : _acc"),
+    "maxnum": ("max", "_v > _acc ? _v : _acc"),
+    "smin": ("min", "_v < _acc ? _v : _acc"),
+    "minnum": ("min", "_v < _acc ? _v : _acc"),
+}
+
+
+class ScalarReduction:
+    """
+    A loop nest accumulating into a single element, e.g., s = max(s, A[i, j]).
+    The accumulator is a scalar memref (value or phi), array elements are
+    kept in registers by the scalar replacement instead.
+    """
+
+    def __init__(
+        self,
+        ranges: Dict,
+        stmt_name: str,
+        accumulator: Access,
+        outputs: List[Access],
+        operands: List[Value],
+        code: str,
+        wcr: str,
+        openmp: tuple,
+        subset: Optional[dace.subsets.Range] = None,
+        reads: Optional[Dict[str, dace.subsets.Range]] = None,
+    ) -> None:
+        self._ranges = ranges
+        self._stmt_name = stmt_name
+        self._accumulator = accumulator
+        self._outputs = outputs
+        self._operands = operands
+        self._code = code
+        self._wcr = wcr
+        self._openmp = openmp
+        self._subset = subset
+        self._reads = reads
+
+    @property
+    def ranges(self) -> Dict:
+        return self._ranges
+
+    @property
+    def stmt_name(self) -> str:
+        return self._stmt_name
+
+    @property
+    def accumulator(self) -> Access:
+        return self._accumulator
+
+    @property
+    def outputs(self) -> List[Access]:
+        return self._outputs
+
+    @property
+    def operands(self) -> List[Value]:
+        """
+        The values combined with the accumulator. The code refers to them as _in0, _in1, ...
+        """
+        return self._operands
+
+    @property
+    def code(self) -> str:
+        return self._code
+
+    @property
+    def wcr(self) -> str:
+        return self._wcr
+
+    @property
+    def operator(self) -> str:
+        """
+        The OpenMP reduction identifier, e.g., + or max.
+        """
+        return self._openmp[0]
+
+    @property
+    def combine(self) -> str:
+        """
+        The C++ expression combining the accumulator _acc with the operand _v.
+        """
+        return self._openmp[1]
+
+    @property
+    def subset(self) -> Optional[dace.subsets.Range]:
+        """
+        The elements of the operand array if the operand is a plain array read
+        of each element once, e.g., s += A[i], or None otherwise.
+        """
+        return self._subset
+
+    @property
+    def reads(self) -> Optional[Dict[str, dace.subsets.Range]]:
+        """
+        The elements read from each array by the operands if the operands are
+        inlined into the loop nest, i.e., if the subset is None.
+        """
+        return self._reads
+
+    @staticmethod
+    def match(ast_node: isl.AstNode, scop: Scop) -> Optional[ScalarReduction]:
+        """
+        Matches the loop nest rooted at ast_node against an accumulation
+        acc = op(acc, operand) of an associative and commutative op.
+        """
+        nest = perfect_loop_nest(ast_node)
+        if nest is None:
+            return None
+
+        ranges, stmt_name = nest
+        if stmt_name not in scop._memory_accesses:
+            return None
+
+        writes = [
+            access
+            for access in scop._memory_accesses[stmt_name].values()
+            if access.kind == "write"
+        ]
+        if not writes or not all(isinstance(write, Access) for write in writes):
+            return None
+
+        # All writes must store the same value, e.g., the phi and its incoming value
+        values = set()
+        for write in writes:
+            if len(write.arguments()) != 1:
+                return None
+            values.add(next(iter(write.arguments())))
+
+        if len(values) != 1:
+            return None
+
+        value = values.pop()
+        if not isinstance(value, Computation):
+            return None
+
+        arguments = ordered_arguments(value)
+        if arguments is None:
+            return None
+
+        if value.name in _REDUCTIONS and len(arguments) == 2:
+            wcr = _REDUCTIONS[value.name]
+            openmp = _OPENMP[value.name]
+            candidates = arguments
+            code = "_in0"
+        elif value.name == "fmuladd" and len(arguments) == 3:
+            # $3 + ($1 * $2)
+            wcr = _REDUCTIONS["fadd"]
+            openmp = _OPENMP["fadd"]
+            candidates = arguments[:1]
+            code = "_in0 * _in1"
+        else:
+            return None
+
+        accumulators = [
+            (arg, write)
+            for arg in candidates
+            for write in writes
+            if same_element(arg, write)
+        ]
+        if len(accumulators) != 1:
+            return None
+
+        accumulator, output = accumulators[0]
+        if scop._memrefs[output.array].kind not in ("value", "phi"):
+            return None
+
+        operands = [arg for arg in arguments if arg is not accumulator]
+        if len(operands) != len(arguments) - 1:
+            return None
+
+        # The operands must not depend on the accumulation itself
+        written = set(write.array for write in writes)
+        for operand in operands:
+            if read_arrays(operand).intersection(written):
+                return None
+
+        subset = None
+        if code == "_in0" and is_read(operands[0]) and is_array(operands[0], scop):
+            subset = _read_subset(ranges, operands[0])
+
+        reads = None
+        if subset is None:
+            reads = _inlined_reads(ranges, operands, scop)
+            if reads is None:
+                return None
+
+        return ScalarReduction(
+            ranges,
+            stmt_name,
+            accumulator,
+            writes,
+            operands,
+            code,
+            wcr,
+            openmp,
+            subset,
+            reads,
+        )
+
+
+def _read_subset(ranges: Dict, access: Access) -> Optional[dace.subsets.Range]:
+    # Each index is an iterator plus an offset and each iterator is used once
+    subset = []
+    iterators = set()
+    for index in access.expr:
+        symbols = [
+            symbol for symbol in index.free_symbols if str(symbol) in ranges.keys()
+        ]
+        if len(symbols) != 1 or str(symbols[0]) in iterators:
+            return None
+
+        symbol = symbols[0]
+        if (index - symbol).has(symbol):
+            return None
+
+        init, end = ranges[str(symbol)]
+        subset.append((index.subs(symbol, init), index.subs(symbol, end), 1))
+        iterators.add(str(symbol))
+
+    if iterators != set(ranges.keys()):
+        return None
+
+    return dace.subsets.Range(subset)
+
+
+def _inlined_reads(
+    ranges: Dict, operands: List[Value], scop: Scop
+) -> Optional[Dict[str, dace.subsets.Range]]:
+    # The operands are inlined into a C++ loop nest, which DaCe does not
+    # analyze. Every symbol of the code must therefore appear in the subsets.
+    reads = {}
+    symbols = set()
+    for init, end in ranges.values():
+        symbols.update(map(str, init.free_symbols | end.free_symbols))
+
+    values = list(operands)
+    while values:
+        value = values.pop()
+        if isinstance(value, Computation):
+            values.extend(value.arguments())
+        elif isinstance(value, Loop):
+            symbols.add(value.name)
+        elif isinstance(value, Constant):
+            continue
+        elif not is_read(value):
+            return None
+        elif is_array(value, scop):
+            bounds = []
+            for index in value.expr:
+                bound = _bounds(index, ranges)
+                if bound is None:
+                    return None
+
+                bounds.append(bound)
+                symbols.update(map(str, index.free_symbols))
+
+            if value.array in reads:
+                bounds = [
+                    (sympy.Min(begin, other[0]), sympy.Max(end, other[1]))
+                    for (begin, end), other in zip(bounds, reads[value.array])
+                ]
+            reads[value.array] = bounds
+
+    subsets = {
+        array: dace.subsets.Range([(begin, end, 1) for begin, end in bounds])
+        for array, bounds in reads.items()
+    }
+
+    covered = set(ranges.keys())
+    for subset in subsets.values():
+        covered.update(map(str, subset.free_symbols))
+
+    if not symbols.issubset(covered):
+        return None
+
+    return subsets
+
+
+def _bounds(index: sympy.Expr, ranges: Dict) -> Optional[tuple]:
+    # The minimum and maximum of an affine index over the (rectangular) nest
+    begin, end = index, index
+    for symbol in index.free_symbols:
+        if str(symbol) not in ranges:
+            continue
+
+        coefficient = index.diff(symbol)
+        if not coefficient.is_number:
+            return None
+
+        init, last = ranges[str(symbol)]
+        if coefficient < 0:
+            init, last = last, init
+
+        begin = begin.subs(symbol, init)
+        end = end.subs(symbol, last)
+
+    return begin, end
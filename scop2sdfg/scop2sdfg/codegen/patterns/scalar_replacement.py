@@ -0,0 +1,141 @@
+import islpy as isl
+
+from typing import Dict, List, Set
+
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.scop.computation.access import Access
+from scop2sdfg.codegen.isl import to_sympy
+from scop2sdfg.codegen.patterns.matching import is_array
+
+
+class InvariantElement:
+    """
+    An array element accessed by all iterations of a loop, which can be kept
+    in a register for the duration of the loop.
+    """
+
+    def __init__(self, access: Access, written: bool) -> None:
+        self._access = access
+        self._written = written
+
+    @property
+    def array(self) -> str:
+        return self._access.array
+
+    @property
+    def access(self) -> Access:
+        """
+        An access to the element, whose indices are independent of the loop.
+        """
+        return self._access
+
+    @property
+    def written(self) -> bool:
+        return self._written
+
+
+def invariant_elements(ast_node: isl.AstNode, scop: Scop) -> List[InvariantElement]:
+    """
+    Finds the arrays, of which a loop accesses a single element per execution.
+
+    The access relations of the statements in the loop are composed with the
+    schedule of the surrounding loops. An array qualifies if the result is
+    single-valued, i.e., the element only depends on the surrounding loops,
+    and if every execution of the loop accesses the element. Loops containing
+    parallel loops are not considered.
+
+    :param ast_node: A for node
+    :return: The invariant elements of the loop
+    """
+    iterators = _iterators(ast_node)
+    if iterators is None:
+        return []
+
+    # Schedule of the surrounding loops
+    info = ast_node.get_annotation().user
+    outer = None
+    schedules = info.schedule.get_map_list()
+    for i in range(schedules.n_map()):
+        schedule = schedules.get_at(i)
+        n = schedule.dim(isl.dim_type.out)
+        schedule = isl.UnionMap.from_map(
+            schedule.project_out(isl.dim_type.out, n - 1, 1)
+        )
+        outer = schedule if outer is None else outer.union(schedule)
+
+    if outer is None:
+        return []
+
+    accesses: Dict[str, List[Access]] = {}
+    statements = info.domain.get_set_list()
+    for i in range(statements.n_set()):
+        stmt_name = statements.get_at(i).get_tuple_name()
+        for access in scop._memory_accesses.get(stmt_name, {}).values():
+            if not is_array(access, scop):
+                continue
+
+            if access.array not in accesses:
+                accesses[access.array] = []
+            accesses[access.array].append(access)
+
+    executions = outer.range()
+    elements = []
+    for array, array_accesses in accesses.items():
+        if any(
+            not isinstance(access, Access) or access.relation is None
+            for access in array_accesses
+        ):
+            continue
+
+        relation = None
+        for access in array_accesses:
+            relation = (
+                access.relation if relation is None else relation.union(access.relation)
+            )
+
+        element = outer.reverse().apply_range(relation)
+        if not element.is_single_valued():
+            continue
+        if not executions.is_subset(element.domain()):
+            continue
+
+        # Indices in terms of the surrounding loops
+        candidates = [
+            access
+            for access in array_accesses
+            if not any(
+                str(symbol) in iterators
+                for index in access.expr
+                for symbol in index.free_symbols
+            )
+        ]
+        if not candidates:
+            continue
+
+        written = any(access.kind == "write" for access in array_accesses)
+        elements.append(InvariantElement(candidates[0], written))
+
+    return elements
+
+
+def _iterators(ast_node: isl.AstNode) -> Set[str]:
+    # Iterators of the loop and its inner loops, None if a loop is parallel
+    iterators = set()
+    nodes = [ast_node]
+    while nodes:
+        node = nodes.pop()
+        if node.get_type() == isl.ast_node_type.block:
+            children = node.block_get_children()
+            nodes.extend(children.get_at(i) for i in range(children.n_ast_node()))
+        elif node.get_type() == isl.ast_node_type.for_:
+            if node is not ast_node and node.get_annotation().user.is_parallel:
+                return None
+
+            iterators.add(str(to_sympy(node.for_get_iterator())))
+            nodes.append(node.for_get_body())
+        elif node.get_type() == isl.ast_node_type.if_:
+            nodes.append(node.if_get_then_node())
+            if node.if_has_else_node():
+                nodes.append(node.if_get_else_node())
+
+    return iterators
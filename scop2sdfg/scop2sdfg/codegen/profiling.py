@@ -0,0 +1,349 @@
+import re
+import json
+import dace
+
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+# Runtime of the dormant instrumentation. The counters are only updated if
+# DAISY_PROFILE is set when the program starts and are appended to that file
+# as a JSON line at exit. DAISY_PROFILE_COUNTERS optionally selects hardware
+# counters of the calling thread and the threads it creates, read via
+# perf_event at the calls of the SDFG.
+_RUNTIME = """
+#include <atomic>
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <string>
+#ifdef __linux__
+#include <linux/perf_event.h>
+#include <sys/syscall.h>
+#include <unistd.h>
+#endif
+
+namespace __daisy_profile {
+
+static const int max_counters = 6;
+static const int num_events = __DAISY_NUM_EVENTS__;
+static const char *event_names[] = {__DAISY_EVENTS__};
+
+struct Event {
+    std::atomic<unsigned long> calls{0};
+    std::atomic<unsigned long> time{0};
+};
+
+struct Profile {
+    const char *output;
+    bool enabled;
+    Event events[num_events];
+
+    int num_counters = 0;
+    const char *counter_names[max_counters];
+    int counter_fds[max_counters];
+    std::atomic<unsigned long long> counter_values[max_counters];
+
+    Profile() {
+        output = getenv("DAISY_PROFILE");
+        enabled = output != nullptr && output[0] != '\\0';
+        if (enabled)
+            open_counters();
+    }
+
+    ~Profile() {
+        if (enabled)
+            save();
+    }
+
+    void open_counters() {
+#ifdef __linux__
+        static const struct {
+            const char *name;
+            unsigned long long config;
+        } hardware[] = {
+            {"cycles", PERF_COUNT_HW_CPU_CYCLES},
+            {"instructions", PERF_COUNT_HW_INSTRUCTIONS},
+            {"cache-references", PERF_COUNT_HW_CACHE_REFERENCES},
+            {"cache-misses", PERF_COUNT_HW_CACHE_MISSES},
+            {"branches", PERF_COUNT_HW_BRANCH_INSTRUCTIONS},
+            {"branch-misses", PERF_COUNT_HW_BRANCH_MISSES},
+        };
+
+        const char *selection = getenv("DAISY_PROFILE_COUNTERS");
+        if (selection == nullptr)
+            return;
+
+        std::string names = std::string(",") + selection + ",";
+        for (const auto &counter : hardware) {
+            if (names.find(std::string(",") + counter.name + ",") == std::string::npos)
+                continue;
+
+            struct perf_event_attr attr;
+            memset(&attr, 0, sizeof(attr));
+            attr.type = PERF_TYPE_HARDWARE;
+            attr.size = sizeof(attr);
+            attr.config = counter.config;
+            attr.inherit = 1;
+            attr.exclude_kernel = 1;
+            attr.exclude_hv = 1;
+
+            // Unavailable counters, e.g., restricted by perf_event_paranoid, are skipped
+            int fd = syscall(__NR_perf_event_open, &attr, 0, -1, -1, 0);
+            if (fd < 0)
+                continue;
+
+            counter_names[num_counters] = counter.name;
+            counter_fds[num_counters] = fd;
+            counter_values[num_counters] = 0;
+            num_counters++;
+        }
+#endif
+    }
+
+    void read_counters(unsigned long long *values) {
+#ifdef __linux__
+        for (int i = 0; i < num_counters; i++) {
+            if (read(counter_fds[i], &values[i], sizeof(values[i])) != sizeof(values[i]))
+                values[i] = 0;
+        }
+#endif
+    }
+
+    void save() {
+        FILE *file = fopen(output, "a");
+        if (file == nullptr)
+            return;
+
+        std::string line = "{\\"sdfg\\": \\"__DAISY_SDFG__\\", \\"pid\\": ";
+#ifdef __linux__
+        line += std::to_string(getpid());
+#else
+        line += "0";
+#endif
+        line += ", \\"events\\": {";
+        for (int i = 0; i < num_events; i++) {
+            if (i > 0)
+                line += ", ";
+            line += "\\"" + std::string(event_names[i]) + "\\": {\\"calls\\": ";
+            line += std::to_string(events[i].calls.load()) + ", \\"time\\": ";
+            line += std::to_string(events[i].time.load()) + "}";
+        }
+        line += "}, \\"counters\\": {";
+        for (int i = 0; i < num_counters; i++) {
+            if (i > 0)
+                line += ", ";
+            line += "\\"" + std::string(counter_names[i]) + "\\": ";
+            line += std::to_string(counter_values[i].load());
+        }
+        line += "}}\\n";
+
+        fputs(line.c_str(), file);
+        fclose(file);
+    }
+};
+
+static Profile profile;
+
+static inline std::chrono::high_resolution_clock::time_point now() {
+    if (!profile.enabled)
+        return std::chrono::high_resolution_clock::time_point();
+    return std::chrono::high_resolution_clock::now();
+}
+
+static inline void record(int event, unsigned long start, unsigned long end) {
+    if (!profile.enabled)
+        return;
+    profile.events[event].calls.fetch_add(1, std::memory_order_relaxed);
+    profile.events[event].time.fetch_add(end - start, std::memory_order_relaxed);
+}
+
+static inline void begin(unsigned long long *values) {
+    if (profile.enabled && profile.num_counters > 0)
+        profile.read_counters(values);
+}
+
+static inline void end(unsigned long long *values) {
+    if (!profile.enabled || profile.num_counters == 0)
+        return;
+
+    unsigned long long current[max_counters];
+    profile.read_counters(current);
+    for (int i = 0; i < profile.num_counters; i++)
+        profile.counter_values[i].fetch_add(current[i] - values[i], std::memory_order_relaxed);
+}
+
+}  // namespace __daisy_profile
+"""
+
+
+def instrument(sdfg: dace.SDFG) -> None:
+    """
+    Adds timers to the SDFG, its states and the outermost maps of all
+    (nested) SDFGs.
+    """
+    sdfg.instrument = dace.InstrumentationType.Timer
+    for state in sdfg.states():
+        state.instrument = dace.InstrumentationType.Timer
+
+    for nsdfg in sdfg.all_sdfgs_recursive():
+        for state in nsdfg.states():
+            scope_dict = state.scope_dict()
+            for node in state.nodes():
+                if isinstance(node, dace.nodes.MapEntry) and scope_dict[node] is None:
+                    node.map.instrument = dace.InstrumentationType.Timer
+
+
+def instrument_code(code: str, sdfg: dace.SDFG, folder: Path) -> str:
+    """
+    Redirects the report of an instrumented SDFG to the profile folder and
+    records the values of the symbols passed to each call.
+    """
+    code = re.sub(
+        r'__state->report\.save\("[^"]*"',
+        f'__state->report.save("{Path(folder).absolute()}"',
+        code,
+    )
+
+    counters = "".join(
+        f'\n    __state->report.add_counter("Symbol {symbol}", "Symbol", '
+        + f'"{symbol}", (unsigned long int) {symbol});'
+        for symbol in _symbols(sdfg)
+    )
+    return re.sub(
+        rf"(void __program_{sdfg.name}_internal\([^)]*\)\s*\{{)",
+        lambda match: match.group(1) + counters,
+        code,
+        count=1,
+    )
+
+
+def dormant_instrumentation(code: str, sdfg: dace.SDFG) -> str:
+    """
+    Replaces the instrumentation report of an instrumented SDFG by counters
+    of the calls and the time of the SDFG, its states and maps, which are
+    only updated if the DAISY_PROFILE environment variable is set.
+    """
+    if f"__program_{sdfg.name}_internal" not in code:
+        return code
+
+    events = []
+
+    def record(match: re.Match) -> str:
+        name, start, end = match.group(1), match.group(2), match.group(3)
+        if name not in events:
+            events.append(name)
+
+        call = f"__daisy_profile::record({events.index(name)}, {start}, {end});"
+        if name.startswith("SDFG "):
+            # Hardware counters of the calls of the SDFG
+            timer = start[len("__dace_ts_start_") :]
+            call = f"__daisy_profile::end(__daisy_counters_{timer}); " + call
+        return call
+
+    code = re.sub(
+        r'__state->report\.add_completion\("([^"]*)", "Timer", '
+        + r"(__dace_ts_start_\w+), (__dace_ts_end_\w+)[^;]*;",
+        record,
+        code,
+    )
+    code = re.sub(
+        r"(auto __dace_t(?:begin|end)_\w+ = )std::chrono::high_resolution_clock::now\(\)",
+        r"\1__daisy_profile::now()",
+        code,
+    )
+    code = re.sub(
+        r"(auto __dace_tbegin_(\d+) = )",
+        r"unsigned long long __daisy_counters_\2[__daisy_profile::max_counters]; "
+        + r"__daisy_profile::begin(__daisy_counters_\2);\n\1",
+        code,
+    )
+    code = re.sub(r'__state->report\.save\("[^"]*", [^;]*;', "", code)
+    if not events:
+        return code
+
+    runtime = (
+        _RUNTIME.replace("__DAISY_NUM_EVENTS__", str(max(len(events), 1)))
+        .replace("__DAISY_EVENTS__", ", ".join(f'"{name}"' for name in events))
+        .replace("__DAISY_SDFG__", sdfg.name)
+    )
+    return runtime + code
+
+
+def load_profile(folder: Path, sdfg_name: str) -> Optional[Dict]:
+    """
+    Merges the reports of all runs of an instrumented SDFG, including the
+    reports of its other versions written to the same folder.
+
+    :return: The number of calls, the mean time per call of the SDFG, its
+             states and maps in microseconds, and the most frequent value
+             of each symbol with its share of the calls, or None if the SDFG
+             was not called
+    """
+    calls = 0
+    time = 0
+    states = Counter()
+    maps = Counter()
+    values = {}
+    for path in sorted((Path(folder) / sdfg_name).glob("report-*.json")):
+        try:
+            with open(path, "r") as handle:
+                report = json.load(handle)
+        except (OSError, ValueError):
+            # Runs terminated while writing the report
+            continue
+
+        for event in report["traceEvents"]:
+            if event["ph"] == "X":
+                kind, label = event["name"].split(" ", 1)
+                if kind == "SDFG":
+                    calls += 1
+                    time += event["dur"]
+                elif kind == "State":
+                    states[label] += event["dur"]
+                elif kind == "Map":
+                    maps[label] += event["dur"]
+            elif event["ph"] == "C" and event["cat"] == "Symbol":
+                symbol = event["name"][len("Symbol ") :]
+                value = event["args"][symbol]
+                if value >= 1 << 63:
+                    value -= 1 << 64
+                values.setdefault(symbol, Counter())[value] += 1
+
+    if calls == 0:
+        return None
+
+    symbols = {}
+    for symbol, counts in values.items():
+        value, count = counts.most_common(1)[0]
+        symbols[symbol] = {"value": value, "share": count / sum(counts.values())}
+
+    return {
+        "calls": calls,
+        "time": time / calls,
+        "states": {label: total / calls for label, total in states.items()},
+        "maps": {label: total / calls for label, total in maps.items()},
+        "symbols": symbols,
+    }
+
+
+def hot_maps(profile: Dict, min_share: float = 0.01) -> Set[str]:
+    """
+    The labels of the maps taking at least min_share of the SDFG's time.
+    """
+    return {
+        label
+        for label, time in profile["maps"].items()
+        if time >= min_share * profile["time"]
+    }
+
+
+def _symbols(sdfg: dace.SDFG) -> List[str]:
+    return [
+        name
+        for name, desc in sdfg.arglist().items()
+        if isinstance(desc, dace.data.Scalar)
+        and desc.dtype in dace.dtypes.INTEGER_TYPES
+        and name in sdfg.free_symbols
+    ]
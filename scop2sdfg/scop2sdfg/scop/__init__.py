@@ -1 +1,8 @@
-from scop2sdfg.scop.scop import Scop
+def __getattr__(name: str):
+    # The Scop imports dace, which is not required by the triage of scops
+    if name == "Scop":
+        from scop2sdfg.scop.scop import Scop
+
+        return Scop
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
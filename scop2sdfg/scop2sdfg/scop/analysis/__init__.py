@@ -2,3 +2,11 @@ from scop2sdfg.scop.analysis.undefined_access_to_indirection import (
     undefined_access_to_indirection,
 )
 from scop2sdfg.scop.analysis.value_propagation import value_propagation
+from scop2sdfg.scop.analysis.parallelism import parallel_statements
+from scop2sdfg.scop.analysis.cost_model import (
+    estimate_work,
+    parameter_thresholds,
+    select_schedule,
+)
+from scop2sdfg.scop.analysis.aliasing import alias_groups, aliasing_arrays
+from scop2sdfg.scop.analysis.fusion import fuse_loops
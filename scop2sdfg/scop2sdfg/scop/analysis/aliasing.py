@@ -0,0 +1,34 @@
+import islpy as isl
+
+from typing import List, Set
+
+
+def alias_groups(scop) -> List[Set[str]]:
+    """
+    Collects the arrays of Polly's alias groups. The arrays of a group may
+    overlap in memory and are only disambiguated by runtime checks.
+    """
+    groups = []
+    for group in scop._shape_inference:
+        arrays = set()
+        for member in group["readwrite"] + group["readonly"]:
+            minimal = isl.PwMultiAff.read_from_str(
+                isl.DEFAULT_CONTEXT, member["minimal"]
+            )
+            arrays.add(minimal.get_tuple_name(isl.dim_type.out))
+
+        if len(arrays) > 1:
+            groups.append(arrays)
+
+    return groups
+
+
+def aliasing_arrays(scop) -> Set[str]:
+    """
+    Collects the arrays which may alias with another array of the scop.
+    """
+    arrays = set()
+    for group in alias_groups(scop):
+        arrays.update(group)
+
+    return arrays
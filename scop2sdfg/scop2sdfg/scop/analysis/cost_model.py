@@ -0,0 +1,176 @@
+from typing import Callable, Dict, List, Optional
+
+from scop2sdfg.scop.value import Value
+from scop2sdfg.scop.triage import OPERATION_WEIGHTS, count_instances
+from scop2sdfg.scop.computation.access import Access
+from scop2sdfg.scop.computation.computation import Computation
+from scop2sdfg.scop.analysis.parallelism import parallel_statements
+
+# Largest parameter value considered by the threshold search
+_MAX_PARAMETER = 1 << 30
+
+
+def estimate_work(scop, parameters: Dict[str, int] = None) -> Dict:
+    """
+    Estimates the work of the scop from its statement domains, the computations of
+    the statements and the accessed memory.
+
+    The number of instances of a statement is an upper bound over all values
+    of the parameters permitted by the context. If any domain is unbounded,
+    the estimates are None.
+
+    :param parameters: Optional values of (some of) the parameters by name
+
+    :return: A dict with the number of statement instances ("iterations"),
+             the weighted operations, the array accesses, and the total "work" (operations + accesses) and the part of the work
+             enclosed by parallel loops ("parallel_work").
+    """
+    estimate = {
+        "iterations": 0,
+        "operations": 0,
+        "accesses": 0,
+        "work": 0,
+        "parallel_work": 0,
+    }
+    parallel = parallel_statements(scop)
+    for name, statement in scop._statements.items():
+        if name not in scop._memory_accesses:
+            continue
+
+        instances = count_instances(statement["domain"], scop._context, parameters)
+        if instances is None:
+            return {key: None for key in estimate}
+
+        operations = 0
+        visited = set()
+        for access in scop._memory_accesses[name].values():
+            if access.kind != "write":
+                continue
+
+            for arg in access.arguments():
+                operations += _operations(arg, visited)
+
+        accesses = 0
+        for access in scop._memory_accesses[name].values():
+            if scop._memrefs[access.array].kind == "array":
+                accesses += 1
+
+        estimate["iterations"] += instances
+        estimate["operations"] += instances * operations
+        estimate["accesses"] += instances * accesses
+        if name in parallel:
+            estimate["parallel_work"] += instances * (operations + accesses)
+
+    estimate["work"] = estimate["operations"] + estimate["accesses"]
+    return estimate
+
+
+def parameter_thresholds(scop, min_work: int) -> Optional[List[Dict[str, int]]]:
+    """
+    Computes lower bounds on the parameters, which guarantee that the work of the
+    scop is at least min_work. The work is reached if any of the alternatives
+    holds:
+
+    - All parameters are at least a common value.
+    - A single parameter is large and the others are at least one, e.g., for
+      skewed shapes such as N = 1 and M = 1e6.
+
+    Shapes skewed in more than one parameter are only covered by the common
+    value. Parameters not affecting the work are omitted.
+
+    :return: The lower bounds of the relevant parameters by name of each
+             alternative, or None if min_work is not reached for any values
+             of the parameters.
+    """
+    names = [param.name for param in scop._parameters.values()]
+
+    def reaches(values: Dict[str, int]) -> bool:
+        work = estimate_work(scop, values)["work"]
+        return work is None or work >= min_work
+
+    # Smallest common value of all parameters
+    upper = _smallest_value(lambda value: reaches({name: value for name in names}))
+    if upper is None:
+        return None
+
+    thresholds = {}
+    for name in names:
+        values = {other: upper for other in names}
+        values[name] = 0
+        if not reaches(values):
+            thresholds[name] = upper
+
+    alternatives = [thresholds]
+    if len(thresholds) < 2:
+        return alternatives
+
+    # Smallest value of each parameter, if the others are one
+    for name in thresholds:
+        value = _smallest_value(
+            lambda value: reaches(
+                {other: value if other == name else 1 for other in names}
+            )
+        )
+        if value is None:
+            continue
+
+        alternatives.append(
+            {other: value if other == name else 1 for other in thresholds}
+        )
+
+    return alternatives
+
+
+def _smallest_value(reaches: Callable[[int], bool]) -> Optional[int]:
+    # Exponential and binary search of a monotone predicate
+    upper = 1
+    while not reaches(upper):
+        upper *= 2
+        if upper > _MAX_PARAMETER:
+            return None
+
+    lower = upper // 2
+    while upper - lower > 1:
+        middle = (lower + upper) // 2
+        if reaches(middle):
+            upper = middle
+        else:
+            lower = middle
+
+    return upper
+
+
+def select_schedule(scop, estimate: Dict, min_parallel_work: int) -> str:
+    """
+    Selects multicore if the parallel loops carry enough work to amortize the
+    spin-up of the threads. Unbounded (parametric) work is assumed to be large
+    if the scop has parallel loops.
+
+    :param estimate: The work of the scop as estimated by estimate_work
+    :return: "multicore" or "sequential"
+    """
+    if not parallel_statements(scop):
+        return "sequential"
+
+    parallel_work = estimate["parallel_work"]
+    if parallel_work is None or parallel_work >= min_parallel_work:
+        return "multicore"
+
+    return "sequential"
+
+
+def _operations(value: Value, visited) -> int:
+    if value.reference in visited:
+        return 0
+    visited.add(value.reference)
+
+    operations = 0
+    if isinstance(value, Computation):
+        operations += OPERATION_WEIGHTS.get(value.name, 1)
+    elif isinstance(value, Access):
+        return 0
+
+    for arg in value.arguments():
+        operations += _operations(arg, visited)
+
+    return operations
@@ -0,0 +1,227 @@
+import islpy as isl
+
+from typing import Dict, List, Optional, Tuple
+
+
+def fuse_loops(
+    schedule: isl.UnionMap, dependencies: isl.UnionMap
+) -> Tuple[isl.UnionMap, List[List[str]]]:
+    """
+    Fuses consecutive loops of the schedule, which iterate over the same
+    range. The statements of the second loop are moved into the body of the
+    first loop after its statements, such that the maps of the SDFG consume
+    the values of the producers while they are cached.
+
+    Loops are fused if the dependences are respected by the new schedule
+    and the fused loop is parallel unless both loops were sequential.
+
+    :return: The new schedule and the statements of the fused loops
+    """
+    maps = _normalize(_statement_schedules(schedule))
+    domains = {name: m.domain() for name, m in maps.items()}
+
+    fused = []
+    while True:
+        candidate = _fuse_next(maps, domains, dependencies)
+        if candidate is None:
+            break
+
+        maps, statements = candidate
+        fused.append(statements)
+
+    result = None
+    for m in maps.values():
+        result = isl.UnionMap.from_map(m) if result is None else result.union(m)
+
+    return (result if result is not None else schedule), fused
+
+
+def _statement_schedules(schedule: isl.UnionMap) -> Dict[str, isl.Map]:
+    maps = {}
+    map_list = schedule.get_map_list()
+    for i in range(map_list.n_map()):
+        m = map_list.get_at(i)
+        maps[m.get_tuple_name(isl.dim_type.in_)] = m
+    return dict(sorted(maps.items()))
+
+
+def _normalize(maps: Dict[str, isl.Map]) -> Dict[str, isl.Map]:
+    # Equal dimensions, in which loops alternate with constants ordering the
+    # statements of the loops. The inserted constants are zero for all
+    # statements, which preserves the order of the schedule.
+    n = max([m.dim(isl.dim_type.out) for m in maps.values()], default=0)
+
+    normalized = {}
+    for name, m in maps.items():
+        k = m.dim(isl.dim_type.out)
+        m = m.add_dims(isl.dim_type.out, n - k)
+        for pos in range(k, n):
+            m = m.fix_val(isl.dim_type.out, pos, 0)
+        normalized[name] = m
+
+    pos = 0
+    while pos < n:
+        if any(_constant(m, pos) is None for m in normalized.values()):
+            for name, m in normalized.items():
+                m = m.insert_dims(isl.dim_type.out, pos + 1, 1)
+                normalized[name] = m.fix_val(isl.dim_type.out, pos + 1, 0)
+            n = n + 1
+            pos = pos + 1
+        pos = pos + 1
+
+    return normalized
+
+
+def _constant(m: isl.Map, pos: int) -> Optional[int]:
+    if pos < 0 or pos >= m.dim(isl.dim_type.out):
+        return None
+
+    val = m.plain_get_val_if_fixed(isl.dim_type.out, pos)
+    if val.is_nan():
+        return None
+    return val.to_python()
+
+
+def _set_constant(m: isl.Map, pos: int, value: int) -> isl.Map:
+    m = m.drop_constraints_involving_dims(isl.dim_type.out, pos, 1)
+    return m.fix_val(isl.dim_type.out, pos, value)
+
+
+def _fuse_next(
+    maps: Dict[str, isl.Map], domains: Dict[str, isl.Set], dependencies: isl.UnionMap
+) -> Optional[Tuple[Dict[str, isl.Map], List[str]]]:
+    n = next(iter(maps.values())).dim(isl.dim_type.out) if maps else 0
+    for d in range(n - 2):
+        # Loops at the position d: Statements with equal constants before d
+        # share the enclosing loops
+        loops: Dict[Tuple, Dict[int, List[str]]] = {}
+        for name, m in maps.items():
+            prefix = tuple(_constant(m, pos) for pos in range(d))
+            value = _constant(m, d)
+            if value is None:
+                continue
+            loops.setdefault(prefix, {}).setdefault(value, []).append(name)
+
+        for siblings in loops.values():
+            values = sorted(siblings.keys())
+            for first, second in zip(values[:-1], values[1:]):
+                candidate = _fuse(
+                    maps,
+                    domains,
+                    dependencies,
+                    siblings[first],
+                    siblings[second],
+                    d,
+                )
+                if candidate is not None:
+                    return candidate, siblings[first] + siblings[second]
+
+    return None
+
+
+def _fuse(
+    maps: Dict[str, isl.Map],
+    domains: Dict[str, isl.Set],
+    dependencies: isl.UnionMap,
+    first: List[str],
+    second: List[str],
+    d: int,
+) -> Optional[Dict[str, isl.Map]]:
+    statements = first + second
+
+    # Both are loops followed by the order of their statements
+    for name in statements:
+        if _constant(maps[name], d + 1) is not None:
+            return None
+        if _constant(maps[name], d + 2) is None:
+            return None
+
+    # Compatible domains: The loops iterate over the same range
+    if not _loop_range(maps, first, d).is_equal(_loop_range(maps, second, d)):
+        return None
+
+    # The statements of the second loop follow the statements of the first loop
+    value = _constant(maps[first[0]], d)
+    offset = max(_constant(maps[name], d + 2) for name in first) + 1
+    offset -= min(_constant(maps[name], d + 2) for name in second)
+
+    fused = dict(maps)
+    for name in second:
+        m = _set_constant(fused[name], d, value)
+        m = _set_constant(m, d + 2, _constant(maps[name], d + 2) + offset)
+        fused[name] = m
+
+    if not _is_legal(fused, dependencies):
+        return None
+
+    parallel = _is_parallel(fused, domains, dependencies, statements, d + 1)
+    if not parallel:
+        if _is_parallel(maps, domains, dependencies, first, d + 1):
+            return None
+        if _is_parallel(maps, domains, dependencies, second, d + 1):
+            return None
+
+    return fused
+
+
+def _loop_range(maps: Dict[str, isl.Map], statements: List[str], d: int):
+    # The iterations of the loops enclosing the loop at d + 1
+    ranges = None
+    for name in statements:
+        m = maps[name]
+        n = m.dim(isl.dim_type.out)
+        r = m.range().project_out(isl.dim_type.set, d + 2, n - d - 2)
+        r = r.project_out(isl.dim_type.set, d, 1)
+        r = isl.UnionSet.from_set(r)
+        ranges = r if ranges is None else ranges.union(r)
+    return ranges
+
+
+def _time_dependencies(
+    maps: Dict[str, isl.Map], dependencies: isl.UnionMap
+) -> Optional[isl.Map]:
+    schedule = None
+    for m in maps.values():
+        schedule = isl.UnionMap.from_map(m) if schedule is None else schedule.union(m)
+
+    time_deps = dependencies.apply_domain(schedule).apply_range(schedule)
+    if time_deps.is_empty():
+        return None
+    return isl.Map.from_union_map(time_deps)
+
+
+def _is_legal(maps: Dict[str, isl.Map], dependencies: isl.UnionMap) -> bool:
+    # The sources of all dependences are scheduled before their sinks
+    time_deps = _time_dependencies(maps, dependencies)
+    if time_deps is None:
+        return True
+
+    violated = time_deps.intersect(isl.Map.lex_ge(time_deps.get_space().domain()))
+    return violated.is_empty()
+
+
+def _is_parallel(
+    maps: Dict[str, isl.Map],
+    domains: Dict[str, isl.Set],
+    dependencies: isl.UnionMap,
+    statements: List[str],
+    dim: int,
+) -> bool:
+    # The loop at dim does not carry dependences between the statements
+    instances = None
+    for name in statements:
+        domain = isl.UnionSet.from_set(domains[name])
+        instances = domain if instances is None else instances.union(domain)
+    dependencies = dependencies.intersect_domain(instances).intersect_range(instances)
+
+    time_deps = _time_dependencies(maps, dependencies)
+    if time_deps is None:
+        return True
+
+    for pos in range(dim):
+        time_deps = time_deps.equate(isl.dim_type.in_, pos, isl.dim_type.out, pos)
+
+    deltas = time_deps.deltas()
+    forward = deltas.lower_bound_val(isl.dim_type.set, dim, 1)
+    backward = deltas.upper_bound_val(isl.dim_type.set, dim, -1)
+    return forward.is_empty() and backward.is_empty()
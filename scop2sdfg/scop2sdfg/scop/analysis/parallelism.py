@@ -0,0 +1,30 @@
+import islpy as isl
+
+from typing import Set
+
+
+def parallel_statements(scop) -> Set[str]:
+    """
+    Collects the statements enclosed by at least one parallel loop of the AST.
+    """
+    statements = set()
+    _visit(scop.ast, False, statements)
+    return statements
+
+
+def _visit(node: isl.AstNode, parallel: bool, statements: Set[str]):
+    if node.get_type() == isl.ast_node_type.block:
+        children = node.block_get_children()
+        for i in range(children.n_ast_node()):
+            _visit(children.get_at(i), parallel, statements)
+    elif node.get_type() == isl.ast_node_type.for_:
+        parallel = parallel or node.get_annotation().user.is_parallel
+        _visit(node.for_get_body(), parallel, statements)
+    elif node.get_type() == isl.ast_node_type.if_:
+        _visit(node.if_get_then_node(), parallel, statements)
+        if node.if_has_else_node():
+            _visit(node.if_get_else_node(), parallel, statements)
+    elif node.get_type() == isl.ast_node_type.user:
+        if parallel:
+            stmt_name = node.user_get_expr().get_op_arg(0).to_C_str()
+            statements.add(stmt_name)
@@ -43,7 +43,7 @@ def undefined_access_to_indirection(scop, geps: Dict) -> Dict:
                 access.dtype,
                 access.kind,
                 access.instruction,
-                "",
+                access.incoming_value,
                 access.array,
                 arguments,
             )
@@ -112,13 +112,12 @@ class ASTBuilder:
         # elements and corresponding domain elements in the time_deps.
         time_deltas = time_deps.deltas()
 
-        # the loop is parallel, if there are no deltas in the time-space
-        if time_deltas.is_empty():
-            return True
-
-        # The loop is parallel, if the distance is zero in the current dimension
-        delta = time_deltas.plain_get_val_if_fixed(isl.dim_type.set, curr_dim)
-        return delta.is_zero()
+        # the loop is parallel, if the distance is zero in the current
+        # dimension for all dependencies
+        carried = time_deltas.subtract(
+            time_deltas.fix_val(isl.dim_type.set, curr_dim, 0)
+        )
+        return carried.is_empty()
 
     @staticmethod
     def _get_annotation_build(ctx: isl.Set, deps: isl.UnionMap) -> isl.AstBuild:
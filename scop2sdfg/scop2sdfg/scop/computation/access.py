@@ -31,13 +31,16 @@ class Access(Value):
         incoming_value: str,
         array: str,
         expr: List[dace.symbolic.SymExpr],
+        relation: isl.UnionMap = None,
     ) -> None:
         super().__init__(reference, dtype)
 
         self._kind = kind
         self._instruction = instruction
+        self._incoming_value = incoming_value
         self._array = array
         self._expr = expr
+        self._relation = relation
 
         self._arguments = set()
         if self._kind == "write":
@@ -67,10 +70,25 @@ class Access(Value):
     def instruction(self) -> str:
         return self._instruction
 
+    @property
+    def incoming_value(self) -> str:
+        return self._incoming_value
+
     @property
     def array(self) -> str:
         return self._array
 
+    @property
+    def expr(self) -> List[dace.symbolic.SymExpr]:
+        return self._expr
+
+    @property
+    def relation(self) -> isl.UnionMap:
+        """
+        The access relation restricted to the domain of the statement.
+        """
+        return self._relation
+
     def arguments(self) -> Set[Value]:
         return self._arguments
 
@@ -110,6 +128,7 @@ class Access(Value):
     ) -> Access:
         mapping = isl.UnionMap.read_from_str(isl.DEFAULT_CONTEXT, access["relation"])
         mapping = mapping.intersect_domain(domain)
+        relation = mapping
         mapping = mapping.gist_domain(domain)
         # mapping = mapping.project_out_all_params()
 
@@ -185,4 +204,5 @@ class Access(Value):
             incoming_value,
             array,
             symbolic_indices,
+            relation,
         )
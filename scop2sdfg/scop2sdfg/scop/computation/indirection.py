@@ -28,15 +28,15 @@ class Indirection(Value):
         self._expr = arguments
 
         self._arguments = set(arguments)
+        self._value = None
         if self._kind == "write":
             assert incoming_value
 
             if Value.is_llvm_value(incoming_value):
-                self._arguments.add(UndefinedValue(incoming_value, dtype))
+                self._value = UndefinedValue(incoming_value, dtype)
             else:
-                self._arguments.add(
-                    Constant(Constant.new_identifier(), dtype, incoming_value)
-                )
+                self._value = Constant(Constant.new_identifier(), dtype, incoming_value)
+            self._arguments.add(self._value)
 
     def __repr__(self) -> str:
         return self._reference
@@ -66,10 +66,33 @@ class Indirection(Value):
     def arguments(self) -> Set[Value]:
         return self._arguments
 
-    def as_cpp(self) -> str:
+    def value(self) -> Value:
+        """
+        The written value, None for reads.
+        """
+        if self._value is None:
+            return None
+
+        for arg in self._arguments:
+            if arg.reference == self._value.reference:
+                return arg
+
+        return self._value
+
+    def indices(self) -> Set[Value]:
+        """
+        The arguments defining the indices of the access.
+        """
+        value = self.value()
+        return set(
+            arg
+            for arg in self._arguments
+            if value is None or arg.reference != value.reference
+        )
+
+    def subscript(self) -> str:
         return (
-            "_in"
-            + "["
+            "["
             + ",".join(
                 [
                     Value.canonicalize(str(expr))
@@ -80,6 +103,12 @@ class Indirection(Value):
             + "]"
         )
 
+    def as_cpp(self) -> str:
+        if self._kind == "write":
+            return "_out" + self.subscript() + " = _in"
+
+        return "_in" + self.subscript()
+
     def memlet(self, data: dace.data.Data) -> dace.Memlet:
         expr = []
         for i, e in enumerate(self._expr):
@@ -89,7 +118,9 @@ class Indirection(Value):
                 expr.append(f"0:{data.shape[i]}")
 
         expr = self._array + "[" + ",".join(expr) + "]"
-        return dace.Memlet(data=self._array, expr=expr)
+
+        # Writes only update the indexed elements of the range
+        return dace.Memlet(data=self._array, expr=expr, dynamic=self._kind == "write")
 
     def validate(self) -> bool:
         for arg in self._arguments:
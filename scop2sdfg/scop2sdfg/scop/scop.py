@@ -3,7 +3,7 @@ from __future__ import annotations
 import dace
 import islpy as isl
 
-from typing import Dict
+from typing import Dict, List
 from collections import OrderedDict
 
 from scop2sdfg.scop.ast import ASTBuilder
@@ -18,6 +18,7 @@ from scop2sdfg.scop.symbols.loop import Loop
 from scop2sdfg.scop.analysis import (
     value_propagation,
     undefined_access_to_indirection,
+    fuse_loops,
 )
 
 
@@ -39,6 +40,8 @@ class Scop:
         self._dependencies = None
         self._schedule = None
         self._ast = None
+        # Statements of the fused loops
+        self._fused = []
 
         ## Level II: data-centric (data, computation and symbols)
 
@@ -68,6 +71,10 @@ class Scop:
     def ast(self) -> isl.AstBuild:
         return self._ast
 
+    @property
+    def fused(self) -> List[List[str]]:
+        return self._fused
+
     def arguments(self) -> Dict:
         arguments = OrderedDict()
         for ref, item in self._memrefs.items():
@@ -92,7 +99,12 @@ class Scop:
         return True
 
     @staticmethod
-    def from_json(source: str, desc: Dict) -> Scop:
+    def from_json(source: str, desc: Dict, fusion: bool = False) -> Scop:
+        """
+        Parses a scop exported by the plugin (JScop).
+
+        :param fusion: Fuses consecutive loops of the schedule (see fuse_loops)
+        """
         scop = Scop(desc["name"], source)
 
         ## Level I: control-centric (AST)
@@ -120,6 +132,8 @@ class Scop:
 
         scop._schedule = isl.UnionMap.read_from_str(ctx, desc["schedule"])
         scop._schedule = scop._schedule.intersect_domain(domains)
+        if fusion:
+            scop._schedule, scop._fused = fuse_loops(scop._schedule, scop._dependencies)
 
         builder = ASTBuilder()
         scop._ast = builder.create(
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import re
 import dace
 
 from typing import List, Set, Dict
@@ -10,12 +11,19 @@ from scop2sdfg.scop.symbols.constant import Constant
 
 class Memref(Value):
     def __init__(
-        self, reference: str, name: str, dtype: str, shape: List, kind: str
+        self,
+        reference: str,
+        name: str,
+        dtype: str,
+        shape: List,
+        kind: str,
+        alignment: int = 0,
     ) -> None:
         super().__init__(reference=reference, dtype=dtype)
         self._name = name
         self._shape = shape
         self._kind = kind
+        self._alignment = alignment
 
     def __repr__(self) -> str:
         return self._reference
@@ -38,6 +46,13 @@ class Memref(Value):
     def kind(self) -> str:
         return self._kind
 
+    @property
+    def alignment(self) -> int:
+        """
+        The alignment of the base pointer in bytes, 0 if unknown.
+        """
+        return self._alignment
+
     def arguments(self) -> Set[Value]:
         return set()
 
@@ -58,9 +73,14 @@ class Memref(Value):
                 shape.append(symbol)
 
         reference = desc["variable"].strip()
+        alignment = 0
         if "=" in reference:
             reference = reference.split()[0].strip()
         else:
+            # Arguments are printed with their attributes, e.g., ptr align 64 %A
+            match = re.search(r"\balign (\d+)\b", reference)
+            if match is not None:
+                alignment = int(match.group(1))
             reference = reference.split()[-1].strip()
 
         return Memref(
@@ -69,4 +89,5 @@ class Memref(Value):
             dtype=desc["type"],
             shape=shape,
             kind=desc["kind"],
+            alignment=alignment,
         )
@@ -0,0 +1,130 @@
+import re
+import islpy as isl
+
+from typing import Dict, Optional
+
+# Relative cost of instructions, others count as one operation
+OPERATION_WEIGHTS = {
+    "udiv": 4,
+    "sdiv": 4,
+    "fdiv": 4,
+    "urem": 4,
+    "srem": 4,
+    "frem": 4,
+    "sqrt": 8,
+    "pow": 16,
+    "powi": 16,
+    "exp": 16,
+    "exp2": 16,
+    "log": 16,
+    "log2": 16,
+    "log10": 16,
+    "sin": 16,
+    "cos": 16,
+}
+
+# Domains up to this size are counted exactly, larger ones by their bounding box
+_EXACT_COUNT_LIMIT = 1 << 20
+
+
+def triage(desc: Dict, min_work: int) -> Optional[str]:
+    """
+    Checks a JScop before it is parsed into a Scop, using islpy only. Scops,
+    whose work is below min_work for all values of the parameters, are
+    rejected without lifting them.
+
+    :return: The reason of the rejection, or None if the scop is lifted
+    """
+    bound = work_bound(desc)
+    if bound is not None and bound < min_work:
+        return f"unprofitable (work at most {bound}, threshold: {min_work})"
+
+    return None
+
+
+def work_bound(desc: Dict) -> Optional[int]:
+    """
+    An upper bound of the work of estimate_work computed from the JScop. The
+    operations of a statement are bounded by the operations of all
+    instructions of the scop.
+
+    :return: The bound or None if any domain is unbounded
+    """
+    ctx = isl.DEFAULT_CONTEXT
+    context = isl.Set.read_from_str(ctx, desc["context"])
+
+    operations = {}
+    for instruction in desc["instructions"].replace("\\n", "\n").splitlines():
+        if "=" not in instruction or "getelementptr" in instruction:
+            continue
+
+        reference, instruction = instruction.split("=", 1)
+        operations[reference.strip()] = _weight(instruction)
+
+    arrays = {array["name"] for array in desc["arrays"] if array["kind"] == "array"}
+
+    work = 0
+    for statement in desc["statements"]:
+        domain = isl.UnionSet.read_from_str(ctx, statement["domain"])
+        instances = count_instances(domain, context)
+        if instances is None:
+            return None
+
+        accesses = 0
+        for access in statement["accesses"]:
+            relation = isl.Map.read_from_str(ctx, access["relation"])
+            if relation.get_tuple_name(isl.dim_type.out) in arrays:
+                accesses += 1
+
+        work += instances * (sum(operations.values()) + accesses)
+
+    return work
+
+
+def count_instances(
+    domain: isl.UnionSet, context: isl.Set, parameters: Dict[str, int] = None
+) -> Optional[int]:
+    """
+    Counts the instances of a statement domain. The union over all values of
+    the parameters is counted, i.e., an upper bound of each instance.
+
+    :param parameters: Optional values of (some of) the parameters by name
+    :return: The number of instances or None if the domain is unbounded
+    """
+    domain = domain.as_set()
+    if context is not None:
+        domain = domain.intersect_params(context)
+
+    if parameters is not None:
+        for name, value in parameters.items():
+            pos = domain.find_dim_by_name(isl.dim_type.param, name)
+            if pos >= 0:
+                domain = domain.fix_val(isl.dim_type.param, pos, value)
+
+    domain = domain.project_out(isl.dim_type.param, 0, domain.dim(isl.dim_type.param))
+    if domain.is_empty():
+        return 0
+    if not domain.is_bounded():
+        return None
+
+    box = 1
+    for dim in range(domain.dim(isl.dim_type.set)):
+        lower = domain.dim_min_val(dim).to_python()
+        upper = domain.dim_max_val(dim).to_python()
+        box *= upper - lower + 1
+
+    if box > _EXACT_COUNT_LIMIT:
+        return box
+
+    return domain.count_val().to_python()
+
+
+def _weight(instruction: str) -> int:
+    # Calls of LLVM intrinsics are named as by Computation, others are unknown
+    if re.search(r"\bcall\b", instruction):
+        match = re.search(r"@llvm\.(\w+)", instruction)
+        if match is None:
+            return max(OPERATION_WEIGHTS.values())
+        return OPERATION_WEIGHTS.get(match.group(1), 1)
+
+    return OPERATION_WEIGHTS.get(instruction.split()[0], 1)
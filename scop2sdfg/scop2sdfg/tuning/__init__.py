@@ -0,0 +1,7 @@
+from scop2sdfg.tuning.database import (
+    TuningDatabase,
+    default_path,
+    hardware_fingerprint,
+)
+from scop2sdfg.tuning.evaluation import evaluate_candidates
+from scop2sdfg.tuning.maps import tune_maps
@@ -0,0 +1,48 @@
+import fire
+
+from scop2sdfg.tuning.database import TuningDatabase
+
+
+class TuningCLI(object):
+    """
+    Manages the transfer-tuning database, e.g., to share the recipes found
+    on one machine with machines of the same processor.
+    """
+
+    def __init__(self, db: str = None):
+        self._db = db
+
+    def list(self):
+        database = TuningDatabase(self._db)
+        for entry in database.entries():
+            runtime = entry["runtime"]
+            print(
+                entry["cutout"][:16],
+                entry["fingerprint"],
+                "-" if runtime is None else f"{runtime * 1e3:.3f}ms",
+                entry["hits"],
+            )
+        database.close()
+
+    def export(self, path: str):
+        database = TuningDatabase(self._db)
+        exported = database.export(path)
+        database.close()
+        print(f"exported {exported} recipes to {path}")
+
+    def load(self, path: str):
+        database = TuningDatabase(self._db)
+        imported = database.load(path)
+        database.close()
+        print(f"imported {imported} recipes from {path}")
+
+    def evict(self, max_entries: int = None, max_age_days: float = None):
+        database = TuningDatabase(self._db)
+        max_age = None if max_age_days is None else max_age_days * 86400
+        removed = database.evict(max_entries=max_entries, max_age=max_age)
+        database.close()
+        print(f"evicted {removed} recipes")
+
+
+def main():
+    fire.Fire(TuningCLI)
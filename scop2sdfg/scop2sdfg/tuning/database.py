@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import platform
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipes (
+    cutout TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    recipe TEXT NOT NULL,
+    runtime REAL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (cutout, fingerprint)
+)
+"""
+
+_COLUMNS = [
+    "cutout",
+    "fingerprint",
+    "recipe",
+    "runtime",
+    "created",
+    "last_used",
+    "hits",
+]
+
+
+def default_path() -> Path:
+    """
+    The database is located outside of the .daisycache folder, which is
+    removed by every build. DAISY_TUNING_DB overrides the location.
+    """
+    path = os.environ.get("DAISY_TUNING_DB")
+    if path:
+        return Path(path)
+
+    cache = os.environ.get("XDG_CACHE_HOME", str(Path.home() / ".cache"))
+    return Path(cache) / "daisy" / "tuning.db"
+
+
+def hardware_fingerprint() -> str:
+    """
+    Identifies the processor the recipes are tuned for.
+    """
+    model = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    model = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+
+    desc = json.dumps([platform.machine(), model, os.cpu_count()])
+    return hashlib.sha256(desc.encode("utf-8")).hexdigest()[:16]
+
+
+class TuningDatabase:
+    """
+    Persistent store of the transformation recipes found by transfer tuning.
+    A recipe is keyed by the hash of the map's cutout and the fingerprint of
+    the hardware, and is kept with its measured runtime. The least recently
+    used recipes are evicted beyond max_entries.
+    """
+
+    def __init__(self, path: Path = None, max_entries: int = 4096) -> None:
+        self._path = Path(path) if path is not None else default_path()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._max_entries = max_entries
+        self._fingerprint = hardware_fingerprint()
+
+        self._connection = sqlite3.connect(str(self._path))
+        self._connection.execute(_SCHEMA)
+        self._connection.commit()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def fingerprint(self) -> str:
+        return self._fingerprint
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def lookup(self, cutout: str, fingerprint: str = None) -> Optional[Dict]:
+        """
+        Returns the recipe of the cutout and its runtime, or None.
+        """
+        fingerprint = fingerprint or self._fingerprint
+        row = self._connection.execute(
+            "SELECT recipe, runtime FROM recipes WHERE cutout = ? AND fingerprint = ?",
+            (cutout, fingerprint),
+        ).fetchone()
+        if row is None:
+            return None
+
+        self._connection.execute(
+            "UPDATE recipes SET hits = hits + 1, last_used = ? "
+            + "WHERE cutout = ? AND fingerprint = ?",
+            (time.time(), cutout, fingerprint),
+        )
+        self._connection.commit()
+        return {"recipe": json.loads(row[0]), "runtime": row[1]}
+
+    def record(
+        self,
+        cutout: str,
+        recipe: Dict,
+        runtime: Optional[float],
+        fingerprint: str = None,
+    ) -> bool:
+        """
+        Records the recipe of the cutout unless a faster one is known.
+
+        :return: True if the recipe was recorded
+        """
+        fingerprint = fingerprint or self._fingerprint
+        row = self._connection.execute(
+            "SELECT runtime FROM recipes WHERE cutout = ? AND fingerprint = ?",
+            (cutout, fingerprint),
+        ).fetchone()
+        if row is not None and row[0] is not None:
+            if runtime is None or row[0] <= runtime:
+                return False
+
+        # Replaced recipes keep their statistics
+        now = time.time()
+        self._connection.execute(
+            "INSERT INTO recipes VALUES (?, ?, ?, ?, ?, ?, 0) "
+            + "ON CONFLICT (cutout, fingerprint) DO UPDATE SET "
+            + "recipe = excluded.recipe, runtime = excluded.runtime, "
+            + "last_used = excluded.last_used",
+            (cutout, fingerprint, json.dumps(recipe), runtime, now, now),
+        )
+        self._connection.commit()
+        self.evict()
+        return True
+
+    def evict(self, max_entries: int = None, max_age: float = None) -> int:
+        """
+        Removes the least recently used recipes beyond max_entries and the
+        recipes not used for max_age seconds.
+
+        :return: The number of removed recipes
+        """
+        max_entries = max_entries if max_entries is not None else self._max_entries
+
+        removed = 0
+        if max_age is not None:
+            cursor = self._connection.execute(
+                "DELETE FROM recipes WHERE last_used < ?", (time.time() - max_age,)
+            )
+            removed += cursor.rowcount
+
+        cursor = self._connection.execute(
+            "DELETE FROM recipes WHERE rowid NOT IN "
+            + "(SELECT rowid FROM recipes ORDER BY last_used DESC LIMIT ?)",
+            (max_entries,),
+        )
+        removed += cursor.rowcount
+        self._connection.commit()
+        return removed
+
+    def entries(self) -> List[Dict]:
+        rows = self._connection.execute(
+            "SELECT " + ", ".join(_COLUMNS) + " FROM recipes ORDER BY last_used DESC"
+        ).fetchall()
+
+        entries = []
+        for row in rows:
+            entry = dict(zip(_COLUMNS, row))
+            entry["recipe"] = json.loads(entry["recipe"])
+            entries.append(entry)
+        return entries
+
+    def export(self, path: Path) -> int:
+        """
+        Writes all recipes to a file of JSON lines.
+
+        :return: The number of exported recipes
+        """
+        entries = self.entries()
+        with open(path, "w") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+        return len(entries)
+
+    def load(self, path: Path) -> int:
+        """
+        Imports the recipes of a file written by export. Known recipes are
+        only replaced by faster ones.
+
+        :return: The number of imported recipes
+        """
+        imported = 0
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+
+                entry = json.loads(line)
+                imported += self.record(
+                    entry["cutout"],
+                    entry["recipe"],
+                    entry["runtime"],
+                    fingerprint=entry["fingerprint"],
+                )
+        return imported
@@ -0,0 +1,193 @@
+import os
+import time
+import dace
+import numpy as np
+import multiprocessing
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from dace.codegen import compiler
+from dace.codegen.codegen import generate_code
+from dace.sdfg.utils import inline_loop_blocks, load_precompiled_sdfg
+
+
+def evaluate_candidates(
+    candidates: List[dace.SDFG],
+    build_folder: Path,
+    workers: int = None,
+    budget: float = None,
+    repetitions: int = 5,
+) -> List[Optional[float]]:
+    """
+    Measures the runtime of candidate SDFGs. The candidates are compiled in
+    parallel by a pool of workers and measured one after another by a single
+    runner process, whose OpenMP threads are bound to cores. Compilation and
+    measurement do not overlap to keep the timings stable.
+
+    :param workers: Number of compiling processes, all cores by default
+    :param budget: Time in seconds, after which the remaining candidates are
+                   not compiled or measured
+    :return: The best runtime of each candidate, None if it was not measured
+             or failed
+    """
+    deadline = None if budget is None else time.monotonic() + budget
+    runtimes = [None] * len(candidates)
+    if not candidates or _remaining(deadline) == 0:
+        return runtimes
+
+    folders = [Path(build_folder) / str(i) for i in range(len(candidates))]
+
+    # Workers inherit the configuration of the compiler by forking
+    pool = multiprocessing.get_context("fork").Pool(
+        min(workers or os.cpu_count() or 1, len(candidates))
+    )
+    try:
+        results = [
+            pool.apply_async(_compile, (candidate.to_json(), str(folder)))
+            for candidate, folder in zip(candidates, folders)
+        ]
+        pool.close()
+        for result in results:
+            result.wait(_remaining(deadline))
+        compiled = [
+            result.ready() and result.successful() and result.get()
+            for result in results
+        ]
+    finally:
+        # Compilations exceeding the budget are discarded
+        pool.terminate()
+
+    runner = _Runner()
+    try:
+        for i, folder in enumerate(folders):
+            if not compiled[i]:
+                continue
+
+            runtimes[i] = runner.run(str(folder), repetitions, _remaining(deadline))
+            if _remaining(deadline) == 0:
+                break
+    finally:
+        runner.close()
+
+    return runtimes
+
+
+def _sample_symbols(sdfg: dace.SDFG, max_elements: int = 1 << 22) -> Dict[str, int]:
+    # The free symbols, e.g., the sizes of parametric cutouts, are bound to
+    # the same sample value, which is halved until the arrays fit
+    names = sorted(str(symbol) for symbol in sdfg.free_symbols)
+    value = 1024
+    while names and value > 1:
+        symbols = {name: value for name in names}
+        elements = [
+            dace.symbolic.evaluate(desc.total_size, symbols)
+            for desc in sdfg.arrays.values()
+            if isinstance(desc, dace.data.Array)
+        ]
+        if all(size <= max_elements for size in elements):
+            break
+        value //= 2
+
+    return {name: value for name in names}
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0)
+
+
+class _Runner:
+    """
+    Process measuring the compiled candidates one after another. A crashing
+    candidate terminates the process, which is restarted for the next one.
+    """
+
+    def __init__(self) -> None:
+        self._start()
+
+    def _start(self) -> None:
+        context = multiprocessing.get_context("spawn")
+        self._connection, child = context.Pipe()
+        self._process = context.Process(target=_serve, args=(child,), daemon=True)
+        self._process.start()
+        child.close()
+
+    def run(self, folder: str, repetitions: int, timeout: float) -> Optional[float]:
+        self._connection.send((folder, repetitions))
+        if not self._connection.poll(timeout):
+            # The measurement is abandoned with the process
+            self.close()
+            self._start()
+            return None
+
+        try:
+            return self._connection.recv()
+        except EOFError:
+            self.close()
+            self._start()
+            return None
+
+    def close(self) -> None:
+        self._process.terminate()
+        self._process.join()
+
+
+def _serve(connection) -> None:
+    # The OpenMP runtime is started with bound threads by the first candidate
+    os.environ["OMP_PROC_BIND"] = "close"
+    os.environ["OMP_PLACES"] = "cores"
+
+    while True:
+        try:
+            folder, repetitions = connection.recv()
+        except EOFError:
+            return
+
+        try:
+            runtime = _run(folder, repetitions)
+        except Exception:
+            runtime = None
+        connection.send(runtime)
+
+
+def _compile(sdfg_json: str, folder: str) -> bool:
+    # As in SDFG.compile without loading the library
+    sdfg = dace.SDFG.from_json(sdfg_json)
+    sdfg.build_folder = folder
+    inline_loop_blocks(sdfg)
+    sdfg.fill_scope_connectors()
+    try:
+        code_objects = generate_code(sdfg)
+        compiler.generate_program_folder(sdfg, code_objects, folder)
+        compiler.configure_and_compile(folder, sdfg.name)
+    except Exception:
+        return False
+    return True
+
+
+def _run(folder: str, repetitions: int) -> Optional[float]:
+    # Best runtime of the compiled candidate on random data
+    compiled = load_precompiled_sdfg(folder)
+    symbols = _sample_symbols(compiled.sdfg)
+
+    arguments = {}
+    for name, desc in compiled.sdfg.arglist().items():
+        if name in symbols:
+            arguments[name] = desc.dtype.type(symbols[name])
+        elif isinstance(desc, dace.data.Array):
+            shape = [int(dace.symbolic.evaluate(size, symbols)) for size in desc.shape]
+            arguments[name] = np.random.rand(*shape).astype(desc.dtype.type)
+        elif isinstance(desc, dace.data.Scalar):
+            arguments[name] = desc.dtype.type(1)
+        else:
+            return None
+
+    best = None
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        compiled(**arguments)
+        runtime = time.perf_counter() - start
+        best = runtime if best is None else min(best, runtime)
+    return best
@@ -0,0 +1,216 @@
+import copy
+import time
+import dace
+
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from dace.sdfg.analysis.cutout import SDFGCutout
+
+from scop2sdfg.tuning.database import TuningDatabase
+from scop2sdfg.tuning.evaluation import evaluate_candidates
+
+
+def tune_maps(
+    sdfg: dace.SDFG,
+    tuner: Callable[[dace.SDFG], Optional[List[dace.SDFG]]],
+    database: TuningDatabase,
+    measure: bool = True,
+    workers: int = None,
+    budget: float = None,
+    labels: Set[str] = None,
+) -> Dict[str, str]:
+    """
+    Tunes the outermost maps of the SDFG. Each map is cut out and looked up
+    in the database by the hash of the cutout. Known cutouts are replaced by
+    their tuned version immediately. The candidates of the tuner for all
+    other cutouts are evaluated together and the fastest candidate of each
+    cutout is recorded with its runtime.
+
+    :param tuner: Transforms a cutout in-place or returns candidate SDFGs
+                  derived from it, the first being the preferred one
+    :param measure: Measures the runtime of the candidates
+    :param workers: Number of processes compiling the candidates
+    :param budget: Time in seconds for tuning and evaluation. Maps reached
+                   afterwards are not tuned, and the best candidates measured
+                   so far are taken
+    :param labels: Labels of the maps to tune, all by default
+    :return: The result ("hit", "tuned", "unmeasured" or "skipped") by map
+             label
+    """
+    deadline = None if budget is None else time.monotonic() + budget
+    results = {}
+    replacements = []
+    pending = []
+    for state, entry in _outermost_maps(sdfg):
+        label = entry.map.label
+        if labels is not None and label not in labels:
+            continue
+
+        cutout = _cutout(sdfg, state, entry)
+        key = cutout.hash_sdfg()
+
+        known = database.lookup(key)
+        if known is not None:
+            tuned = dace.SDFG.from_json(known["recipe"]["sdfg"])
+            if _fits(sdfg, tuned):
+                results[label] = "hit"
+                replacements.append((state, entry, key, tuned))
+                continue
+
+        # Maps beyond the budget keep their schedule
+        if deadline is not None and time.monotonic() >= deadline:
+            results[label] = "skipped"
+            continue
+
+        candidates = tuner(cutout)
+        if candidates is None:
+            candidates = [cutout]
+
+        # The cutout refers to the SDFG, the recipes are independent
+        recipes = [
+            {
+                "sdfg": candidate.to_json(),
+                "transformations": [
+                    xf.to_json() for xf in candidate.transformation_hist
+                ],
+            }
+            for candidate in candidates
+        ]
+        pending.append((state, entry, key, recipes))
+
+    runtimes = [[None] * len(recipes) for _, _, _, recipes in pending]
+    if measure and pending:
+        candidates = [
+            dace.SDFG.from_json(recipe["sdfg"])
+            for _, _, _, recipes in pending
+            for recipe in recipes
+        ]
+        evaluated = evaluate_candidates(
+            candidates,
+            Path(sdfg.build_folder) / "tuning",
+            workers=workers,
+            budget=None if deadline is None else max(deadline - time.monotonic(), 0),
+        )
+        offset = 0
+        for runtime in runtimes:
+            runtime[:] = evaluated[offset : offset + len(runtime)]
+            offset += len(runtime)
+
+    for (state, entry, key, recipes), runtime in zip(pending, runtimes):
+        label = entry.map.label
+        measured = [i for i in range(len(recipes)) if runtime[i] is not None]
+        if measured:
+            best = min(measured, key=lambda i: runtime[i])
+        else:
+            best = 0
+
+        # Maps without measured candidates, e.g., beyond the budget, are tuned
+        # again by the next build
+        if not measure or measured:
+            database.record(key, recipes[best], runtime[best])
+            results[label] = "tuned"
+        else:
+            results[label] = "unmeasured"
+
+        tuned = dace.SDFG.from_json(recipes[best]["sdfg"])
+        replacements.append((state, entry, key, tuned))
+
+    for state, entry, key, tuned in replacements:
+        tuned.name = f"{entry.map.label}_{key[:8]}"
+        _replace_map(sdfg, state, entry, tuned)
+
+    sdfg.reset_sdfg_list()
+    return results
+
+
+def _outermost_maps(
+    sdfg: dace.SDFG,
+) -> List[Tuple[dace.SDFGState, dace.nodes.MapEntry]]:
+    maps = []
+    for state in sdfg.states():
+        scope_dict = state.scope_dict()
+        for node in state.nodes():
+            if isinstance(node, dace.nodes.MapEntry) and scope_dict[node] is None:
+                maps.append((state, node))
+    return maps
+
+
+def _cutout(
+    sdfg: dace.SDFG, state: dace.SDFGState, entry: dace.nodes.MapEntry
+) -> SDFGCutout:
+    exit_node = state.exit_node(entry)
+    nodes = set(state.all_nodes_between(entry, exit_node))
+    nodes.update([entry, exit_node])
+    for edge in state.in_edges(entry):
+        nodes.add(edge.src)
+    for edge in state.out_edges(exit_node):
+        nodes.add(edge.dst)
+
+    cutout = SDFGCutout.singlestate_cutout(
+        state, *nodes, symbols_map=copy.copy(sdfg.constants)
+    )
+    for symbol, value in sdfg.constants.items():
+        if symbol in cutout.free_symbols:
+            cutout.specialize({symbol: value})
+
+    return cutout
+
+
+def _fits(sdfg: dace.SDFG, tuned: dace.SDFG) -> bool:
+    # The global data of the cutout are the arrays of the map
+    for name, desc in tuned.arrays.items():
+        if desc.transient:
+            continue
+        if name not in sdfg.arrays:
+            return False
+        if tuple(map(str, desc.shape)) != tuple(map(str, sdfg.arrays[name].shape)):
+            return False
+    return True
+
+
+def _replace_map(
+    sdfg: dace.SDFG,
+    state: dace.SDFGState,
+    entry: dace.nodes.MapEntry,
+    tuned: dace.SDFG,
+) -> dace.nodes.NestedSDFG:
+    exit_node = state.exit_node(entry)
+    inputs = {
+        edge.src.data: edge.src
+        for edge in state.in_edges(entry)
+        if isinstance(edge.src, dace.nodes.AccessNode)
+    }
+    outputs = {
+        edge.dst.data: edge.dst
+        for edge in state.out_edges(exit_node)
+        if isinstance(edge.dst, dace.nodes.AccessNode)
+    }
+
+    scope = set(state.all_nodes_between(entry, exit_node))
+    scope.update([entry, exit_node])
+    state.remove_nodes_from(list(scope))
+
+    # The layout of the arrays is given by the SDFG
+    for name, desc in tuned.arrays.items():
+        if not desc.transient:
+            desc.strides = sdfg.arrays[name].strides
+
+    symbols = tuned.free_symbols
+    nsdfg = state.add_nested_sdfg(
+        tuned,
+        sdfg,
+        set(inputs.keys()),
+        set(outputs.keys()),
+        symbol_mapping={symbol: symbol for symbol in symbols},
+    )
+    for name, node in inputs.items():
+        state.add_edge(
+            node, None, nsdfg, name, dace.Memlet.from_array(name, sdfg.arrays[name])
+        )
+    for name, node in outputs.items():
+        state.add_edge(
+            nsdfg, name, node, None, dace.Memlet.from_array(name, sdfg.arrays[name])
+        )
+
+    return nsdfg
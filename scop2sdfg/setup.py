@@ -26,6 +26,7 @@ setup(
     entry_points={
         "console_scripts": [
             "scop2sdfg = scop2sdfg.cli:main",
+            "scop2sdfg-tuning = scop2sdfg.tuning.cli:main",
         ]
     },
 )
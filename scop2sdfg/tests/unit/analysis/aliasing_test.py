@@ -0,0 +1,64 @@
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.scop.analysis import alias_groups, aliasing_arrays
+from scop2sdfg.codegen.generator import Generator
+
+from conftest import array, jscop, read, statement, write
+
+
+def _jscop(access_range):
+    # B[i0] = A[i0] for i0 in [0, 1024)
+    load = "%0 = load double, ptr %ptr0, align 8"
+    return jscop(
+        [array(name) for name in ["MemRef0", "MemRef1", "MemRef2"]],
+        [
+            statement(
+                "Stmt0",
+                "{ Stmt0[i0] : 0 <= i0 <= 1023 }",
+                [
+                    read("{ Stmt0[i0] -> MemRef0[i0] }", load),
+                    write(
+                        "{ Stmt0[i0] -> MemRef1[i0] }",
+                        "store double %0, ptr %out, align 8",
+                        load,
+                    ),
+                    write(
+                        "{ Stmt0[i0] -> MemRef2[i0] }",
+                        "store double %0, ptr %out2, align 8",
+                        load,
+                    ),
+                ],
+            )
+        ],
+        "{ Stmt0[i0] -> [i0] }",
+        access_range=access_range,
+    )
+
+
+def _member(array):
+    return {"minimal": "{ " + array + "[(0)] }", "maximal": "{ " + array + "[(1023)] }"}
+
+
+def test_no_alias_groups():
+    scop = Scop.from_json("copy.c", _jscop([]))
+    assert alias_groups(scop) == []
+
+    sdfg = Generator.generate(scop)
+    assert "__restrict__ MemRef0" in sdfg.signature()
+    assert "__restrict__ MemRef1" in sdfg.signature()
+
+
+def test_alias_group():
+    access_range = [
+        {"readwrite": [_member("MemRef1")], "readonly": [_member("MemRef0")]},
+        {"readwrite": [_member("MemRef2")], "readonly": []},
+    ]
+    scop = Scop.from_json("copy.c", _jscop(access_range))
+    assert alias_groups(scop) == [{"MemRef0", "MemRef1"}]
+    assert aliasing_arrays(scop) == {"MemRef0", "MemRef1"}
+
+    sdfg = Generator.generate(scop)
+    assert sdfg.arrays["MemRef0"].may_alias
+    assert sdfg.arrays["MemRef1"].may_alias
+    assert not sdfg.arrays["MemRef2"].may_alias
+    assert "__restrict__ MemRef0" not in sdfg.signature()
+    assert "__restrict__ MemRef2" in sdfg.signature()
@@ -0,0 +1,195 @@
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.scop.analysis import (
+    estimate_work,
+    parameter_thresholds,
+    select_schedule,
+)
+
+from conftest import array, jscop, statement, write
+
+
+def _jscop(
+    params,
+    iterators,
+    domain,
+    relation,
+    incoming_value,
+    instructions=(),
+    dependencies="{  }",
+):
+    prefix = "[" + ", ".join(params) + "] -> "
+    return jscop(
+        [array("MemRef0", ["*", "1024"], variable="ptr %A")],
+        [
+            statement(
+                "Stmt0",
+                domain,
+                [
+                    write(
+                        relation, "store double %res, ptr %out, align 8", incoming_value
+                    )
+                ],
+                loops=len(iterators),
+            )
+        ],
+        prefix
+        + "{ Stmt0["
+        + ", ".join(iterators)
+        + "] -> ["
+        + ", ".join(iterators)
+        + "] }",
+        instructions=instructions,
+        params=params,
+        dependencies=dependencies,
+        context=prefix + "{  :  }",
+        name="%for.cond---%for.end",
+    )
+
+
+def test_small_init():
+    desc = _jscop(
+        [],
+        ["i0", "i1"],
+        "{ Stmt0[i0, i1] : 0 <= i0 <= 2 and 0 <= i1 <= 2 }",
+        "{ Stmt0[i0, i1] -> MemRef0[i0, i1] }",
+        "double 0.000000e+00",
+    )
+    scop = Scop.from_json("init.c", desc)
+    estimate = estimate_work(scop)
+
+    assert estimate["iterations"] == 9
+    assert estimate["operations"] == 0
+    assert estimate["accesses"] == 9
+    assert estimate["work"] == 9
+    assert estimate["parallel_work"] == 9
+
+
+def test_triangular():
+    desc = _jscop(
+        [],
+        ["i0", "i1"],
+        "{ Stmt0[i0, i1] : 0 <= i0 <= 1023 and 0 <= i1 <= i0 }",
+        "{ Stmt0[i0, i1] -> MemRef0[i0, i1] }",
+        "  %add = fadd double 1.000000e+00, 2.000000e+00",
+        ["%add = fadd double 1.000000e+00, 2.000000e+00"],
+    )
+    scop = Scop.from_json("triangular.c", desc)
+    estimate = estimate_work(scop)
+
+    assert estimate["iterations"] == 1024 * 1025 // 2
+    assert estimate["operations"] == estimate["iterations"]
+    assert estimate["work"] == 2 * estimate["iterations"]
+
+
+def test_parametric():
+    desc = _jscop(
+        ["p_0"],
+        ["i0"],
+        "[p_0] -> { Stmt0[i0] : 0 <= i0 < p_0 }",
+        "[p_0] -> { Stmt0[i0] -> MemRef0[0, i0] }",
+        "double 0.000000e+00",
+    )
+    scop = Scop.from_json("parametric.c", desc)
+    estimate = estimate_work(scop)
+    assert estimate["work"] is None
+
+    # Bounded by the context
+    desc["context"] = "[p_0] -> {  : 0 <= p_0 <= 16 }"
+    scop = Scop.from_json("parametric.c", desc)
+    estimate = estimate_work(scop)
+    assert estimate["iterations"] == 16
+
+
+def test_parameter_thresholds():
+    # A[p_1, i0] = 0 for i0 in [0, p_0)
+    desc = _jscop(
+        ["p_0", "p_1"],
+        ["i0"],
+        "[p_0, p_1] -> { Stmt0[i0] : 0 <= i0 < p_0 }",
+        "[p_0, p_1] -> { Stmt0[i0] -> MemRef0[p_1, i0] }",
+        "double 0.000000e+00",
+    )
+    scop = Scop.from_json("parametric.c", desc)
+    assert estimate_work(scop, {"p_0": 100})["work"] == 100
+
+    assert parameter_thresholds(scop, 1000) == [{"p_0": 1000}]
+
+
+def test_parameter_thresholds_skewed():
+    # A[i0, i1] = 0 for i0 in [0, p_0) and i1 in [0, p_1)
+    desc = _jscop(
+        ["p_0", "p_1"],
+        ["i0", "i1"],
+        "[p_0, p_1] -> { Stmt0[i0, i1] : 0 <= i0 < p_0 and 0 <= i1 < p_1 }",
+        "[p_0, p_1] -> { Stmt0[i0, i1] -> MemRef0[i0, i1] }",
+        "double 0.000000e+00",
+    )
+    scop = Scop.from_json("skewed.c", desc)
+    thresholds = parameter_thresholds(scop, 1000)
+    assert thresholds == [
+        {"p_0": 32, "p_1": 32},
+        {"p_0": 1000, "p_1": 1},
+        {"p_0": 1, "p_1": 1000},
+    ]
+
+    def guard(values):
+        return any(
+            all(values[name] >= bound for name, bound in alternative.items())
+            for alternative in thresholds
+        )
+
+    # The work of all shapes passing the guard is reached
+    for values in ({"p_0": 1, "p_1": 1000000}, {"p_0": 40, "p_1": 40}):
+        assert guard(values)
+        assert estimate_work(scop, values)["work"] >= 1000
+
+    assert not guard({"p_0": 1, "p_1": 999})
+    assert not guard({"p_0": 10, "p_1": 10})
+
+
+def test_sequential():
+    desc = _jscop(
+        [],
+        ["i0"],
+        "{ Stmt0[i0] : 0 <= i0 <= 1023 }",
+        "{ Stmt0[i0] -> MemRef0[0, i0] }",
+        "double 0.000000e+00",
+        dependencies="{ Stmt0[i0] -> Stmt0[1 + i0] : 0 <= i0 <= 1022 }",
+    )
+    scop = Scop.from_json("sequential.c", desc)
+    estimate = estimate_work(scop)
+
+    assert estimate["work"] == 1024
+    assert estimate["parallel_work"] == 0
+
+
+def test_select_schedule():
+    desc = _jscop(
+        ["p_0"],
+        ["i0"],
+        "[p_0] -> { Stmt0[i0] : 0 <= i0 < p_0 }",
+        "[p_0] -> { Stmt0[i0] -> MemRef0[0, i0] }",
+        "double 0.000000e+00",
+    )
+    scop = Scop.from_json("parallel.c", desc)
+    assert select_schedule(scop, estimate_work(scop), 1024) == "multicore"
+    assert (
+        select_schedule(scop, estimate_work(scop, {"p_0": 100}), 1024) == "sequential"
+    )
+
+
+def test_select_schedule_sequential():
+    # The work is unbounded, but all loops are serial
+    desc = _jscop(
+        ["p_0"],
+        ["i0"],
+        "[p_0] -> { Stmt0[i0] : 0 <= i0 < p_0 }",
+        "[p_0] -> { Stmt0[i0] -> MemRef0[0, i0] }",
+        "double 0.000000e+00",
+        dependencies="[p_0] -> { Stmt0[i0] -> Stmt0[1 + i0] : 0 <= i0 < p_0 - 1 }",
+    )
+    scop = Scop.from_json("sequential.c", desc)
+    estimate = estimate_work(scop)
+
+    assert estimate["work"] is None
+    assert select_schedule(scop, estimate, 1024) == "sequential"
@@ -0,0 +1,108 @@
+import dace
+import islpy as isl
+
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.scop.analysis import fuse_loops
+from scop2sdfg.codegen.generator import Generator
+
+from conftest import increments
+
+
+def _jscop(domains, dependencies, offset=0):
+    # Producer and consumer: B = A + 1; C = B + 1
+    return increments(domains, dependencies={"RAW": dependencies}, offset=offset)
+
+
+def _maps(sdfg: dace.SDFG):
+    return [
+        node
+        for node, _ in sdfg.all_nodes_recursive()
+        if isinstance(node, dace.nodes.MapEntry)
+    ]
+
+
+def test_fusion():
+    desc = _jscop(
+        [
+            "{ Stmt0[i0] : 0 <= i0 <= 1023 }",
+            "{ Stmt1[i0] : 0 <= i0 <= 1023 }",
+        ],
+        "{ Stmt0[i0] -> Stmt1[i0] : 0 <= i0 <= 1023 }",
+    )
+    scop = Scop.from_json("fusion.c", desc, fusion=True)
+    assert scop.validate()
+    assert scop.fused == [["Stmt0", "Stmt1"]]
+
+    # One parallel map computing both statements
+    sdfg = Generator.generate(scop)
+    sdfg.validate()
+
+    maps = _maps(sdfg)
+    assert len(maps) == 1
+    assert maps[0].map.schedule == dace.ScheduleType.Default
+
+    body = [
+        node
+        for node in sdfg.all_nodes_recursive()
+        if isinstance(node[0], dace.nodes.NestedSDFG)
+    ][0][0].sdfg
+    assert [state.label for state in body.topological_sort()] == [
+        "state_Stmt0",
+        "state_Stmt1",
+    ]
+
+
+def test_fusion_disabled():
+    desc = _jscop(
+        [
+            "{ Stmt0[i0] : 0 <= i0 <= 1023 }",
+            "{ Stmt1[i0] : 0 <= i0 <= 1023 }",
+        ],
+        "{ Stmt0[i0] -> Stmt1[i0] : 0 <= i0 <= 1023 }",
+    )
+    scop = Scop.from_json("fusion.c", desc)
+    assert scop.fused == []
+    assert len(_maps(Generator.generate(scop))) == 2
+
+
+def test_illegal_fusion():
+    # C[i] = B[i + 1] + 1 reads an element written by a later iteration
+    desc = _jscop(
+        [
+            "{ Stmt0[i0] : 0 <= i0 <= 1023 }",
+            "{ Stmt1[i0] : 0 <= i0 <= 1022 }",
+        ],
+        "{ Stmt0[i0] -> Stmt1[-1 + i0] : 1 <= i0 <= 1023 }",
+        offset=1,
+    )
+    scop = Scop.from_json("fusion.c", desc, fusion=True)
+    assert scop.fused == []
+
+
+def test_incompatible_domains():
+    desc = _jscop(
+        [
+            "{ Stmt0[i0] : 0 <= i0 <= 1023 }",
+            "{ Stmt1[i0] : 0 <= i0 <= 511 }",
+        ],
+        "{ Stmt0[i0] -> Stmt1[i0] : 0 <= i0 <= 511 }",
+    )
+    scop = Scop.from_json("fusion.c", desc, fusion=True)
+    assert scop.fused == []
+
+
+def test_fusion_nested_loops():
+    schedule = isl.UnionMap(
+        "{ S0[i, j] -> [0, i, j]; S1[i, j] -> [1, i, j] }"
+    ).intersect_domain(
+        isl.UnionSet("{ S0[i, j] : 0 <= i, j <= 63; S1[i, j] : 0 <= i, j <= 63 }")
+    )
+    dependencies = isl.UnionMap("{ S0[i, j] -> S1[i, j] : 0 <= i, j <= 63 }")
+
+    schedule, fused = fuse_loops(schedule, dependencies)
+    assert fused == [["S0", "S1"], ["S0", "S1"]]
+
+    # Both loops enclose the statements
+    ast = isl.AstBuild.from_context(isl.Set("{ : }")).node_from_schedule_map(schedule)
+    assert ast.get_type() == isl.ast_node_type.for_
+    assert ast.for_get_body().get_type() == isl.ast_node_type.for_
@@ -0,0 +1,78 @@
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.codegen.analysis import infer_shape
+
+from conftest import array, jscop, statement, write
+
+
+def _jscop(params, iterators, domain, relation, context=None):
+    prefix = "[" + ", ".join(params) + "] -> "
+    return jscop(
+        [array("MemRef0", ["*", "1024"], variable="ptr %A")],
+        [
+            statement(
+                "Stmt0",
+                domain,
+                [
+                    write(
+                        relation,
+                        "store double 0.000000e+00, ptr %out, align 8",
+                        "double 0.000000e+00",
+                    )
+                ],
+                loops=len(iterators),
+            )
+        ],
+        prefix
+        + "{ Stmt0["
+        + ", ".join(iterators)
+        + "] -> ["
+        + ", ".join(iterators)
+        + "] }",
+        params=params,
+        context=context or prefix + "{  :  }",
+        name="%for.cond---%for.end",
+    )
+
+
+def test_constant():
+    desc = _jscop(
+        [],
+        ["i0", "i1"],
+        "{ Stmt0[i0, i1] : 0 <= i0 <= 7 and 0 <= i1 <= i0 }",
+        "{ Stmt0[i0, i1] -> MemRef0[1 + i0, 2 * i1] }",
+    )
+    scop = Scop.from_json("constant.c", desc)
+
+    shapes = infer_shape(scop)
+    assert shapes["MemRef0"] == [(1, 9), (0, 15)]
+
+
+def test_parametric():
+    desc = _jscop(
+        ["p_0"],
+        ["i0"],
+        "[p_0] -> { Stmt0[i0] : 0 <= i0 < p_0 }",
+        "[p_0] -> { Stmt0[i0] -> MemRef0[i0, 0] }",
+        context="[p_0] -> {  : 0 <= p_0 <= 1000 }",
+    )
+    scop = Scop.from_json("parametric.c", desc)
+
+    shapes = infer_shape(scop)
+    lower, upper = shapes["MemRef0"][0]
+    assert lower == 0
+    assert str(upper) == "p_0"
+    assert shapes["MemRef0"][1] == (0, 1)
+
+
+def test_unbounded():
+    desc = _jscop(
+        [],
+        ["i0"],
+        "{ Stmt0[i0] : i0 >= 0 }",
+        "{ Stmt0[i0] -> MemRef0[i0, 7] }",
+    )
+    scop = Scop.from_json("unbounded.c", desc)
+
+    shapes = infer_shape(scop)
+    assert shapes["MemRef0"][0] is None
+    assert shapes["MemRef0"][1] == (7, 8)
@@ -0,0 +1,91 @@
+import dace
+
+from dace.codegen.codegen import generate_code
+
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.codegen.generator import Generator
+
+from conftest import array, jscop, read, statement, write
+
+
+def _jscop():
+    # for (i = 1; i < 32; i++) for (j = 1; j < 32; j++) A[i][j] = A[i - 1][j] + A[i][j - 1];
+    return jscop(
+        [array("MemRef0", ["*", "32"], variable="ptr %A")],
+        [
+            statement(
+                "Stmt0",
+                "{ Stmt0[i0, i1] : 1 <= i0 <= 31 and 1 <= i1 <= 31 }",
+                [
+                    read(
+                        "{ Stmt0[i0, i1] -> MemRef0[-1 + i0, i1] }",
+                        "%0 = load double, ptr %ptr0, align 8",
+                    ),
+                    read(
+                        "{ Stmt0[i0, i1] -> MemRef0[i0, -1 + i1] }",
+                        "%1 = load double, ptr %ptr1, align 8",
+                    ),
+                    write(
+                        "{ Stmt0[i0, i1] -> MemRef0[i0, i1] }",
+                        "store double %add, ptr %out, align 8",
+                        "%add = fadd double %0, %1",
+                    ),
+                ],
+                loops=2,
+                start=1,
+            )
+        ],
+        "{ Stmt0[i0, i1] -> [i0, i1] }",
+        instructions=["%add = fadd double %0, %1"],
+        dependencies={
+            "RAW": "{ Stmt0[i0, i1] -> Stmt0[1 + i0, i1] : 1 <= i0 <= 30 and 1 <= i1 <= 31; "
+            + "Stmt0[i0, i1] -> Stmt0[i0, 1 + i1] : 1 <= i0 <= 31 and 1 <= i1 <= 30 }"
+        },
+    )
+
+
+def _maps(sdfg: dace.SDFG):
+    return [
+        node.map
+        for node, _ in sdfg.all_nodes_recursive()
+        if isinstance(node, dace.nodes.MapEntry)
+    ]
+
+
+def test_exact_parallelism():
+    # The dependence within an iteration is not carried by the innermost loop,
+    # although its distance is not plainly fixed
+    desc = _jscop()
+    desc["dependencies"]["RAW"] = (
+        "{ Stmt0[i0, i1] -> Stmt0[1 + i0, i1] : 1 <= i0 <= 30 and 1 <= i1 <= 31; "
+        + "Stmt0[i0, i1] -> Stmt0[i0, j] : exists (e : j = i1 + 64e "
+        + "and 1 <= i0 <= 31 and 1 <= i1 <= 31 and 1 <= j <= 31) }"
+    )
+    scop = Scop.from_json("wavefront.c", desc)
+    assert scop.validate()
+
+    sdfg = Generator.generate(scop)
+    sdfg.validate()
+
+    # The outer loop remains a loop of states
+    maps = _maps(sdfg)
+    assert len(maps) == 1
+    assert maps[0].params == ["c1"]
+    assert maps[0].schedule == dace.ScheduleType.Default
+    assert "c0" in sdfg.symbols
+
+
+def test_carried_dependence():
+    # A[i][j - 1] is written by the previous iteration of the innermost loop
+    scop = Scop.from_json("wavefront.c", _jscop())
+    sdfg = Generator.generate(scop)
+    sdfg.validate()
+
+    assert len(_maps(sdfg)) == 0
+    assert "c1" in sdfg.symbols
+
+    # The loops are canonical, i.e., the code generation emits plain for loops
+    (code, *_) = generate_code(sdfg)
+    assert "for (c0 = 1; (c0 <= 31); c0 = (c0 + 1))" in code.code
+    assert "for (c1 = 1; (c1 <= 31); c1 = (c1 + 1))" in code.code
+    assert "goto" not in code.code
@@ -0,0 +1,128 @@
+import copy
+import dace
+import numpy as np
+
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.codegen.generator import Generator
+from scop2sdfg.codegen.patterns import IndirectScatter
+
+from conftest import array, jscop, read, statement, write
+
+
+def _jscop():
+    # for (i = 0; i < 1024; i++) B[P[i]] += 1.0;
+    return jscop(
+        [
+            array("MemRef0", variable="ptr @B"),
+            array("MemRef1", dtype="i64", variable="ptr %P"),
+        ],
+        [
+            statement(
+                "Stmt0",
+                "{ Stmt0[i0] : 0 <= i0 <= 1023 }",
+                [
+                    read(
+                        "{ Stmt0[i0] -> MemRef1[i0] }",
+                        "%idx = load i64, ptr %pp, align 8",
+                    ),
+                    read(
+                        "{ Stmt0[i0] -> MemRef0[o0] }",
+                        "%old = load double, ptr %gep, align 8",
+                    ),
+                    write(
+                        "{ Stmt0[i0] -> MemRef0[o0] }",
+                        "store double %add, ptr %gep, align 8",
+                        "%add = fadd double %old, 1.000000e+00",
+                    ),
+                ],
+            )
+        ],
+        "{ Stmt0[i0] -> [i0] }",
+        instructions=[
+            "%gep = getelementptr inbounds [1024 x double], ptr @B, i64 0, i64 %idx",
+            "%add = fadd double %old, 1.000000e+00",
+        ],
+        dependencies="{ Stmt0[i0] -> Stmt0[o0] : 0 <= i0 <= 1022 and i0 < o0 <= 1023 }",
+    )
+
+
+def _tasklets(sdfg: dace.SDFG):
+    return [
+        node
+        for node, _ in sdfg.all_nodes_recursive()
+        if isinstance(node, dace.nodes.Tasklet)
+    ]
+
+
+def test_match():
+    scop = Scop.from_json("histogram.c", _jscop())
+    assert scop.validate()
+
+    scatter = IndirectScatter.match(scop.ast, scop)
+    assert scatter is not None
+    assert [index.array for index in scatter.indices] == ["MemRef1"]
+    assert scatter.arrays(scatter.indices[0]) == ["MemRef0"]
+
+
+def test_inspector():
+    scop = Scop.from_json("histogram.c", _jscop())
+    sdfg = Generator.generate(scop, inspector=True)
+    sdfg.validate()
+
+    inspectors = [
+        tasklet for tasklet in _tasklets(sdfg) if tasklet.label == "inspector"
+    ]
+    assert len(inspectors) == 1
+    # Bitmap of the indices with early exit, no sorting
+    code = inspectors[0].code.as_string
+    assert "_seen" in code and "sort" not in code
+
+    # Parallel map and sequential fallback
+    maps = [
+        node.map
+        for node, _ in sdfg.all_nodes_recursive()
+        if isinstance(node, dace.nodes.MapEntry)
+    ]
+    assert len(maps) == 1
+    assert maps[0].schedule == dace.ScheduleType.Default
+    assert "c0" in sdfg.symbols
+
+    # Both versions scatter into the histogram
+    scatters = [
+        tasklet for tasklet in _tasklets(sdfg) if "_out[_idx]" in tasklet.code.as_string
+    ]
+    assert len(scatters) == 2
+
+
+def test_inspector_execution(tmp_path):
+    scop = Scop.from_json("histogram.c", _jscop())
+    sdfg = Generator.generate(scop, inspector=True)
+    shapes = {
+        name: str(scop._memrefs[name].shape[0]) for name in ["MemRef0", "MemRef1"]
+    }
+
+    # Unique, duplicate and more indices than histogram bins (pigeonhole)
+    rng = np.random.default_rng(0)
+    for bins, indices in [
+        (2048, rng.permutation(1024)),
+        (2048, rng.integers(0, 2048, 1024)),
+        (512, rng.integers(0, 512, 1024)),
+    ]:
+        specialized = copy.deepcopy(sdfg)
+        specialized.name = f"histogram_{bins}"
+        specialized.build_folder = str(tmp_path / specialized.name)
+        specialized.replace_dict(
+            {shapes["MemRef0"]: str(bins), shapes["MemRef1"]: "1024"}
+        )
+
+        histogram = np.zeros(bins)
+        specialized(MemRef0=histogram, MemRef1=indices.astype(np.int64))
+        assert np.array_equal(histogram, np.bincount(indices, minlength=bins))
+
+
+def test_disabled():
+    scop = Scop.from_json("histogram.c", _jscop())
+    sdfg = Generator.generate(scop, inspector=False)
+    sdfg.validate()
+
+    assert all(tasklet.label != "inspector" for tasklet in _tasklets(sdfg))
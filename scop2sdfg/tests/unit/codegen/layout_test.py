@@ -0,0 +1,112 @@
+import dace
+
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.codegen.generator import Generator
+from scop2sdfg.codegen.layout import transform_layouts
+
+from conftest import array, jscop, read, statement, write
+
+
+def _jscop(n: int, k: int):
+    # C[i][j] = C[i][j] + A[i][k] * B[k][j]
+    domain = f"0 <= i0 <= {n - 1} and 0 <= i1 <= {n - 1} and 0 <= i2 <= {k - 1}"
+    return jscop(
+        [
+            array("MemRef0", [str(n), str(k)], variable="ptr %A"),
+            array("MemRef1", [str(k), str(n)], variable="ptr %B"),
+            array("MemRef2", [str(n), str(n)], variable="ptr %C"),
+        ],
+        [
+            statement(
+                "Stmt0",
+                "{ Stmt0[i0, i1, i2] : " + domain + " }",
+                [
+                    read(
+                        "{ Stmt0[i0, i1, i2] -> MemRef2[i0, i1] }",
+                        "%0 = load double, ptr %p0, align 8",
+                    ),
+                    read(
+                        "{ Stmt0[i0, i1, i2] -> MemRef0[i0, i2] }",
+                        "%1 = load double, ptr %p1, align 8",
+                    ),
+                    read(
+                        "{ Stmt0[i0, i1, i2] -> MemRef1[i2, i1] }",
+                        "%2 = load double, ptr %p2, align 8",
+                    ),
+                    write(
+                        "{ Stmt0[i0, i1, i2] -> MemRef2[i0, i1] }",
+                        "store double %add, ptr %p0, align 8",
+                        "%add = fadd double %0, %mul",
+                    ),
+                ],
+                loops=3,
+            )
+        ],
+        "{ Stmt0[i0, i1, i2] -> [i0, i1, i2] }",
+        instructions=["%mul = fmul double %1, %2", "%add = fadd double %0, %mul"],
+        dependencies={
+            "RAW": "{ Stmt0[i0, i1, i2] -> Stmt0[i0, i1, 1 + i2] : "
+            + domain.replace(f"i2 <= {k - 1}", f"i2 <= {k - 2}")
+            + " }"
+        },
+    )
+
+
+def _generate(n: int, k: int):
+    scop = Scop.from_json("layout.c", _jscop(n, k))
+    assert scop.validate()
+
+    sdfg = Generator.generate(scop)
+    return scop, sdfg
+
+
+def test_transposed_array():
+    scop, sdfg = _generate(64, 64)
+    layouts = transform_layouts(sdfg, scop)
+    sdfg.validate()
+
+    # B is accessed along its columns by the innermost loop
+    assert layouts == {"MemRef1": [1, 0]}
+    assert sdfg.arrays["MemRef1_layout"].transient
+    assert sdfg.arrays["MemRef1_layout"].strides == (1, 64)
+
+    for nsdfg in sdfg.all_sdfgs_recursive():
+        if nsdfg is not sdfg and "MemRef1" in nsdfg.arrays:
+            assert nsdfg.arrays["MemRef1"].strides == (1, 64)
+
+    # B is only read: No copy back
+    assert sdfg.start_state.label == "layout_MemRef1_layout"
+    assert not any(state.label.startswith("unpack") for state in sdfg.states())
+
+
+def test_unamortized_copy():
+    # B[i][j] = A[j][i] uses each element of A once, which does not amortize the copy
+    domain = "0 <= i0 <= 63 and 0 <= i1 <= 63"
+    desc = _jscop(64, 64)
+    desc["arrays"] = desc["arrays"][:2]
+    desc["instructions"] = ""
+    desc["dependencies"]["RAW"] = "{  }"
+    desc["schedule"] = "{ Stmt0[i0, i1] -> [i0, i1] }"
+    desc["statements"][0]["domain"] = "{ Stmt0[i0, i1] : " + domain + " }"
+    desc["statements"][0]["loops"] = desc["statements"][0]["loops"][:2]
+    desc["statements"][0]["accesses"] = [
+        {
+            "kind": "read",
+            "relation": "{ Stmt0[i0, i1] -> MemRef0[i1, i0] }",
+            "access_instruction": "  %0 = load double, ptr %p0, align 8",
+            "incoming_value": "",
+        },
+        {
+            "kind": "write",
+            "relation": "{ Stmt0[i0, i1] -> MemRef1[i0, i1] }",
+            "access_instruction": "  store double %0, ptr %p1, align 8",
+            "incoming_value": "  %0 = load double, ptr %p0, align 8",
+        },
+    ]
+
+    scop = Scop.from_json("layout.c", desc)
+    assert scop.validate()
+
+    sdfg = Generator.generate(scop)
+    assert transform_layouts(sdfg, scop) == {}
+    assert "MemRef0_layout" not in sdfg.arrays
@@ -0,0 +1,63 @@
+import dace
+
+from scop2sdfg.codegen.lifetimes import optimize_lifetimes
+
+
+def _sdfg() -> dace.SDFG:
+    sdfg = dace.SDFG("lifetimes")
+    sdfg.add_symbol("N", dace.int64)
+    sdfg.add_array("A", ["N"], dace.float64)
+    sdfg.add_array("B", ["N"], dace.float64)
+    sdfg.add_transient("tmp", ["N"], dace.float64)
+    sdfg.add_transient("buf", ["M"], dace.float64)
+    sdfg.add_transient("local", [4], dace.float64)
+
+    state = sdfg.add_state("compute")
+    state.add_mapped_tasklet(
+        "copy",
+        {"i": "0:N"},
+        {"_in": dace.Memlet("A[i]")},
+        "_out = _in",
+        {"_out": dace.Memlet("tmp[i]")},
+        external_edges=True,
+        schedule=dace.ScheduleType.CPU_Multicore,
+    )
+
+    # The transient local is accessed by the iterations of a parallel map
+    me, mx = state.add_map("scale", {"i": "0:N"}, dace.ScheduleType.CPU_Multicore)
+    tmp = state.add_read("tmp")
+    local = state.add_access("local")
+    b = state.add_write("B")
+    fill = state.add_tasklet("fill", {"_in"}, {"_out"}, "_out = 2 * _in")
+    store = state.add_tasklet("store", {"_in"}, {"_out"}, "_out = _in")
+    state.add_memlet_path(tmp, me, fill, dst_conn="_in", memlet=dace.Memlet("tmp[i]"))
+    state.add_edge(fill, "_out", local, None, dace.Memlet("local[0]"))
+    state.add_edge(local, None, store, "_in", dace.Memlet("local[0]"))
+    state.add_memlet_path(store, mx, b, src_conn="_out", memlet=dace.Memlet("B[i]"))
+
+    # The size of buf is not known at initialization
+    loop = sdfg.add_state_after(state, "loop")
+    loop.add_mapped_tasklet(
+        "init",
+        {"j": "0:M"},
+        {},
+        "_out = 0",
+        {"_out": dace.Memlet("buf[j]")},
+        external_edges=True,
+    )
+    sdfg.add_state_after(loop, "exit")
+    sdfg.edges_between(state, loop)[0].data.assignments = {"M": "2 * N"}
+
+    return sdfg
+
+
+def test_lifetimes():
+    sdfg = _sdfg()
+    lifetimes = optimize_lifetimes(sdfg)
+
+    assert lifetimes == {
+        "tmp": dace.AllocationLifetime.Persistent,
+        "buf": dace.AllocationLifetime.SDFG,
+    }
+    assert sdfg.arrays["local"].lifetime == dace.AllocationLifetime.Scope
+    sdfg.validate()
@@ -0,0 +1,273 @@
+import copy
+import dace
+
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.codegen.generator import Generator
+from scop2sdfg.codegen.openmp import (
+    apply_first_touch,
+    apply_openmp_policy,
+    bind_parallel_regions,
+    vectorize_innermost_maps,
+)
+import numpy as np
+
+from dace.codegen.codegen import generate_code
+from scop2sdfg.codegen.lifetimes import optimize_lifetimes
+
+from conftest import array, increments, jscop, statement, write
+
+
+def _jscop(domain):
+    # Two parallel loops: B = A + 1; C = B + 1
+    return increments(
+        [domain.replace("Stmt", name) for name in ["Stmt0", "Stmt1"]], params=["p_0"]
+    )
+
+
+def _generate(domain, **kwargs) -> dace.SDFG:
+    scop = Scop.from_json("policy.c", _jscop(domain))
+    assert scop.validate()
+
+    sdfg = Generator.generate(scop)
+    sdfg.openmp_sections = False
+    dace.sdfg.infer_types.infer_connector_types(sdfg)
+    dace.sdfg.infer_types.set_default_schedule_and_storage_types(sdfg, None)
+    apply_openmp_policy(sdfg, **kwargs)
+    sdfg.validate()
+    return sdfg
+
+
+def _maps(sdfg: dace.SDFG):
+    return [
+        node.map
+        for node, _ in sdfg.all_nodes_recursive()
+        if isinstance(node, dace.nodes.MapEntry)
+    ]
+
+
+def test_shared_region():
+    sdfg = _generate("[p_0] -> { Stmt[i0] : 0 <= i0 <= 1023 }", num_threads=4)
+
+    regions = [
+        map for map in _maps(sdfg) if map.schedule == dace.ScheduleType.CPU_Persistent
+    ]
+    assert len(regions) == 1
+    assert regions[0].omp_num_threads == 4
+
+    loops = [
+        map for map in _maps(sdfg) if map.schedule == dace.ScheduleType.CPU_Multicore
+    ]
+    assert len(loops) == 2
+    assert all(map.omp_schedule == dace.OMPScheduleType.Static for map in loops)
+
+
+def test_small_maps():
+    sdfg = _generate("[p_0] -> { Stmt[i0] : 0 <= i0 <= 15 }", min_iterations=64)
+    assert all(map.schedule == dace.ScheduleType.Sequential for map in _maps(sdfg))
+
+
+def test_symbolic_iterations():
+    sdfg = _generate("[p_0] -> { Stmt[i0] : 0 <= i0 < p_0 }", min_iterations=64)
+
+    # Parallel and sequential version of each map
+    maps = _maps(sdfg)
+    assert len(maps) == 4
+    assert (
+        len([map for map in maps if map.schedule == dace.ScheduleType.CPU_Multicore])
+        == 2
+    )
+
+    conditions = [edge.data.condition.as_string for edge in sdfg.edges()]
+    assert any("p_0" in condition and ">= 64" in condition for condition in conditions)
+    assert any("p_0" in condition and "< 64" in condition for condition in conditions)
+
+
+def test_imbalanced_map():
+    # for (i = 0; i < 1024; i++) for (j = 0; j <= i; j++) A[i][j] = 0.0;
+    desc = jscop(
+        [array("MemRef0", ["*", "1024"], variable="ptr %A")],
+        [
+            statement(
+                "Stmt0",
+                "{ Stmt0[i0, i1] : 0 <= i0 <= 1023 and 0 <= i1 <= i0 }",
+                [
+                    write(
+                        "{ Stmt0[i0, i1] -> MemRef0[i0, i1] }",
+                        "store double 0.000000e+00, ptr %out, align 8",
+                        "double 0.000000e+00",
+                    )
+                ],
+                loops=2,
+            )
+        ],
+        "{ Stmt0[i0, i1] -> [i0, i1] }",
+    )
+    scop = Scop.from_json("triangular.c", desc)
+    sdfg = Generator.generate(scop)
+    dace.sdfg.infer_types.infer_connector_types(sdfg)
+    dace.sdfg.infer_types.set_default_schedule_and_storage_types(sdfg, None)
+    apply_openmp_policy(sdfg)
+    sdfg.validate()
+
+    loops = [
+        map for map in _maps(sdfg) if map.schedule == dace.ScheduleType.CPU_Multicore
+    ]
+    assert len(loops) == 1
+    assert loops[0].omp_schedule == dace.OMPScheduleType.Dynamic
+
+
+def test_first_touch():
+    sdfg = _generate("[p_0] -> { Stmt[i0] : 0 <= i0 <= 1023 }")
+    sdfg.add_array("buffer", [1024], dace.float64, transient=True)
+
+    assert apply_first_touch(sdfg) == ["buffer"]
+    sdfg.validate()
+
+    assert sdfg.start_state.label == "first_touch"
+    assert sdfg.arrays["buffer"].lifetime == dace.AllocationLifetime.SDFG
+    maps = [
+        node.map
+        for node in sdfg.start_state.nodes()
+        if isinstance(node, dace.nodes.MapEntry)
+    ]
+    assert len(maps) == 1
+    assert maps[0].schedule == dace.ScheduleType.CPU_Multicore
+    assert maps[0].omp_schedule == dace.OMPScheduleType.Static
+
+
+def test_first_touch_persistent():
+    # B = 2 * A through the persistent transient tmp
+    sdfg = dace.SDFG("first_touch")
+    sdfg.add_symbol("N", dace.int64)
+    sdfg.add_array("A", ["N"], dace.float64)
+    sdfg.add_array("B", ["N"], dace.float64)
+    sdfg.add_transient("tmp", ["N"], dace.float64)
+    state = sdfg.add_state()
+    for src, dst, code in [("A", "tmp", "_out = 2 * _in"), ("tmp", "B", "_out = _in")]:
+        state.add_mapped_tasklet(
+            "scale",
+            {"i": "0:N"},
+            {"_in": dace.Memlet(f"{src}[i]")},
+            code,
+            {"_out": dace.Memlet(f"{dst}[i]")},
+            external_edges=True,
+            schedule=dace.ScheduleType.CPU_Multicore,
+        )
+    assert optimize_lifetimes(sdfg) == {"tmp": dace.AllocationLifetime.Persistent}
+
+    # Touched once in __dace_init
+    assert apply_first_touch(sdfg) == ["tmp"]
+    sdfg.validate()
+    assert sdfg.number_of_nodes() == 1
+    assert sdfg.arrays["tmp"].lifetime == dace.AllocationLifetime.Persistent
+    tasklet = next(
+        node
+        for node in sdfg.start_state.nodes()
+        if isinstance(node, dace.nodes.Tasklet) and node.label == "first_touch_tmp"
+    )
+    assert "__state->__0_tmp[__i] = 0;" in tasklet.code_init.as_string
+
+    A = np.arange(64, dtype=np.float64)
+    B = np.zeros(64)
+    sdfg(A=A, B=B, N=64)
+    assert np.allclose(B, 2 * A)
+
+
+def test_shared_region_copies():
+    # Two adjacent parallel states: B = A; C = B and a copy D = A
+    sdfg = dace.SDFG("copies")
+    for name in "ABCD":
+        sdfg.add_array(name, [1024], dace.float64)
+    state = sdfg.add_state()
+    for k, (src, dst) in enumerate([("A", "B"), ("B", "C")]):
+        if k > 0:
+            state = sdfg.add_state_after(state)
+        state.add_mapped_tasklet(
+            "copy",
+            {"i": "0:1024"},
+            {"_in": dace.Memlet(f"{src}[i]")},
+            "_out = _in",
+            {"_out": dace.Memlet(f"{dst}[i]")},
+            external_edges=True,
+            schedule=dace.ScheduleType.CPU_Multicore,
+        )
+    shared = copy.deepcopy(sdfg)
+    apply_openmp_policy(shared)
+    assert any(
+        map.schedule == dace.ScheduleType.CPU_Persistent for map in _maps(shared)
+    )
+
+    # The copy would be executed by all threads of a shared region
+    state.add_nedge(state.add_read("A"), state.add_write("D"), dace.Memlet("A[0:1024]"))
+    apply_openmp_policy(sdfg)
+    assert not any(
+        map.schedule == dace.ScheduleType.CPU_Persistent for map in _maps(sdfg)
+    )
+
+
+def test_proc_bind():
+    code = "#pragma omp parallel for schedule(static)\n#pragma omp for\n#pragma omp parallel num_threads(4)"
+    assert bind_parallel_regions(code, "spread") == (
+        "#pragma omp parallel for proc_bind(spread) schedule(static)\n"
+        + "#pragma omp for\n"
+        + "#pragma omp parallel proc_bind(spread) num_threads(4)"
+    )
+
+
+def _vectorize(schedule, params=("i", "j"), wcr=None) -> str:
+    # B[i, j] = A[i, j], whose iterations are independent without wcr
+    sdfg = dace.SDFG("simd")
+    sdfg.add_array("A", [32, 32], dace.float64, alignment=64)
+    sdfg.add_array("B", [32, 32], dace.float64)
+    state = sdfg.add_state()
+    state.add_mapped_tasklet(
+        "copy",
+        {param: "0:32" for param in params},
+        inputs={"_a": dace.Memlet(f"A[i, {params[-1]}]")},
+        code="_b = _a",
+        outputs={
+            "_b": dace.Memlet("B[i, 0]" if wcr else f"B[i, {params[-1]}]", wcr=wcr)
+        },
+        schedule=schedule,
+        external_edges=True,
+    )
+    code = vectorize_innermost_maps(generate_code(sdfg)[0].code, sdfg)
+    return [line.strip() for line in code.split("\n")]
+
+
+def _loop(lines, param) -> int:
+    return next(
+        i for i, line in enumerate(lines) if line.startswith(f"for (auto {param} ")
+    )
+
+
+def test_simd_innermost_loop():
+    lines = _vectorize(dace.ScheduleType.Sequential)
+
+    inner = _loop(lines, "j")
+    assert lines[inner - 1].startswith("#pragma omp simd aligned(A: 64)")
+    assert _loop(lines, "i") == inner - 2
+
+
+def test_simd_parallel_loop():
+    lines = _vectorize(dace.ScheduleType.CPU_Multicore)
+    inner = _loop(lines, "j")
+    assert lines[inner - 1].startswith("#pragma omp simd aligned(A: 64)")
+    assert lines[inner - 3].startswith("#pragma omp parallel for ")
+
+    # A single loop is work-shared and vectorized
+    lines = _vectorize(dace.ScheduleType.CPU_Multicore, params=("i",))
+    loop = _loop(lines, "i")
+    assert lines[loop - 1].startswith("#pragma omp parallel for simd aligned(A: 64)")
+
+
+def test_simd_wcr():
+    lines = _vectorize(dace.ScheduleType.Sequential, wcr="lambda a, b: a + b")
+    assert not any(line.startswith("#pragma omp simd") for line in lines)
+
+
+def test_proc_bind_simd():
+    code = "#pragma omp parallel for simd aligned(A: 64)"
+    assert bind_parallel_regions(code, "close") == (
+        "#pragma omp parallel for simd proc_bind(close) aligned(A: 64)"
+    )
@@ -0,0 +1,268 @@
+import dace
+import pytest
+
+from dace.libraries.blas import Dot, Gemm, Gemv
+from dace.libraries.blas.environments import OpenBLAS
+from dace.libraries.standard import Transpose
+
+import scop2sdfg.codegen.patterns.blas as blas
+
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.codegen.generator import Generator
+from scop2sdfg.codegen.patterns import BlasKernel
+
+from conftest import array, jscop, read, statement, write
+
+
+def _jscop(sizes, arrays, reads, output, instructions, carried=None):
+    iterators = [f"i{d}" for d in range(len(sizes))]
+    tuple_ = "Stmt0[" + ", ".join(iterators) + "]"
+    domain = " and ".join(
+        f"0 <= {it} <= {size - 1}" for it, size in zip(iterators, sizes)
+    )
+
+    dependencies = "{  }"
+    if carried is not None:
+        target = list(iterators)
+        target[carried] = "1 + " + target[carried]
+        constraints = [
+            f"0 <= {it} <= {size - 1 if d != carried else size - 2}"
+            for d, (it, size) in enumerate(zip(iterators, sizes))
+        ]
+        dependencies = (
+            "{ "
+            + tuple_
+            + " -> Stmt0["
+            + ", ".join(target)
+            + "] : "
+            + " and ".join(constraints)
+            + " }"
+        )
+
+    accesses = [
+        read(
+            "{ " + tuple_ + " -> " + memref + "[" + index + "] }",
+            f"{ref} = load double, ptr %ptr{ref[1:]}, align 8",
+        )
+        for ref, memref, index in reads
+    ]
+    memref, index, incoming_value = output
+    accesses.append(
+        write(
+            "{ " + tuple_ + " -> " + memref + "[" + index + "] }",
+            "store double %res, ptr %out, align 8",
+            incoming_value,
+        )
+    )
+
+    return jscop(
+        [
+            array(name, ["*"] + [str(size) for size in shape[1:]])
+            for name, shape in arrays.items()
+        ],
+        [
+            statement(
+                "Stmt0", "{ " + tuple_ + " : " + domain + " }", accesses, len(sizes)
+            )
+        ],
+        "{ " + tuple_ + " -> [" + ", ".join(iterators) + "] }",
+        instructions=instructions,
+        dependencies=dependencies,
+    )
+
+
+@pytest.fixture
+def openblas(monkeypatch):
+    # Library nodes are only emitted if a BLAS library implements them
+    monkeypatch.setattr(
+        blas, "_is_installed", lambda environment: environment is OpenBLAS
+    )
+
+
+def _library_nodes(sdfg: dace.SDFG):
+    return [
+        node
+        for node, _ in sdfg.all_nodes_recursive()
+        if isinstance(node, dace.nodes.LibraryNode)
+    ]
+
+
+def test_gemm(openblas):
+    desc = _jscop(
+        [32, 32, 32],
+        {"MemRef0": [32, 32], "MemRef1": [32, 32], "MemRef2": [32, 32]},
+        [
+            ("%0", "MemRef2", "i0, i1"),
+            ("%1", "MemRef0", "i0, i2"),
+            ("%2", "MemRef1", "i2, i1"),
+        ],
+        ("MemRef2", "i0, i1", "%add = fadd double %0, %mul"),
+        ["%mul = fmul double %1, %2", "%add = fadd double %0, %mul"],
+        carried=2,
+    )
+    scop = Scop.from_json("gemm.c", desc)
+    assert scop.validate()
+
+    sdfg = Generator.generate(scop, library_nodes=True)
+    sdfg.validate()
+
+    nodes = _library_nodes(sdfg)
+    assert len(nodes) == 1
+    assert isinstance(nodes[0], Gemm)
+    assert not nodes[0].transA
+    assert not nodes[0].transB
+    assert nodes[0].beta == 1
+
+    sdfg = Generator.generate(scop, library_nodes=False)
+    assert len(_library_nodes(sdfg)) == 0
+
+
+def test_gemm_without_blas(monkeypatch):
+    desc = _jscop(
+        [32, 32, 32],
+        {"MemRef0": [32, 32], "MemRef1": [32, 32], "MemRef2": [32, 32]},
+        [
+            ("%0", "MemRef2", "i0, i1"),
+            ("%1", "MemRef0", "i0, i2"),
+            ("%2", "MemRef1", "i2, i1"),
+        ],
+        ("MemRef2", "i0, i1", "%add = fadd double %0, %mul"),
+        ["%mul = fmul double %1, %2", "%add = fadd double %0, %mul"],
+        carried=2,
+    )
+    scop = Scop.from_json("gemm.c", desc)
+
+    # The pure expansion is slower than the loop nest
+    monkeypatch.setattr(blas, "_is_installed", lambda environment: False)
+    sdfg = Generator.generate(scop, library_nodes=True)
+    sdfg.validate()
+    for node in _library_nodes(sdfg):
+        assert not isinstance(node, (Gemm, Gemv, Dot))
+
+
+def test_gemm_fmuladd_alpha(openblas):
+    desc = _jscop(
+        [32, 32, 32],
+        {"MemRef0": [32, 32], "MemRef1": [32, 32], "MemRef2": [32, 32]},
+        [
+            ("%0", "MemRef2", "i0, i1"),
+            ("%1", "MemRef0", "i2, i0"),
+            ("%2", "MemRef1", "i2, i1"),
+        ],
+        (
+            "MemRef2",
+            "i0, i1",
+            "%add = call double @llvm.fmuladd.f64(double %mul, double %2, double %0)",
+        ),
+        [
+            "%mul = fmul double %1, 1.500000e+00",
+            "%add = call double @llvm.fmuladd.f64(double %mul, double %2, double %0)",
+        ],
+        carried=2,
+    )
+    scop = Scop.from_json("gemm.c", desc)
+    sdfg = Generator.generate(scop, library_nodes=True)
+    sdfg.validate()
+
+    nodes = _library_nodes(sdfg)
+    assert len(nodes) == 1
+    assert isinstance(nodes[0], Gemm)
+    assert nodes[0].transA
+    assert not nodes[0].transB
+    assert nodes[0].alpha == 1.5
+
+
+def test_gemv_transposed(openblas):
+    desc = _jscop(
+        [32, 32],
+        {"MemRef0": [32, 32], "MemRef1": [32], "MemRef2": [32]},
+        [("%0", "MemRef2", "i0"), ("%1", "MemRef0", "i1, i0"), ("%2", "MemRef1", "i1")],
+        ("MemRef2", "i0", "%add = fadd double %0, %mul"),
+        ["%mul = fmul double %1, %2", "%add = fadd double %0, %mul"],
+        carried=1,
+    )
+    scop = Scop.from_json("gemv.c", desc)
+    sdfg = Generator.generate(scop, library_nodes=True)
+    sdfg.validate()
+
+    nodes = _library_nodes(sdfg)
+    assert len(nodes) == 1
+    assert isinstance(nodes[0], Gemv)
+    assert nodes[0].transA
+
+
+def test_dot(openblas):
+    desc = _jscop(
+        [32],
+        {"MemRef0": [32], "MemRef1": [32], "MemRef2": [4]},
+        [("%0", "MemRef2", "3"), ("%1", "MemRef0", "i0"), ("%2", "MemRef1", "i0")],
+        ("MemRef2", "3", "%add = fadd double %0, %mul"),
+        ["%mul = fmul double %1, %2", "%add = fadd double %0, %mul"],
+        carried=0,
+    )
+    scop = Scop.from_json("dot.c", desc)
+    sdfg = Generator.generate(scop, library_nodes=True)
+    sdfg.validate()
+
+    nodes = _library_nodes(sdfg)
+    assert len(nodes) == 1
+    assert isinstance(nodes[0], Dot)
+
+
+def test_axpy(openblas):
+    desc = _jscop(
+        [32],
+        {"MemRef0": [32], "MemRef2": [32]},
+        [("%0", "MemRef2", "i0"), ("%1", "MemRef0", "i0")],
+        ("MemRef2", "i0", "%add = fadd double %mul, %0"),
+        ["%mul = fmul double 2.000000e+00, %1", "%add = fadd double %mul, %0"],
+    )
+    scop = Scop.from_json("axpy.c", desc)
+    assert BlasKernel.match(scop.ast, scop) is None
+
+    # Only the pure expansion of axpy exists, the loop nest is kept
+    sdfg = Generator.generate(scop, library_nodes=True)
+    sdfg.validate()
+    assert len(_library_nodes(sdfg)) == 0
+    assert any(
+        isinstance(node, dace.nodes.MapEntry) for node, _ in sdfg.all_nodes_recursive()
+    )
+
+
+def test_transpose(openblas):
+    desc = _jscop(
+        [32, 32],
+        {"MemRef0": [32, 32], "MemRef2": [32, 32]},
+        [("%1", "MemRef0", "i0, i1")],
+        ("MemRef2", "i1, i0", "%1 = load double, ptr %ptr1, align 8"),
+        [],
+    )
+    scop = Scop.from_json("transpose.c", desc)
+    sdfg = Generator.generate(scop, library_nodes=True)
+    sdfg.validate()
+
+    nodes = _library_nodes(sdfg)
+    assert len(nodes) == 1
+    assert isinstance(nodes[0], Transpose)
+
+
+def test_no_match(openblas):
+    # C[i, j] = C[i, j] + A[i, k] * B[j, j] is not a matrix multiplication
+    desc = _jscop(
+        [32, 32, 32],
+        {"MemRef0": [32, 32], "MemRef1": [32, 32], "MemRef2": [32, 32]},
+        [
+            ("%0", "MemRef2", "i0, i1"),
+            ("%1", "MemRef0", "i0, i2"),
+            ("%2", "MemRef1", "i1, i1"),
+        ],
+        ("MemRef2", "i0, i1", "%add = fadd double %0, %mul"),
+        ["%mul = fmul double %1, %2", "%add = fadd double %0, %mul"],
+        carried=2,
+    )
+    scop = Scop.from_json("gemm.c", desc)
+    sdfg = Generator.generate(scop, library_nodes=True)
+    sdfg.validate()
+
+    for node in _library_nodes(sdfg):
+        assert not isinstance(node, (Gemm, Gemv, Dot))
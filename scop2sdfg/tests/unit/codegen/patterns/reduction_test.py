@@ -0,0 +1,237 @@
+import dace
+
+from dace.libraries.standard import Reduce
+
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.codegen.generator import Generator
+
+from conftest import array, jscop, read, statement, write
+
+
+def _jscop(instruction, reads):
+    # s = 2.0; for (i = 0; i < 64; i++) s = op(s, ...); B[0] = s;
+    phi = "%s = phi double [ 2.000000e+00, %entry ], [ %add, %for.body ]"
+    lcssa = "%add.lcssa = phi double [ %add, %for.body ]"
+
+    accesses = [read("{ Stmt1[i0] -> MemRef1[] }", phi)]
+    for ref, memref in reads:
+        accesses.append(
+            read(
+                "{ Stmt1[i0] -> " + memref + "[i0] }",
+                f"{ref} = load double, ptr %ptr{ref[1:]}, align 8",
+            )
+        )
+    accesses.append(
+        write(
+            "{ Stmt1[i0] -> MemRef1[] }",
+            "br i1 %exitcond, label %for.end, label %for.body",
+            instruction,
+        )
+    )
+    accesses.append(write("{ Stmt1[i0] -> MemRef2[] }", instruction, instruction))
+
+    carried = "Stmt1[i0] -> Stmt1[1 + i0] : 0 <= i0 <= 62"
+    return jscop(
+        [
+            array("MemRef0", variable="ptr %A"),
+            array("MemRef1", [], kind="phi", variable=phi),
+            array("MemRef2", [], kind="value", variable=lcssa),
+            array("MemRef3", variable="ptr %B"),
+        ],
+        [
+            statement(
+                "Stmt0",
+                "{ Stmt0[] }",
+                [
+                    write(
+                        "{ Stmt0[] -> MemRef1[] }",
+                        "br label %for.body",
+                        "double 2.000000e+00",
+                    )
+                ],
+                loops=0,
+            ),
+            statement("Stmt1", "{ Stmt1[i0] : 0 <= i0 <= 63 }", accesses),
+            statement(
+                "Stmt2",
+                "{ Stmt2[] }",
+                [
+                    read(
+                        "{ Stmt2[] -> MemRef2[] }",
+                        "store double %add.lcssa, ptr %B, align 8",
+                    ),
+                    write(
+                        "{ Stmt2[] -> MemRef3[0] }",
+                        "store double %add.lcssa, ptr %B, align 8",
+                        lcssa,
+                    ),
+                ],
+                loops=0,
+            ),
+        ],
+        "{ Stmt0[] -> [0, 0]; Stmt1[i0] -> [1, i0]; Stmt2[] -> [2, 0] }",
+        instructions=[instruction],
+        dependencies={
+            "RAW": "{ " + carried + "; Stmt0[] -> Stmt1[0]; Stmt1[63] -> Stmt2[] }",
+            "WAR": "{ " + carried + " }",
+            "WAW": "{ " + carried + "; Stmt0[] -> Stmt1[0] }",
+        },
+        name="%entry.split---%for.end",
+    )
+
+
+def _reductions(sdfg: dace.SDFG):
+    return [
+        (node, state)
+        for node, state in sdfg.all_nodes_recursive()
+        if isinstance(node, Reduce)
+    ]
+
+
+def _reduction_tasklets(sdfg: dace.SDFG):
+    return [
+        node
+        for node, _ in sdfg.all_nodes_recursive()
+        if isinstance(node, dace.nodes.Tasklet) and node.label == "reduction"
+    ]
+
+
+def test_sum():
+    desc = _jscop("%add = fadd double %s, %0", [("%0", "MemRef0")])
+    scop = Scop.from_json("sum.c", desc)
+    assert scop.validate()
+
+    sdfg = Generator.generate(scop, reductions=True)
+    sdfg.validate()
+
+    reductions = _reductions(sdfg)
+    assert len(reductions) == 1
+
+    node, state = reductions[0]
+    assert node.wcr == "lambda a, b: a + b"
+    assert node.identity is None
+    assert node.implementation == "OpenMP"
+
+    # The array is reduced in place
+    (operand,) = state.in_edges(node)
+    assert operand.data.data == "MemRef0"
+    assert str(operand.data.subset) == "0:64"
+
+    (result,) = state.out_edges(node)
+    assert result.data.data == "MemRef1"
+    assert set(edge.dst.data for edge in state.out_edges(result.dst)) == {"MemRef2"}
+
+    # The accumulation carries a dependence and remains a loop
+    sdfg = Generator.generate(scop, reductions=False)
+    assert len(_reductions(sdfg)) == 0
+    assert not any(
+        isinstance(node, dace.nodes.MapEntry) for node, _ in sdfg.all_nodes_recursive()
+    )
+
+
+def test_sum_strided():
+    # s += A[2 * i] reads every other element
+    desc = _jscop("%add = fadd double %s, %0", [("%0", "MemRef0")])
+    desc["statements"][1]["accesses"][1]["relation"] = "{ Stmt1[i0] -> MemRef0[2i0] }"
+    scop = Scop.from_json("sum.c", desc)
+    sdfg = Generator.generate(scop, reductions=True)
+    sdfg.validate()
+
+    # The operands are accumulated by an OpenMP reduction, not by a conflict resolution
+    assert len(_reductions(sdfg)) == 0
+    (tasklet,) = _reduction_tasklets(sdfg)
+    assert "#pragma omp simd reduction(+: _acc)" in tasklet.code.as_string
+    assert "_MemRef0[(2*c1)]" in tasklet.code.as_string
+
+
+def test_max():
+    desc = _jscop(
+        "%add = call double @llvm.maxnum.f64(double %s, double %0)",
+        [("%0", "MemRef0")],
+    )
+    scop = Scop.from_json("max.c", desc)
+    sdfg = Generator.generate(scop, reductions=True)
+    sdfg.validate()
+
+    reductions = _reductions(sdfg)
+    assert len(reductions) == 1
+    assert reductions[0][0].wcr == "lambda a, b: max(a, b)"
+
+
+def test_fmuladd():
+    desc = _jscop(
+        "%add = call double @llvm.fmuladd.f64(double %0, double %1, double %s)",
+        [("%0", "MemRef0"), ("%1", "MemRef3")],
+    )
+    scop = Scop.from_json("dot.c", desc)
+    sdfg = Generator.generate(scop, reductions=True)
+    sdfg.validate()
+
+    # The products are accumulated without buffering them
+    assert len(_reductions(sdfg)) == 0
+    assert not any(
+        desc.transient and desc.shape != (1,) for desc in sdfg.arrays.values()
+    )
+    assert not any(
+        edge.data.wcr is not None for state in sdfg.states() for edge in state.edges()
+    )
+
+    (tasklet,) = _reduction_tasklets(sdfg)
+    code = tasklet.code.as_string
+    assert "#pragma omp parallel" not in code
+    assert "#pragma omp simd reduction(+: _acc)" in code
+    assert "(_MemRef0[c1]) * (_MemRef3[c1])" in code
+
+    # The outermost loop is parallel on multicores
+    sdfg = Generator.generate(scop, reductions=True, parallel_reductions=True)
+    (tasklet,) = _reduction_tasklets(sdfg)
+    assert "#pragma omp parallel for simd reduction(+: _acc)" in tasklet.code.as_string
+
+
+def test_no_match():
+    # s = s - A[i] is not commutative
+    desc = _jscop("%add = fsub double %s, %0", [("%0", "MemRef0")])
+    scop = Scop.from_json("sub.c", desc)
+    sdfg = Generator.generate(scop, reductions=True)
+    sdfg.validate()
+
+    assert len(_reductions(sdfg)) == 0
+
+
+def test_array_accumulator():
+    # for (i = 0; i < 64; i++) C[0] += A[i] is left to the scalar replacement
+    carried = "{ Stmt0[i0] -> Stmt0[1 + i0] : 0 <= i0 <= 62 }"
+    desc = jscop(
+        [array("MemRef0", variable="ptr %A"), array("MemRef1", variable="ptr %C")],
+        [
+            statement(
+                "Stmt0",
+                "{ Stmt0[i0] : 0 <= i0 <= 63 }",
+                [
+                    read(
+                        "{ Stmt0[i0] -> MemRef1[0] }",
+                        "%c = load double, ptr %C, align 8",
+                    ),
+                    read(
+                        "{ Stmt0[i0] -> MemRef0[i0] }",
+                        "%a = load double, ptr %pa, align 8",
+                    ),
+                    write(
+                        "{ Stmt0[i0] -> MemRef1[0] }",
+                        "store double %add, ptr %C, align 8",
+                        "%add = fadd double %c, %a",
+                    ),
+                ],
+            )
+        ],
+        "{ Stmt0[i0] -> [i0] }",
+        instructions=["%add = fadd double %c, %a"],
+        dependencies=carried,
+    )
+    scop = Scop.from_json("acc.c", desc)
+    sdfg = Generator.generate(scop, reductions=True, scalar_replacement=True)
+    sdfg.validate()
+
+    assert len(_reductions(sdfg)) == 0
+    assert len(_reduction_tasklets(sdfg)) == 0
+    assert any(name.startswith("reg_MemRef1") for name in sdfg.arrays)
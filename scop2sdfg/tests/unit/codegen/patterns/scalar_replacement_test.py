@@ -0,0 +1,127 @@
+import dace
+
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.codegen.generator import Generator
+from scop2sdfg.codegen.patterns import invariant_elements
+
+from conftest import array, jscop, read, statement, write
+
+
+def _jscop(domain, reads, output, instructions, dependencies):
+    accesses = [
+        read(
+            "{ Stmt0[i0, i1] -> " + memref + "[" + index + "] }",
+            f"{ref} = load double, ptr %ptr{ref[1:]}, align 8",
+        )
+        for ref, memref, index in reads
+    ]
+    memref, index, incoming_value = output
+    accesses.append(
+        write(
+            "{ Stmt0[i0, i1] -> " + memref + "[" + index + "] }",
+            "store double %res, ptr %out, align 8",
+            incoming_value,
+        )
+    )
+
+    return jscop(
+        [array(name, ["*", "32"]) for name in ["MemRef0", "MemRef1", "MemRef2"]],
+        [statement("Stmt0", domain, accesses, loops=2)],
+        "{ Stmt0[i0, i1] -> [i0, i1] }",
+        instructions=instructions,
+        dependencies=dependencies,
+    )
+
+
+def _registers(sdfg: dace.SDFG):
+    return [
+        name
+        for nsdfg in sdfg.all_sdfgs_recursive()
+        for name in nsdfg.arrays
+        if name.startswith("reg_")
+    ]
+
+
+def test_invariant_accumulator():
+    # C[i, 0] = C[i, 0] + A[i, j] * B[j, i]
+    desc = _jscop(
+        "{ Stmt0[i0, i1] : 0 <= i0 <= 31 and 0 <= i1 <= 31 }",
+        [
+            ("%0", "MemRef2", "i0, 0"),
+            ("%1", "MemRef0", "i0, i1"),
+            ("%2", "MemRef1", "i1, i0"),
+        ],
+        ("MemRef2", "i0, 0", "%add = fadd double %0, %mul"),
+        ["%mul = fmul double %1, %2", "%add = fadd double %0, %mul"],
+        "{ Stmt0[i0, i1] -> Stmt0[i0, 1 + i1] : 0 <= i0 <= 31 and 0 <= i1 <= 30 }",
+    )
+    scop = Scop.from_json("accumulate.c", desc)
+
+    elements = invariant_elements(scop.ast.for_get_body(), scop)
+    assert len(elements) == 1
+    assert elements[0].array == "MemRef2"
+    assert elements[0].written
+
+    sdfg = Generator.generate(scop, scalar_replacement=True)
+    sdfg.validate()
+    assert _registers(sdfg) == ["reg_MemRef2"]
+
+    sdfg = Generator.generate(scop, scalar_replacement=False)
+    assert _registers(sdfg) == []
+
+
+def test_invariant_read():
+    # B[i, j] = A[i, 0] + B[i, j] is not invariant in B
+    desc = _jscop(
+        "{ Stmt0[i0, i1] : 0 <= i0 <= 31 and 0 <= i1 <= 31 }",
+        [("%0", "MemRef0", "i0, 0"), ("%1", "MemRef1", "i0, i1")],
+        ("MemRef1", "i0, i1", "%add = fadd double %0, %1"),
+        ["%add = fadd double %0, %1"],
+        "{ Stmt0[i0, i1] -> Stmt0[1 + i0, i1] : 0 <= i0 <= 30 and 0 <= i1 <= 31 }",
+    )
+    scop = Scop.from_json("broadcast.c", desc)
+
+    # The inner loop is parallel
+    elements = invariant_elements(scop.ast, scop)
+    assert len(elements) == 0
+
+    elements = invariant_elements(scop.ast.for_get_body(), scop)
+    assert [element.array for element in elements] == ["MemRef0"]
+    assert not elements[0].written
+
+
+def test_varying_element():
+    # C[i, 0] and C[i, 1] are accessed by the inner loop
+    desc = _jscop(
+        "{ Stmt0[i0, i1] : 0 <= i0 <= 31 and 0 <= i1 <= 31 }",
+        [("%0", "MemRef2", "i0, 0"), ("%1", "MemRef0", "i0, i1")],
+        ("MemRef2", "i0, 0", "%add = fadd double %0, %1"),
+        ["%add = fadd double %0, %1"],
+        "{ Stmt0[i0, i1] -> Stmt0[i0, 1 + i1] : 0 <= i0 <= 31 and 0 <= i1 <= 30 }",
+    )
+    desc["statements"][0]["accesses"][0]["relation"] = (
+        "{ Stmt0[i0, i1] -> MemRef2[i0, 0] : i1 <= 15; "
+        + "Stmt0[i0, i1] -> MemRef2[i0, 1] : i1 >= 16 }"
+    )
+    scop = Scop.from_json("varying.c", desc)
+
+    elements = invariant_elements(scop.ast.for_get_body(), scop)
+    assert len(elements) == 0
+
+
+def test_partial_execution():
+    # A[i, 0] is not accessed by the executions of the inner loop with i > 15
+    desc = _jscop(
+        "{ Stmt0[i0, i1] : 0 <= i0 <= 31 and 0 <= i1 <= 31 }",
+        [("%0", "MemRef0", "i0, 0"), ("%1", "MemRef1", "i0, i1")],
+        ("MemRef1", "i0, i1", "%add = fadd double %0, %1"),
+        ["%add = fadd double %0, %1"],
+        "{ Stmt0[i0, i1] -> Stmt0[i0, 1 + i1] : 0 <= i0 <= 31 and 0 <= i1 <= 30 }",
+    )
+    desc["statements"][0]["accesses"][0][
+        "relation"
+    ] = "{ Stmt0[i0, i1] -> MemRef0[i0, 0] : i0 <= 15 }"
+    scop = Scop.from_json("partial.c", desc)
+
+    elements = invariant_elements(scop.ast.for_get_body(), scop)
+    assert len(elements) == 0
@@ -0,0 +1,117 @@
+import os
+import sys
+import json
+import dace
+import subprocess
+import numpy as np
+
+from dace.codegen import compiler
+from dace.codegen.codegen import generate_code
+from dace.sdfg.utils import load_precompiled_sdfg
+
+from scop2sdfg.codegen.profiling import (
+    dormant_instrumentation,
+    hot_maps,
+    instrument,
+    instrument_code,
+    load_profile,
+)
+
+
+def _sdfg() -> dace.SDFG:
+    N = dace.symbol("N")
+    sdfg = dace.SDFG("profiling")
+    sdfg.add_array("A", [N], dace.float64)
+
+    state = sdfg.add_state("compute")
+    state.add_mapped_tasklet(
+        "scale",
+        {"i": "0:N"},
+        {"_in": dace.Memlet("A[i]")},
+        "_out = 2 * _in",
+        {"_out": dace.Memlet("A[i]")},
+        external_edges=True,
+    )
+    return sdfg
+
+
+def _compile(sdfg: dace.SDFG, rewrite) -> str:
+    instrument(sdfg)
+    with dace.config.set_temporary(
+        "instrumentation", "report_each_invocation", value=False
+    ):
+        code_objects = generate_code(sdfg)
+    for obj in code_objects:
+        obj.code = rewrite(obj.code)
+
+    folder = compiler.generate_program_folder(sdfg, code_objects, sdfg.build_folder)
+    compiler.configure_and_compile(folder, sdfg.name)
+    return folder
+
+
+def test_profile(tmp_path):
+    sdfg = _sdfg()
+    sdfg.build_folder = str(tmp_path / "build")
+
+    profile_folder = tmp_path / "profile"
+    (profile_folder / sdfg.name).mkdir(parents=True)
+    folder = _compile(
+        sdfg, lambda code: instrument_code(code, sdfg, profile_folder / sdfg.name)
+    )
+
+    # The report is written when the program exits
+    program = load_precompiled_sdfg(folder)
+    for n in [1024, 1024, 16]:
+        A = np.ones(n)
+        program(A=A, N=n)
+        assert np.allclose(A, 2.0)
+    program.finalize()
+
+    profile = load_profile(profile_folder, sdfg.name)
+    assert profile["calls"] == 3
+    assert profile["time"] >= 0
+    assert list(profile["states"].keys()) == ["compute"]
+    assert list(profile["maps"].keys()) == ["scale_map"]
+    assert profile["symbols"]["N"] == {"value": 1024, "share": 2 / 3}
+
+    assert load_profile(profile_folder, "other") is None
+
+
+def test_dormant_instrumentation(tmp_path):
+    sdfg = _sdfg()
+    sdfg.build_folder = str(tmp_path / "build")
+    folder = _compile(sdfg, lambda code: dormant_instrumentation(code, sdfg))
+
+    # The counters are written at the exit of the program
+    program = (
+        "import numpy as np\n"
+        + "from dace.sdfg.utils import load_precompiled_sdfg\n"
+        + f"program = load_precompiled_sdfg({folder!r})\n"
+        + "for _ in range(2):\n"
+        + "    program(A=np.ones(64), N=64)\n"
+    )
+    output = tmp_path / "out.json"
+
+    env = {key: value for key, value in os.environ.items() if key != "DAISY_PROFILE"}
+    subprocess.run([sys.executable, "-c", program], env=env, check=True)
+    assert not output.exists()
+
+    env["DAISY_PROFILE"] = str(output)
+    env["DAISY_PROFILE_COUNTERS"] = "cycles,instructions"
+    subprocess.run([sys.executable, "-c", program], env=env, check=True)
+    subprocess.run([sys.executable, "-c", program], env=env, check=True)
+
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert len(lines) == 2
+    for line in lines:
+        assert line["sdfg"] == sdfg.name
+        assert line["events"]["SDFG profiling"]["calls"] == 2
+        assert line["events"]["State compute"]["calls"] == 2
+        assert line["events"]["Map scale_map"]["calls"] == 2
+        assert set(line["counters"]).issubset({"cycles", "instructions"})
+
+
+def test_hot_maps():
+    profile = {"time": 100.0, "maps": {"hot": 60.0, "warm": 5.0, "cold": 0.1}}
+    assert hot_maps(profile) == {"hot", "warm"}
+    assert hot_maps(profile, min_share=0.5) == {"hot"}
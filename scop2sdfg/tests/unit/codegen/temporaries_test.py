@@ -0,0 +1,67 @@
+import dace
+
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.codegen.generator import Generator
+
+from conftest import array, jscop, read, statement, write
+
+
+def _statement(name, position):
+    # B[i][position] = A[i] + A[i] * A[i]
+    return statement(
+        name,
+        "{ " + name + "[i0] : 0 <= i0 <= 31 }",
+        [
+            read(
+                "{ " + name + "[i0] -> MemRef0[i0] }",
+                f"%a{position} = load double, ptr %pa, align 8",
+            ),
+            write(
+                "{ " + name + f"[i0] -> MemRef1[i0, {position}] }}",
+                f"store double %add{position}, ptr %pb{position}, align 8",
+                f"%add{position} = fadd double %a{position}, %mul{position}",
+            ),
+        ],
+    )
+
+
+def _jscop(statements):
+    instructions = []
+    for i in range(statements):
+        instructions.append(f"%mul{i} = fmul double %a{i}, %a{i}")
+        instructions.append(f"%add{i} = fadd double %a{i}, %mul{i}")
+
+    return jscop(
+        [
+            array("MemRef0", variable="ptr %A"),
+            array("MemRef1", ["*", str(statements)], variable="ptr %B"),
+        ],
+        [_statement(f"Stmt{i}", i) for i in range(statements)],
+        "{ " + "; ".join(f"Stmt{i}[i0] -> [i0, {i}]" for i in range(statements)) + " }",
+        instructions=instructions,
+    )
+
+
+def _temporaries(sdfg: dace.SDFG):
+    return [
+        name
+        for nsdfg in sdfg.all_sdfgs_recursive()
+        for name, desc in nsdfg.arrays.items()
+        if desc.transient and isinstance(desc, dace.data.Scalar)
+    ]
+
+
+def test_shared_by_statements():
+    scop = Scop.from_json("unrolled.c", _jscop(1))
+    assert scop.validate()
+    sdfg = Generator.generate(scop)
+    sdfg.validate()
+    temporaries = _temporaries(sdfg)
+    assert temporaries
+
+    # The number of scalars does not grow with the number of statements
+    scop = Scop.from_json("unrolled.c", _jscop(8))
+    assert scop.validate()
+    sdfg = Generator.generate(scop)
+    sdfg.validate()
+    assert len(_temporaries(sdfg)) == len(temporaries)
@@ -0,0 +1,46 @@
+import pytest
+
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.codegen.generator import Generator
+
+from conftest import array, jscop, statement, write
+
+
+def _jscop(param):
+    # for (t = 0; t < param; t++) for (i = 0; i < 16; i++) A[t][i] = 0;
+    return jscop(
+        [array("MemRef0", ["*", "*"], variable="ptr %A")],
+        [
+            statement(
+                "Stmt0",
+                f"[{param}] -> {{ Stmt0[i0, i1] : 0 <= i0 < {param} and 0 <= i1 <= 15 }}",
+                [
+                    write(
+                        f"[{param}] -> {{ Stmt0[i0, i1] -> MemRef0[i0, i1] }}",
+                        "store double 0.000000e+00, ptr %out, align 8",
+                        "double 0.000000e+00",
+                    )
+                ],
+                loops=2,
+            )
+        ],
+        f"[{param}] -> {{ Stmt0[i0, i1] -> [i0, i1] }}",
+        params=[param],
+        name="%for.cond---%for.end",
+    )
+
+
+@pytest.mark.parametrize("param", ["n", "tsteps"])
+def test_symbolic_sizes(param):
+    # tsteps sorts after the size symbol
+    scop = Scop.from_json("init.c", _jscop(param))
+    sdfg = Generator.generate(scop)
+
+    # As the parametric mode of the CLI
+    leading, inner = map(str, scop._memrefs["MemRef0"].shape)
+    sdfg.replace_dict({leading: param, inner: "size_MemRef0_1"})
+    assert set(sdfg.free_symbols) == {param, "size_MemRef0_1"}
+
+    Generator.validate(sdfg, scop, sizes=["size_MemRef0_1"])
+    with pytest.raises(AssertionError):
+        Generator.validate(sdfg, scop)
@@ -75,3 +75,29 @@ def test_load_2d_with_constant():
     array = dace.data.Array(dace.float64, shape=[32, 256])
     memlet: dace.Memlet = indirection.memlet(array)
     assert str(memlet) == "MemRef1[10, 0:256]"
+
+
+def test_store_1d():
+    arguments = [UndefinedValue("%11", "i64")]
+    indirection = Indirection(
+        "%13",
+        "double",
+        "write",
+        "  store double %10, ptr %9, align 8, !tbaa !9",
+        "%10",
+        "MemRef1",
+        arguments,
+    )
+    assert indirection.kind == "write"
+
+    # Written value and index
+    assert len(indirection.arguments()) == 2
+    assert indirection.value().reference == "%10"
+    assert [index.reference for index in indirection.indices()] == ["%11"]
+
+    assert indirection.as_cpp() == "_out[_11] = _in"
+
+    array = dace.data.Array(dace.float64, shape=[256])
+    memlet: dace.Memlet = indirection.memlet(array)
+    assert memlet.dynamic
+    assert str(memlet) == "MemRef1(dyn) [0:256]"
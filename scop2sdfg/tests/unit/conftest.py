@@ -0,0 +1,163 @@
+"""
+Builders of the JScops exported by the plugin, shared by the unit tests
+(from conftest import jscop, ...).
+"""
+
+from typing import Dict, Iterable, List, Union
+
+_EMPTY = "{  }"
+
+
+def array(
+    name: str,
+    sizes: Iterable[str] = ("*",),
+    dtype: str = "double",
+    kind: str = "array",
+    variable: str = None,
+) -> Dict:
+    """
+    A memref. The variable of scalars (phi, value) is their instruction.
+    """
+    if variable is None:
+        variable = f"ptr %{name}"
+    elif kind != "array":
+        variable = "  " + variable
+
+    return {
+        "kind": kind,
+        "name": name,
+        "sizes": list(sizes),
+        "type": dtype,
+        "variable": variable,
+    }
+
+
+def read(relation: str, instruction: str) -> Dict:
+    return {
+        "kind": "read",
+        "relation": relation,
+        "access_instruction": "  " + instruction,
+        "incoming_value": "",
+    }
+
+
+def write(relation: str, instruction: str, incoming_value: str) -> Dict:
+    """
+    :param incoming_value: The instruction or the constant (e.g., double 0.0) stored
+    """
+    return {
+        "kind": "write",
+        "relation": relation,
+        "access_instruction": "  " + instruction,
+        "incoming_value": "  " + incoming_value,
+    }
+
+
+def statement(
+    name: str, domain: str, accesses: List[Dict], loops: int = 1, start: int = 0
+) -> Dict:
+    """
+    A statement nested in loops with induction variables %iv0, %iv1, ... starting at start.
+    """
+    return {
+        "name": name,
+        "domain": domain,
+        "affine": True,
+        "loops": [
+            {
+                "induction_variable": f"  %iv{d} = phi i64 [ {start}, %entry ], [ %iv{d}.next, %for.inc ]"
+            }
+            for d in range(loops)
+        ],
+        "accesses": accesses,
+    }
+
+
+def jscop(
+    arrays: List[Dict],
+    statements: List[Dict],
+    schedule: str,
+    instructions: Iterable[str] = (),
+    params: Iterable[str] = (),
+    dependencies: Union[str, Dict[str, str]] = _EMPTY,
+    context: str = None,
+    name: str = "%for.body---%for.end",
+    access_range: List[Dict] = None,
+) -> Dict:
+    """
+    A scop of the statements and arrays.
+
+    :param params: The names of the parameters, which are i64 arguments
+    :param dependencies: The RAW, WAR and WAW dependences, either one relation
+                         for all kinds or a relation per kind
+    """
+    params = list(params)
+    if context is None:
+        context = ("[" + ", ".join(params) + "] -> " if params else "") + "{  :  }"
+    if isinstance(dependencies, str):
+        dependencies = {kind: dependencies for kind in ["RAW", "WAR", "WAW"]}
+
+    return {
+        "name": name,
+        "context": context,
+        "parameters": [
+            {"name": param, "type": "i64", "variable": f"i64 %{param}"}
+            for param in params
+        ],
+        "arrays": arrays,
+        "instructions": "\\n".join("  " + inst for inst in instructions),
+        "dependencies": {
+            "RAW": dependencies.get("RAW", _EMPTY),
+            "WAR": dependencies.get("WAR", _EMPTY),
+            "WAW": dependencies.get("WAW", _EMPTY),
+            "RED": _EMPTY,
+            "TC_RED": _EMPTY,
+        },
+        "schedule": schedule,
+        "statements": statements,
+        "access_range": access_range or [],
+    }
+
+
+def increments(
+    domains: List[str],
+    params: Iterable[str] = (),
+    dependencies: Union[str, Dict[str, str]] = _EMPTY,
+    offset: int = 0,
+) -> Dict:
+    """
+    Two loops, a producer and a consumer: B[i] = A[i] + 1; C[i] = B[i + offset] + 1
+    """
+    params = list(params)
+    prefix = "[" + ", ".join(params) + "] -> " if params else ""
+    statements = []
+    for k, (src, dst, shift) in enumerate(
+        [("MemRef0", "MemRef1", 0), ("MemRef1", "MemRef2", offset)]
+    ):
+        name = f"Stmt{k}"
+        statements.append(
+            statement(
+                name,
+                domains[k],
+                [
+                    read(
+                        prefix + "{ " + name + f"[i0] -> {src}[i0 + {shift}] }}",
+                        f"%a{k} = load double, ptr %pa{k}, align 8",
+                    ),
+                    write(
+                        prefix + "{ " + name + f"[i0] -> {dst}[i0] }}",
+                        f"store double %add{k}, ptr %pb{k}, align 8",
+                        f"%add{k} = fadd double %a{k}, 1.000000e+00",
+                    ),
+                ],
+            )
+        )
+
+    return jscop(
+        [array(f"MemRef{i}", variable=f"ptr %{name}") for i, name in enumerate("ABC")],
+        statements,
+        prefix + "{ Stmt0[i0] -> [0, i0]; Stmt1[i0] -> [1, i0] }",
+        instructions=[f"%add{k} = fadd double %a{k}, 1.000000e+00" for k in range(2)],
+        params=params,
+        dependencies=dependencies,
+    )
@@ -81,3 +81,21 @@ def test_2d_array():
     assert len(memref.shape) == 2
     assert isinstance(memref.shape[0], dace.symbolic.symbol)
     assert memref.shape[1] == 1200
+
+
+def test_aligned_argument():
+    desc = {
+        "kind": "array",
+        "name": "MemRef0",
+        "sizes": ["*"],
+        "type": "double",
+        "variable": "ptr noalias nocapture noundef readonly align 64 %A",
+    }
+    memref = Memref.from_json(desc)
+
+    assert memref.reference == "%A"
+    assert memref.alignment == 64
+
+    # The alignment of a load is the alignment of the loaded pointer
+    desc["variable"] = "  %0 = load ptr, ptr %B, align 8"
+    assert Memref.from_json(desc).alignment == 0
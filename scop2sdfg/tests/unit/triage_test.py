@@ -0,0 +1,100 @@
+import sys
+import subprocess
+
+from scop2sdfg.scop.scop import Scop
+from scop2sdfg.scop.triage import triage, work_bound
+from scop2sdfg.scop.analysis import estimate_work
+
+from conftest import array, jscop, read, statement, write
+
+
+def _jscop(domain, instructions, incoming_value, params=()):
+    # A[i0] = f(B[i0])
+    prefix = "[" + ", ".join(params) + "] -> "
+    return jscop(
+        [array("MemRef0", variable="ptr %A"), array("MemRef1", variable="ptr %B")],
+        [
+            statement(
+                "Stmt0",
+                domain,
+                [
+                    read(
+                        prefix + "{ Stmt0[i0] -> MemRef1[i0] }",
+                        "%0 = load double, ptr %p0, align 8",
+                    ),
+                    write(
+                        prefix + "{ Stmt0[i0] -> MemRef0[i0] }",
+                        "store double %res, ptr %out, align 8",
+                        incoming_value,
+                    ),
+                ],
+            )
+        ],
+        prefix + "{ Stmt0[i0] -> [i0] }",
+        instructions=instructions,
+        params=params,
+        context=prefix + "{  :  }",
+        name="%for.cond---%for.end",
+    )
+
+
+def test_bound():
+    desc = _jscop(
+        "{ Stmt0[i0] : 0 <= i0 <= 63 }",
+        ["%res = call double @llvm.sqrt.f64(double %0)"],
+        "%res = call double @llvm.sqrt.f64(double %0)",
+    )
+    assert work_bound(desc) == 64 * (8 + 2)
+
+    scop = Scop.from_json("sqrt.c", desc)
+    assert estimate_work(scop)["work"] <= work_bound(desc)
+
+
+def test_bound_all_instructions():
+    # The operations of the statement are bounded by all instructions
+    desc = _jscop(
+        "{ Stmt0[i0] : 0 <= i0 <= 63 }",
+        ["%res = fadd double %0, 1.000000e+00", "%other = fdiv double %0, %0"],
+        "%res = fadd double %0, 1.000000e+00",
+    )
+    assert work_bound(desc) == 64 * (1 + 4 + 2)
+
+    scop = Scop.from_json("add.c", desc)
+    assert estimate_work(scop)["work"] == 64 * (1 + 2)
+
+
+def test_triage():
+    desc = _jscop(
+        "{ Stmt0[i0] : 0 <= i0 <= 63 }",
+        ["%res = fadd double %0, 1.000000e+00"],
+        "%res = fadd double %0, 1.000000e+00",
+    )
+    assert triage(desc, min_work=1024) is not None
+    assert triage(desc, min_work=64 * 3) is None
+
+
+def test_triage_parametric():
+    desc = _jscop(
+        "[n] -> { Stmt0[i0] : 0 <= i0 < n }",
+        ["%res = fadd double %0, 1.000000e+00"],
+        "%res = fadd double %0, 1.000000e+00",
+        params=["n"],
+    )
+    assert work_bound(desc) is None
+    assert triage(desc, min_work=1024) is None
+
+    # Bounded by the context
+    desc["context"] = "[n] -> {  : 0 <= n <= 16 }"
+    assert triage(desc, min_work=1024) is not None
+
+
+def test_no_dace():
+    # The triage runs before dace is imported
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys; import scop2sdfg.scop.triage; assert 'dace' not in sys.modules",
+        ],
+        check=True,
+    )
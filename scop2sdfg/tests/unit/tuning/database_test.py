@@ -0,0 +1,50 @@
+import time
+
+from scop2sdfg.tuning import TuningDatabase
+
+
+def test_record_and_lookup(tmp_path):
+    database = TuningDatabase(tmp_path / "tuning.db")
+    assert database.lookup("cutout") is None
+
+    assert database.record("cutout", {"sdfg": {}}, 2.0)
+    assert database.lookup("cutout") == {"recipe": {"sdfg": {}}, "runtime": 2.0}
+
+    # Slower recipes do not replace faster ones
+    assert not database.record("cutout", {"sdfg": {"slow": True}}, 3.0)
+    assert database.record("cutout", {"sdfg": {"fast": True}}, 1.0)
+    assert database.lookup("cutout")["recipe"] == {"sdfg": {"fast": True}}
+
+    # Recipes of other processors are not used
+    assert database.lookup("cutout", fingerprint="other") is None
+
+    assert database.entries()[0]["hits"] == 2
+
+
+def test_eviction(tmp_path):
+    database = TuningDatabase(tmp_path / "tuning.db", max_entries=2)
+    for key in ["a", "b", "c"]:
+        database.record(key, {}, 1.0)
+        time.sleep(0.01)
+
+    # The least recently used recipe is evicted
+    assert [entry["cutout"] for entry in database.entries()] == ["c", "b"]
+
+    database.lookup("b")
+    assert database.evict(max_entries=1) == 1
+    assert [entry["cutout"] for entry in database.entries()] == ["b"]
+
+    assert database.evict(max_age=0.0) == 1
+    assert database.entries() == []
+
+
+def test_export_import(tmp_path):
+    database = TuningDatabase(tmp_path / "tuning.db")
+    database.record("a", {"sdfg": {}}, 1.0)
+    database.record("b", {"sdfg": {}}, None, fingerprint="other")
+    assert database.export(tmp_path / "recipes.jsonl") == 2
+
+    other = TuningDatabase(tmp_path / "other.db")
+    assert other.load(tmp_path / "recipes.jsonl") == 2
+    assert other.lookup("a")["runtime"] == 1.0
+    assert other.lookup("b", fingerprint="other") is not None
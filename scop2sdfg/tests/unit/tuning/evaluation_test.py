@@ -0,0 +1,57 @@
+import dace
+
+from scop2sdfg.tuning import evaluate_candidates
+
+
+def _candidate(name: str, code: str) -> dace.SDFG:
+    sdfg = dace.SDFG(name)
+    sdfg.add_array("A", [4096], dace.float64)
+    sdfg.add_array("B", [4096], dace.float64)
+
+    state = sdfg.add_state("compute")
+    state.add_mapped_tasklet(
+        "compute",
+        {"i": "0:4096"},
+        {"_in": dace.Memlet("A[i]")},
+        code,
+        {"_out": dace.Memlet("B[i]")},
+        external_edges=True,
+    )
+    return sdfg
+
+
+def test_evaluate_candidates(tmp_path):
+    candidates = [
+        _candidate("scale", "_out = 2 * _in"),
+        _candidate("shift", "_out = _in + 1"),
+        # Fails to compile
+        _candidate("broken", "_out = undefined_function(_in)"),
+    ]
+    runtimes = evaluate_candidates(candidates, tmp_path, workers=2)
+    assert runtimes[0] is not None and runtimes[0] > 0
+    assert runtimes[1] is not None and runtimes[1] > 0
+    assert runtimes[2] is None
+
+
+def test_exceeded_budget(tmp_path):
+    candidates = [_candidate("scale", "_out = 2 * _in")]
+    assert evaluate_candidates(candidates, tmp_path, budget=0) == [None]
+
+
+def test_symbolic_shapes(tmp_path):
+    # Parametric cutouts are measured for sample sizes
+    sdfg = dace.SDFG("parametric")
+    sdfg.add_symbol("N", dace.int64)
+    sdfg.add_array("A", ["N", "N"], dace.float64)
+    sdfg.add_array("B", ["N", "N"], dace.float64)
+    sdfg.add_state().add_mapped_tasklet(
+        "compute",
+        {"i": "0:N", "j": "0:N"},
+        {"_in": dace.Memlet("A[i, j]")},
+        "_out = 2 * _in",
+        {"_out": dace.Memlet("B[i, j]")},
+        external_edges=True,
+    )
+
+    runtimes = evaluate_candidates([sdfg], tmp_path)
+    assert runtimes[0] is not None and runtimes[0] > 0
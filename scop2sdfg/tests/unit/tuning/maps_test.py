@@ -0,0 +1,98 @@
+import copy
+import time
+import dace
+
+from scop2sdfg.tuning import TuningDatabase, tune_maps
+
+
+def _sdfg(name: str) -> dace.SDFG:
+    sdfg = dace.SDFG(name)
+    sdfg.add_array("A", [1024], dace.float64)
+    sdfg.add_array("B", [1024], dace.float64)
+
+    state = sdfg.add_state("compute")
+    state.add_mapped_tasklet(
+        "scale",
+        {"i": "0:1024"},
+        {"_in": dace.Memlet("A[i]")},
+        "_out = 2 * _in",
+        {"_out": dace.Memlet("B[i]")},
+        external_edges=True,
+    )
+    return sdfg
+
+
+def _tuner(calls):
+    def tune(cutout: dace.SDFG):
+        calls.append(cutout)
+        for node, _ in cutout.all_nodes_recursive():
+            if isinstance(node, dace.nodes.MapEntry):
+                node.map.schedule = dace.ScheduleType.CPU_Multicore
+                node.map.omp_chunk_size = 64
+
+    return tune
+
+
+def _maps(sdfg: dace.SDFG):
+    return [
+        node.map
+        for node, _ in sdfg.all_nodes_recursive()
+        if isinstance(node, dace.nodes.MapEntry)
+    ]
+
+
+def test_tune_maps(tmp_path):
+    database = TuningDatabase(tmp_path / "tuning.db")
+    calls = []
+
+    sdfg = _sdfg("first")
+    assert tune_maps(sdfg, _tuner(calls), database, measure=False) == {
+        "scale_map": "tuned"
+    }
+    sdfg.validate()
+    assert len(calls) == 1
+    assert len(database.entries()) == 1
+
+    # An identical map of another program reuses the recipe
+    other = _sdfg("second")
+    assert tune_maps(other, _tuner(calls), database, measure=False) == {
+        "scale_map": "hit"
+    }
+    other.validate()
+    assert len(calls) == 1
+
+    maps = _maps(other)
+    assert len(maps) == 1
+    assert maps[0].schedule == dace.ScheduleType.CPU_Multicore
+    assert maps[0].omp_chunk_size == 64
+
+
+def test_tuning_budget(tmp_path):
+    database = TuningDatabase(tmp_path / "tuning.db")
+
+    def candidates(cutout: dace.SDFG):
+        sequential = copy.deepcopy(cutout)
+        parallel = copy.deepcopy(cutout)
+        _tuner([])(parallel)
+        # The tuning takes the whole budget
+        time.sleep(0.1)
+        return [parallel, sequential]
+
+    # Without time for the evaluation, the preferred candidate is taken
+    sdfg = _sdfg("budget")
+    sdfg.build_folder = str(tmp_path / "budget")
+    assert tune_maps(sdfg, candidates, database, budget=0.05) == {
+        "scale_map": "unmeasured"
+    }
+    sdfg.validate()
+    assert database.entries() == []
+    assert _maps(sdfg)[0].schedule == dace.ScheduleType.CPU_Multicore
+
+    # Maps beyond the budget are not tuned
+    calls = []
+    sdfg = _sdfg("skipped")
+    assert tune_maps(sdfg, _tuner(calls), database, budget=0) == {
+        "scale_map": "skipped"
+    }
+    assert calls == []
+    assert _maps(sdfg)[0].schedule == dace.ScheduleType.Default